@@ -0,0 +1,99 @@
+"""
+Listing page card extraction: per-card element handles vs. one page.evaluate.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_card_extraction [--rounds 20] [--limit 25]
+
+Each portal's saved listing page (benchmarks/fixtures/listing_*.html) is
+loaded with `page.set_content`, then cards are read the old way (a
+query_selector plus inner_text/get_attribute per field, per card) and through
+card_extractor.extract_cards. Every awaited Playwright call is one CDP round
+trip; they are counted by wrapping the page and the handles it returns.
+Needs Chromium (`playwright install chromium`).
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from playwright.async_api import async_playwright, ElementHandle
+
+from card_extractor import extract_cards
+from portals import ADAPTERS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class Counted:
+    """Proxy that counts awaited method calls on a page or element handle."""
+
+    def __init__(self, target, stats):
+        self._target = target
+        self._stats = stats
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            self._stats["round_trips"] += 1
+            result = await attr(*args, **kwargs)
+            if isinstance(result, ElementHandle):
+                return Counted(result, self._stats)
+            if isinstance(result, list):
+                return [Counted(r, self._stats) if isinstance(r, ElementHandle) else r for r in result]
+            return result
+        return call
+
+
+async def legacy_extract(page, spec):
+    """What the scrapers did before: one round trip per selector and per read."""
+    rows = []
+    for card in (await page.query_selector_all(spec["card"]))[:spec["limit"]]:
+        row = {}
+        for name, (selector, attr) in spec["fields"].items():
+            el = await card.query_selector(selector)
+            if not el:
+                row[name] = ""
+            elif attr == "text":
+                row[name] = await el.inner_text()
+            else:
+                row[name] = await el.get_attribute(attr) or ""
+        rows.append(row)
+    return rows
+
+
+async def measure(page, extract, spec, rounds):
+    stats = {"round_trips": 0}
+    counted = Counted(page, stats)
+    rows = await extract(counted, spec)
+    trips = stats["round_trips"]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await extract(page, spec)
+    return rows, trips, (time.perf_counter() - start) / rounds * 1000
+
+
+async def main(args):
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        for portal, adapter in ADAPTERS.items():
+            spec = dict(adapter.card_spec, limit=args.limit)
+            with open(os.path.join(FIXTURES, f"listing_{portal.lower()}.html"), encoding="utf-8") as f:
+                await page.set_content(f.read())
+            old, old_trips, old_ms = await measure(page, legacy_extract, spec, args.rounds)
+            new, new_trips, new_ms = await measure(page, extract_cards, spec, args.rounds)
+            assert old == new, f"{portal}: extract_cards disagrees with per-card extraction"
+            print(f"{portal} ({len(new)} cards):")
+            print(f"  per-card handles   {old_trips:4d} round trips  {old_ms:8.2f} ms/page")
+            print(f"  one page.evaluate  {new_trips:4d} round trips  {new_ms:8.2f} ms/page")
+        await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=25)
+    asyncio.run(main(parser.parse_args()))
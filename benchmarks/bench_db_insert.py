@@ -0,0 +1,110 @@
+"""
+Job persistence: the old per-row path vs. the batched WAL path in database.py.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_db_insert [--jobs 100000] [--batch 50]
+
+Both paths insert the same synthetic jobs (with a description of about 300
+words) into a fresh temporary database created by init_db(), so they pay for
+the same indexes. The old path only inserts rows; the new one also keeps the
+full-text index and the stats counters current. "new, no FTS" drops the
+full-text sync to show what the index costs on its own. Each path runs once
+as a single call and once in scan-sized batches. Half of the second round
+are duplicates, so the ignore path is exercised as well.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import database
+
+WORDS = (
+    "we are looking for a senior frontend developer react typescript remote berlin team product "
+    "design system testing accessibility performance mentoring hybrid office benefits salary"
+).split()
+
+
+def synthetic_jobs(n, offset=0):
+    rng = random.Random(offset)
+    return [
+        {
+            "title": f"Frontend Developer {i}",
+            "company": f"Company {i % 977}",
+            "location": "Germany",
+            "link": f"https://example.com/jobs/{i}",
+            "emails": [f"jobs{i}@example.com"],
+            "source": ("LinkedIn", "Stepstone", "Indeed", "StartupJobs")[i % 4],
+            "description": " ".join(rng.choice(WORDS) for _ in range(300)),
+        }
+        for i in range(offset, offset + n)
+    ]
+
+
+def old_save_jobs(jobs_list):
+    """The pre-WAL implementation: new connection, one execute per job (description added)."""
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    new_jobs_count = 0
+    for job in jobs_list:
+        emails_str = "\n".join(job.get('emails', [])) if isinstance(job.get('emails'), list) else job.get('emails', '')
+        cursor.execute('''
+        INSERT OR IGNORE INTO jobs (title, company, location, link, emails, source, description)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (job.get('title'), job.get('company'), job.get('location'), job.get('link'), emails_str,
+              job.get('source'), job.get('description')))
+        if cursor.rowcount > 0:
+            new_jobs_count += 1
+    conn.commit()
+    conn.close()
+    return new_jobs_count
+
+
+def new_save_jobs(jobs_list):
+    return database.save_jobs(jobs_list)["inserted"]
+
+
+def measure(name, save, jobs, batch, workdir, fts=True):
+    database.DB_PATH = os.path.join(workdir, f"{name.replace(',', '').replace(' ', '_')}.db")
+    database.close_db_connection()
+    database.init_db()
+    sync = database.FTS_JOBS_SYNC
+    if not fts:
+        # The same database without the full-text index; save_jobs runs a no-op in place of its sync
+        with database.db_connection() as conn:
+            conn.execute('DROP TRIGGER jobs_fts_update')
+            conn.execute('DROP TRIGGER jobs_fts_delete')
+            conn.execute('DROP TABLE jobs_fts')
+        database.FTS_JOBS_SYNC = "SELECT :after"
+    try:
+        start = time.perf_counter()
+        inserted = save(jobs)
+        single = time.perf_counter() - start
+
+        # Second round: half duplicates, half new, in scan-sized batches
+        second = jobs[len(jobs) // 2:] + synthetic_jobs(len(jobs) // 2, offset=len(jobs))
+        start = time.perf_counter()
+        inserted_batched = sum(save(second[i:i + batch]) for i in range(0, len(second), batch))
+        batched = time.perf_counter() - start
+    finally:
+        database.FTS_JOBS_SYNC = sync
+
+    print(f"{name:>11}: single call {single:7.2f}s ({len(jobs) / single:9.0f} rows/s, {inserted} inserted)"
+          f" | {batch}-job batches {batched:7.2f}s ({len(second) / batched:9.0f} rows/s, {inserted_batched} inserted)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs)
+    with tempfile.TemporaryDirectory() as workdir:
+        measure("old", old_save_jobs, jobs, args.batch, workdir)
+        measure("new", new_save_jobs, jobs, args.batch, workdir)
+        measure("new, no FTS", new_save_jobs, jobs, args.batch, workdir, fts=False)
+        database.close_db_connection()
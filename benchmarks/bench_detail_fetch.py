@@ -0,0 +1,92 @@
+"""
+Serial vs concurrent detail page fetching against local fixture pages.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_detail_fetch [--pages 24] [--delay 0.3]
+
+A local HTTP server answers every detail page after `--delay` seconds, which
+stands in for a slow portal. The same pages are fetched once one after the
+other and once through `detail_fetcher.fetch_details`.
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from browser_pool import get_browser_pool, close_browser_pool
+from detail_fetcher import fetch_details
+
+PORTAL = "Stepstone"
+
+DETAIL_HTML = """<html><body>
+<div class="js-app-ld-ContentBlock">
+<h1>Frontend Developer #{n}</h1>
+<p>We are looking for an experienced React engineer. Requirements: JavaScript, TypeScript.</p>
+<p>Apply at jobs-{n}@example.com</p>
+</div>
+</body></html>"""
+
+
+def start_server(delay):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            n = self.path.rstrip("/").rsplit("/", 1)[-1]
+            body = DETAIL_HTML.format(n=n).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run(pages, delay):
+    server = start_server(delay)
+    links = [f"http://127.0.0.1:{server.server_port}/detail/{n}" for n in range(pages)]
+    pool = await get_browser_pool()
+
+    async def fetch_one(link):
+        page = await pool.new_page(PORTAL)
+        try:
+            await page.goto(link, wait_until="domcontentloaded")
+            el = await page.query_selector(".js-app-ld-ContentBlock")
+            return await el.inner_text() if el else ""
+        finally:
+            await pool.release_page(page)
+
+    try:
+        # Warm up so browser launch is not part of either measurement
+        await fetch_one(links[0])
+
+        start = time.perf_counter()
+        serial = [await fetch_one(link) for link in links]
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        concurrent = await fetch_details(PORTAL, links, fetch_one)
+        concurrent_time = time.perf_counter() - start
+    finally:
+        await close_browser_pool()
+        server.shutdown()
+
+    assert serial == concurrent, "concurrent fetch changed result order"
+    print(f"{pages} detail pages, {delay:.2f}s server delay")
+    print(f"  serial:     {serial_time:6.2f}s  ({pages / serial_time:5.2f} pages/s)")
+    print(f"  concurrent: {concurrent_time:6.2f}s  ({pages / concurrent_time:5.2f} pages/s)")
+    print(f"  speedup:    {serial_time / concurrent_time:5.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=24)
+    parser.add_argument("--delay", type=float, default=0.3)
+    args = parser.parse_args()
+    asyncio.run(run(args.pages, args.delay))
@@ -0,0 +1,99 @@
+"""
+Excel export: the old in-memory workbook vs. the streaming write-only path.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_export [--sizes 10000 100000 500000]
+
+Each (implementation, size) pair runs in its own process so the reported
+peak RSS belongs to that export alone.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment
+
+from exporter import write_xlsx, COLUMNS
+
+
+def synthetic_rows(n):
+    for i in range(n):
+        yield {
+            "title": f"Senior Frontend Developer (React/TypeScript) #{i}",
+            "company": f"Company {i % 977} GmbH",
+            "location": "Berlin, Germany",
+            "link": f"https://de.linkedin.com/jobs/view/{1000000 + i}",
+            "emails": [f"jobs{i}@example.com", "hr@example.com"],
+            "source": ("LinkedIn", "Stepstone", "Indeed", "StartupJobs")[i % 4],
+        }
+
+
+def old_export(jobs_list, path):
+    """The previous implementation: full workbook in memory, styled in a second pass."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Job Leads"
+    ws.append([col.capitalize() for col in COLUMNS])
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+    center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    left_wrap = Alignment(horizontal='left', vertical='top', wrap_text=True)
+    link_font = Font(color="0563C1", underline="single")
+    for cell in ws[1]:
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = center_align
+    for job in jobs_list:
+        row_data = []
+        for col in COLUMNS:
+            val = job.get(col, "")
+            if isinstance(val, list):
+                val = "\n".join(val)
+            if isinstance(val, str):
+                val = "".join(c for c in val if c.isprintable() or c in "\n\r\t")
+            row_data.append(val)
+        ws.append(row_data)
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        for cell in row:
+            cell.alignment = left_wrap
+            if cell.column == 4:
+                raw_url = cell.value
+                if raw_url and str(raw_url).startswith("http"):
+                    cell.value = f'=HYPERLINK("{raw_url}", "OPEN JOB POSTING")'
+                    cell.font = link_font
+    ws.freeze_panes = 'A2'
+    wb.save(path)
+
+
+def run_case(name, size, path, queue):
+    start = time.perf_counter()
+    if name == "old":
+        old_export(list(synthetic_rows(size)), path)
+    else:
+        write_xlsx(synthetic_rows(size), path)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, peak_kb, os.path.getsize(path)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            for name in ("old", "stream"):
+                queue = ctx.Queue()
+                path = os.path.join(workdir, f"{name}_{size}.xlsx")
+                proc = ctx.Process(target=run_case, args=(name, size, path, queue))
+                proc.start()
+                elapsed, peak_kb, file_size = queue.get()
+                proc.join()
+                print(f"{name:>6} {size:>7} rows: {elapsed:7.2f}s  {size / elapsed:8.0f} rows/s"
+                      f"  peak RSS {peak_kb / 1024:7.1f} MB  file {file_size / 1024 / 1024:6.1f} MB")
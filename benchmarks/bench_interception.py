@@ -0,0 +1,136 @@
+"""
+Bytes and requests per detail page: the old static-asset glob vs. the
+interception policy, with and without JavaScript.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_interception [--pages 20]
+
+A local server plays a typical job detail page: server-rendered description,
+stylesheet, fonts (woff2, woff, ttf), images (png, webp), a video, the site's
+app bundle and analytics/ad scripts on third-party hosts (*.localhost resolves
+to the loopback address, so they stay local) that fire beacons. The server
+counts every request and byte it sends, so the savings are exact.
+Needs Chromium (`playwright install chromium`).
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from browser_pool import BrowserPool
+from interception import InterceptionPolicy
+from config import INTERCEPTION
+
+ASSETS = {
+    "/style.css": ("text/css", 60_000),
+    "/font.woff2": ("font/woff2", 40_000),
+    "/font.woff": ("font/woff", 50_000),
+    "/font.ttf": ("font/ttf", 90_000),
+    "/logo.png": ("image/png", 30_000),
+    "/hero.webp": ("image/webp", 120_000),
+    "/intro.mp4": ("video/mp4", 400_000),
+    "/app.js": ("application/javascript", 250_000),
+}
+
+DETAIL_HTML = """<!DOCTYPE html><html><head>
+<link rel="stylesheet" href="/style.css">
+<style>@font-face {{ font-family: a; src: url(/font.woff2); }} @font-face {{ font-family: b; src: url(/font.woff); }}
+@font-face {{ font-family: c; src: url(/font.ttf); }} body {{ font-family: a, b, c; }}</style>
+<script src="/app.js"></script>
+<script src="http://analytics.localhost:{port}/collect.js"></script>
+<script src="http://ads.localhost:{port}/ads.js"></script>
+</head><body>
+<img src="/logo.png"><img src="/hero.webp"><video src="/intro.mp4" autoplay muted></video>
+<div class="js-app-ld-ContentBlock"><h1>Frontend Developer #{n}</h1>
+<p>We are looking for an experienced React engineer. Requirements: JavaScript, TypeScript.</p></div>
+</body></html>"""
+
+TRACKER_JS = "fetch('/beacon?e=pageview'); navigator.sendBeacon && navigator.sendBeacon('/beacon?e=load');" + "//" + "x" * 80_000
+
+
+def start_server():
+    counters = {"requests": 0, "bytes": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, content_type, body):
+            with lock:
+                counters["requests"] += 1
+                counters["bytes"] += len(body)
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path.startswith("/detail/"):
+                body = DETAIL_HTML.format(port=self.server.server_port, n=path.rsplit("/", 1)[-1])
+                self._send("text/html; charset=utf-8", body.encode())
+            elif path in ASSETS:
+                content_type, size = ASSETS[path]
+                self._send(content_type, b"\0" * size)
+            elif path.endswith(".js"):
+                self._send("application/javascript", TRACKER_JS.encode())
+            else:
+                self._send("text/plain", b"")
+
+        do_POST = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counters
+
+
+async def old_glob(page, portal):
+    await page.route("**/*.{png,jpg,jpeg,gif,svg,css,woff2}", lambda route: route.abort())
+
+
+def policy(javascript):
+    blocked = INTERCEPTION["blocked_domains"] + ["analytics.localhost", "ads.localhost"]
+    return InterceptionPolicy.for_portal({"blocked_domains": blocked, "detail_javascript": javascript})
+
+
+async def run(label, pool, server, counters, setup, javascript, pages):
+    counters.update(requests=0, bytes=0)
+    port = server.server_port
+    start = time.perf_counter()
+    for n in range(pages):
+        page = await pool.new_page("Bench", javascript=javascript)
+        try:
+            await setup(page, "Bench")
+            await page.goto(f"http://127.0.0.1:{port}/detail/{n}", wait_until="load")
+            text = await page.inner_text(".js-app-ld-ContentBlock")
+            assert "React engineer" in text
+            # Give beacons and late subresources a moment, as a real scrape would while reading
+            await page.wait_for_timeout(100)
+        finally:
+            await pool.release_page(page)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<24} {counters['requests'] / pages:5.1f} req/page  "
+          f"{counters['bytes'] / pages / 1024:7.1f} KiB/page  {elapsed / pages * 1000:6.0f} ms/page")
+
+
+async def main(args):
+    server, counters = start_server()
+    pool = BrowserPool(size=1)
+    try:
+        print(f"{args.pages} detail pages each:")
+        await run("no interception", pool, server, counters, lambda page, portal: asyncio.sleep(0), True, args.pages)
+        await run("old asset glob", pool, server, counters, old_glob, True, args.pages)
+        await run("policy", pool, server, counters, policy(True).apply, True, args.pages)
+        await run("policy, JavaScript off", pool, server, counters, policy(False).apply, False, args.pages)
+    finally:
+        await pool.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
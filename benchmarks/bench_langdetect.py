@@ -0,0 +1,107 @@
+"""
+Language detection: raw langdetect on full descriptions vs. the memoized,
+prefix-truncated and batched layer in language_detection.py.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_langdetect [--count 10000] [--repeat-share 0.3]
+
+The corpus is built from English, German and French job-ad sentences into
+descriptions of 1.5k-5k characters; `--repeat-share` of them are repeats,
+as happens when the same posting is checked more than once.
+"""
+import argparse
+import random
+import time
+
+from langdetect import detect
+
+import language_detection
+
+SENTENCES = {
+    "en": [
+        "We are looking for an experienced Frontend Developer to join our product team.",
+        "You will build modern web applications with React, TypeScript and GraphQL.",
+        "Our stack includes Node.js, Kubernetes and a modern CI/CD pipeline.",
+        "You have at least three years of professional experience in software engineering.",
+        "We offer flexible working hours, a remote-friendly culture and a learning budget.",
+        "You care about accessibility, performance and clean, well-tested code.",
+        "Collaborate closely with designers and product managers to ship features end to end.",
+        "Fluent English is required, German is a plus but not mandatory.",
+    ],
+    "de": [
+        "Wir suchen einen erfahrenen Frontend Entwickler für unser Produktteam in Berlin.",
+        "Du entwickelst moderne Webanwendungen mit React, TypeScript und GraphQL.",
+        "Zu deinen Aufgaben gehört die enge Zusammenarbeit mit unserem Designteam.",
+        "Du verfügst über mindestens drei Jahre Berufserfahrung in der Softwareentwicklung.",
+        "Wir bieten flexible Arbeitszeiten, Homeoffice und ein jährliches Weiterbildungsbudget.",
+        "Sehr gute Deutschkenntnisse in Wort und Schrift setzen wir voraus.",
+        "Bewirb dich jetzt mit deinem Lebenslauf und frühestmöglichem Eintrittstermin.",
+        "Unser Büro liegt zentral und ist mit öffentlichen Verkehrsmitteln gut erreichbar.",
+    ],
+    "fr": [
+        "Nous recherchons un développeur frontend expérimenté pour rejoindre notre équipe produit.",
+        "Vous développerez des applications web modernes avec React et TypeScript.",
+        "Vous avez au moins trois ans d'expérience professionnelle en développement logiciel.",
+        "Nous offrons des horaires flexibles et une culture favorable au télétravail.",
+    ],
+}
+
+
+def build_corpus(count, repeat_share, seed=42):
+    rng = random.Random(seed)
+    unique = []
+    corpus = []
+    for _ in range(count):
+        if unique and rng.random() < repeat_share:
+            corpus.append(rng.choice(unique))
+            continue
+        lang = rng.choices(["en", "de", "fr"], weights=[6, 3, 1])[0]
+        target_len = rng.randint(1500, 5000)
+        parts = []
+        while sum(len(p) + 1 for p in parts) < target_len:
+            parts.append(rng.choice(SENTENCES[lang]))
+        text = " ".join(parts) + f" Reference {rng.randint(0, 10 ** 9)}."
+        unique.append(text)
+        corpus.append(text)
+    return corpus
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def reset_cache():
+    language_detection._cache = language_detection.LanguageCache()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat-share", type=float, default=0.3)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count, args.repeat_share)
+    n = len(corpus)
+    print(f"{n} descriptions, avg {sum(map(len, corpus)) // n} chars")
+
+    baseline, t_base = timed(lambda: [detect(text) for text in corpus])
+    print(f"  langdetect.detect (full text):   {t_base:7.2f}s  {n / t_base:8.0f} texts/s")
+
+    reset_cache()
+    cold, t_cold = timed(lambda: [language_detection.detect_language(text) for text in corpus])
+    print(f"  detect_language (cold cache):    {t_cold:7.2f}s  {n / t_cold:8.0f} texts/s")
+
+    warm, t_warm = timed(lambda: [language_detection.detect_language(text) for text in corpus])
+    print(f"  detect_language (warm cache):    {t_warm:7.2f}s  {n / t_warm:8.0f} texts/s")
+
+    reset_cache()
+    pool = language_detection.get_detection_pool()
+    pool.submit(int).result()  # Start the workers outside the measurement
+    batch, t_batch = timed(lambda: language_detection.classify_batch(corpus))
+    print(f"  classify_batch ({language_detection.LANGDETECT_WORKERS} processes, cold): {t_batch:7.2f}s  {n / t_batch:8.0f} texts/s")
+    language_detection.shutdown_detection_pool()
+
+    agree = sum(a == b for a, b in zip(baseline, cold)) / n
+    print(f"  agreement with full-text detection: {agree:.2%}; batch == sequential: {batch == cold}")
@@ -0,0 +1,172 @@
+"""
+Keyword rules: the previous check_language_requirements vs. the RuleSet
+version, single-pass matcher alternatives, and precompiled email extraction.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_language_rules [--count 10000] [--detect-count 500]
+
+The first section passes the same detected code to both implementations so
+it isolates keyword matching. The second lets each implementation detect the
+language itself, which shows the effect of only detecting when a rule needs
+it. Results of old and new implementations are compared for every text.
+"""
+import argparse
+import random
+import re
+import time
+
+from langdetect import detect
+
+from benchmarks.bench_langdetect import build_corpus
+import language_detection
+from config import LANGUAGE_RULES
+from language_rules import RULES
+from utils import check_language_requirements, extract_emails, LANG_CODES
+
+TARGETS = ["English", "German", "French", "Both"]
+
+
+def old_check_language_requirements(description, target_lang, detected):
+    """The previous implementation, with detection passed in."""
+    if not description:
+        return False
+    desc_lower = description.lower()
+    target_code = LANG_CODES.get(target_lang)
+    if target_lang == "English":
+        german_req_indicators = [
+            "deutsch als muttersprache", "deutschkenntnisse", "fluent german",
+            "level b2", "level c1", "voraussetzung: deutsch", "fließend deutsch",
+            "deutsch: verhandlungssicher"
+        ]
+        if any(i in desc_lower for i in german_req_indicators):
+            return False
+        if detected == 'en':
+            return True
+        tech_keywords = ["react", "frontend", "flutter", "angular", "javascript", "typescript", "node", "experience", "requirements", "engineer", "developer"]
+        has_strong_english = any(k in desc_lower for k in tech_keywords)
+        if detected == 'de' and "deutsch" in desc_lower:
+            return False
+        return has_strong_english
+    if target_lang == "German":
+        if detected == 'de':
+            return True
+        german_indicators = ["deutschkenntnisse", "deutsch", "voraussetzungen", "aufgaben", "kenntnisse"]
+        return any(g in desc_lower for g in german_indicators)
+    if target_code:
+        return detected == target_code
+    return True
+
+
+def combined_matchers(categories):
+    """Single-pass alternatives to RuleSet.match, for comparison only."""
+    owners = {}
+    for name, keywords in categories.items():
+        for keyword in keywords:
+            owners.setdefault(keyword.lower(), set()).add(name)
+    # Lookahead at every position keeps overlapping matches (exact `in` semantics)
+    alternatives = sorted(owners, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, alternatives)) + "))")
+    implied = {k: set().union(*(owners[o] for o in owners if o in k)) for k in owners}
+
+    def regex_match(text):
+        matched = set()
+        for keyword in set(pattern.findall(text.lower())):
+            matched |= implied[keyword]
+        return matched
+
+    matchers = {"combined regex": regex_match}
+    try:
+        import ahocorasick
+    except ImportError:
+        return matchers
+    automaton = ahocorasick.Automaton()
+    for keyword, names in owners.items():
+        automaton.add_word(keyword, frozenset(names))
+    automaton.make_automaton()
+
+    def aho_match(text):
+        matched = set()
+        for _, names in automaton.iter(text.lower()):
+            matched |= names
+        return matched
+
+    matchers["Aho-Corasick (pyahocorasick)"] = aho_match
+    return matchers
+
+
+def old_detecting_check(description, target_lang):
+    """The previous implementation's cost profile: always detect on the full text."""
+    try:
+        detected = detect(description)
+    except Exception:
+        detected = 'unknown'
+    return old_check_language_requirements(description, target_lang, detected)
+
+
+def old_extract_emails(text):
+    if not text:
+        return []
+    email_pattern = r'[a-zA-Z0-9._%+-]+@(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}'
+    emails = list(set(re.findall(email_pattern, text)))
+    hr_keywords = ['hr', 'jobs', 'careers', 'recruitment', 'bewerbung', 'career', 'personal', 'hiring']
+    hr_emails = [e for e in emails if any(k in e.lower() for k in hr_keywords)]
+    other_emails = [e for e in emails if e not in hr_emails]
+    return hr_emails + other_emails
+
+
+def run(label, fn, n):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<38} {elapsed:7.3f}s  {n / elapsed:10.0f} texts/s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--detect-count", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    corpus = build_corpus(args.count, repeat_share=0.0)
+    # Sprinkle requirement phrases and contact addresses into some descriptions
+    extras = ["Fließend Deutsch ist Voraussetzung.", "Level C1 German required.", "Contact: jobs@example.com, anna.b@corp.de"]
+    corpus = [text + " " + rng.choice(extras) if rng.random() < 0.3 else text for text in corpus]
+    detected = [rng.choice(["en", "de", "fr"]) for _ in corpus]
+    n = len(corpus) * len(TARGETS)
+    print(f"Keyword rules only ({len(corpus)} descriptions x {len(TARGETS)} targets, detection passed in):")
+
+    old = run("old check_language_requirements", lambda: [
+        old_check_language_requirements(t, target, d) for target in TARGETS for t, d in zip(corpus, detected)
+    ], n)
+    new = run("RuleSet check_language_requirements", lambda: [
+        check_language_requirements(t, target, d) for target in TARGETS for t, d in zip(corpus, detected)
+    ], n)
+    assert old == new, "rule engine disagrees with the previous implementation"
+
+    print("English rule set, all categories per text:")
+    rule_set = RULES["English"]
+    expected = run("RuleSet.match", lambda: [rule_set.match(t) for t in corpus], len(corpus))
+    for label, matcher in combined_matchers(LANGUAGE_RULES["English"]).items():
+        got = run(label, lambda: [matcher(t) for t in corpus], len(corpus))
+        assert got == expected, f"{label} disagrees with RuleSet.match"
+
+    sample = corpus[:args.detect_count]
+    m = len(sample) * len(TARGETS)
+    print(f"With language detection ({len(sample)} descriptions x {len(TARGETS)} targets, cold cache):")
+    old_detected = run("old (always detect full text)", lambda: [
+        old_detecting_check(t, target) for target in TARGETS for t in sample
+    ], m)
+    language_detection._cache = language_detection.LanguageCache()
+    new_detected = run("new (detect prefix only when needed)", lambda: [
+        check_language_requirements(t, target) for target in TARGETS for t in sample
+    ], m)
+    agree = sum(a == b for a, b in zip(old_detected, new_detected)) / m
+    print(f"  agreement: {agree:.2%}")
+
+    print("Email extraction:")
+    old_emails = run("old extract_emails", lambda: [old_extract_emails(t) for t in corpus], len(corpus))
+    new_emails = run("precompiled extract_emails", lambda: [extract_emails(t) for t in corpus], len(corpus))
+    assert [sorted(e) for e in old_emails] == [sorted(e) for e in new_emails], "email extraction changed"
+    print("  email results identical")
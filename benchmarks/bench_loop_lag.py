@@ -0,0 +1,78 @@
+"""
+Event loop lag while detail pages are processed: analysis inline on the loop
+vs. the process-pool text pipeline.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_loop_lag [--count 400] [--concurrency 10] [--nav-ms 150]
+
+No browser is needed: each "navigation" is an asyncio.sleep of about
+--nav-ms, after which the description is analyzed (emails + language) the
+way the scrapers do. A LoopLagMonitor samples how late the loop wakes up,
+which is the delay every other coroutine (Playwright events, API requests)
+sees meanwhile. Both runs use the same corpus and cold detection caches.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from benchmarks.bench_langdetect import build_corpus
+import language_detection
+from loop_monitor import LoopLagMonitor
+from text_pipeline import TextPipeline, analyze_description
+
+
+async def scrape(corpus, concurrency, nav_ms, analyze):
+    rng = random.Random(3)
+    delays = [rng.uniform(0.5, 1.5) * nav_ms / 1000 for _ in corpus]
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with slots:
+            await asyncio.sleep(delays[i])
+        return await analyze(corpus[i])
+
+    return await asyncio.gather(*(one(i) for i in range(len(corpus))))
+
+
+async def run(label, corpus, args, workers):
+    language_detection._cache = language_detection.LanguageCache()
+    if workers:
+        pipeline = TextPipeline(workers=workers)
+        # Warm the worker processes up so start-up cost is not counted as lag
+        await asyncio.gather(*(pipeline.process("warm up " * 5) for _ in range(workers)))
+        analyze = pipeline.process
+    else:
+        pipeline = None
+
+        async def analyze(text):
+            return analyze_description(text)
+
+    monitor = LoopLagMonitor(interval=0.01).start()
+    start = time.perf_counter()
+    results = await scrape(corpus, args.concurrency, args.nav_ms, analyze)
+    elapsed = time.perf_counter() - start
+    lag = await monitor.stop()
+    if pipeline:
+        await pipeline.close()
+    print(f"  {label:<26} {elapsed:6.2f}s  {len(corpus) / elapsed:6.1f} pages/s  "
+          f"lag p50 {lag['p50_ms']:6.1f}ms  p95 {lag['p95_ms']:6.1f}ms  max {lag['max_ms']:6.1f}ms")
+    return results
+
+
+async def main(args):
+    corpus = build_corpus(args.count, repeat_share=0.0)
+    print(f"{len(corpus)} descriptions, {args.concurrency} concurrent navigations of ~{args.nav_ms}ms:")
+    inline = await run("inline on the event loop", corpus, args, 0)
+    offloaded = await run(f"text pipeline ({args.workers} procs)", corpus, args, args.workers)
+    assert inline == offloaded, "pipeline results differ from inline analysis"
+    print("  results identical")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--nav-ms", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=2)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,263 @@
+"""
+End-to-end scan against recorded portal pages, with no network.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_scan [--rounds 3] [--roles 2] [--latency 0]
+                                    [--output benchmarks/baseline.json] [--compare OLD.json]
+
+A local server plays all four portals from benchmarks/fixtures: listing_*.html
+for search pages (card ids are varied per role and page, so every card is a new
+job) and detail_*.html for job pages. Each portal gets its own host
+(linkedin.localhost, ...; *.localhost resolves to the loopback address), and
+the portal URL templates are pointed at it through their environment overrides
+(LINKEDIN_URL, ...). Every round runs run_job_agent end to end in a fresh
+process and working directory, so the database, detail cache and reports
+start empty.
+
+Reported per round, and as the median over rounds in the JSON baseline:
+scan wall time, pages per second, peak RSS (the scan process, and the largest
+of its child processes: browsers and text pipeline workers), and DB write and
+export throughput in rows per second, taken from the scan's stage timings.
+Host rate limits are lifted for the local portals unless --rate-limited.
+Needs Chromium (`playwright install chromium`).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(REPO_ROOT, "benchmarks", "fixtures")
+
+# Environment override, fixture name and how a search (listing) path looks, per portal
+PORTALS = {
+    "LinkedIn": ("LINKEDIN_URL", "linkedin", lambda path: path.startswith("/jobs/search")),
+    "Stepstone": ("STEPSTONE_URL", "stepstone", lambda path: path.startswith("/jobs/")),
+    "Indeed": ("INDEED_URL", "indeed", lambda path: path == "/jobs"),
+    "StartupJobs": ("STARTUP_JOBS_URL", "startupjobs", lambda path: path == "/jobs"),
+}
+
+# Numbers compared against the previous baseline, and whether higher is better
+TRACKED = {
+    "wall_s": False, "pages_per_sec": True, "peak_rss_mb": False, "peak_child_rss_mb": False,
+    "db_rows_per_sec": True, "export_rows_per_sec": True,
+}
+
+
+def load_fixtures():
+    fixtures = {}
+    for _, name, _ in PORTALS.values():
+        with open(os.path.join(FIXTURES, f"listing_{name}.html"), encoding="utf-8") as f:
+            listing = f.read()
+        with open(os.path.join(FIXTURES, f"detail_{name}.html"), encoding="utf-8") as f:
+            detail = f.read()
+        fixtures[name] = (listing, detail)
+    return fixtures
+
+
+def start_server(latency=0.0):
+    fixtures = load_fixtures()
+    is_listing = {name: check for _, name, check in PORTALS.values()}
+    counters = {"requests": 0, "bytes": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            name = (self.headers.get("Host") or "").split(".")[0]
+            path = self.path.split("?")[0]
+            if name not in fixtures:
+                self.send_error(404)
+                return
+            listing, detail = fixtures[name]
+            if is_listing[name](path):
+                # Same cards, new ids for every role and page; LinkedIn links are absolute
+                salt = f"{zlib.crc32(self.path.encode()) % 100000:05d}"
+                body = re.sub(r"(?<=\D)(\d{7})(?=\D)", lambda m: m.group(1) + salt, listing)
+                body = body.replace("https://de.linkedin.com", f"http://linkedin.localhost:{self.server.server_port}")
+            else:
+                body = detail
+            data = body.encode()
+            if latency:
+                time.sleep(latency)
+            with lock:
+                counters["requests"] += 1
+                counters["bytes"] += len(data)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counters
+
+
+def portal_env(port):
+    """URL template overrides pointing every portal at its host on the fixture server."""
+    import config
+    env = {}
+    for variable, name, _ in PORTALS.values():
+        parts = urlsplit(getattr(config, variable))
+        env[variable] = urlunsplit(parts._replace(scheme="http", netloc=f"{name}.localhost:{port}"))
+    return env
+
+
+def _rss_mb(who):
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_scan(roles, location, language, rate_limited):
+    """One full scan in this process (--child). Returns its numbers."""
+    import config
+    if not rate_limited:
+        config.HOST_RATE_LIMITS["localhost"] = (1000.0, 1000)
+
+    from database import init_db, enqueue_scan, get_scan
+    from main import run_job_agent
+    from browser_pool import close_browser_pool
+    from text_pipeline import close_text_pipeline
+
+    init_db()
+    scan_id = enqueue_scan(roles, location, language)
+    start = time.perf_counter()
+    try:
+        await run_job_agent(roles=roles, location=location, language=language, scan_id=scan_id)
+    finally:
+        await close_browser_pool()
+        await close_text_pipeline()
+    wall = time.perf_counter() - start
+
+    scan = get_scan(scan_id)
+    metrics = json.loads(scan["metrics"]) if scan["metrics"] else {"stages": {}, "pages": 0}
+    stages = metrics["stages"]
+    jobs = scan["job_count"] or 0
+
+    def rows_per_sec(stage):
+        seconds = stages.get(stage, {}).get("total_s")
+        return round(jobs / seconds, 1) if jobs and seconds else 0.0
+
+    return {
+        "jobs": jobs,
+        "wall_s": round(wall, 3),
+        "pages": metrics["pages"],
+        "pages_per_sec": round(metrics["pages"] / wall, 3) if wall else 0.0,
+        "peak_rss_mb": _rss_mb(resource.RUSAGE_SELF),
+        "peak_child_rss_mb": _rss_mb(resource.RUSAGE_CHILDREN),
+        "db_rows_per_sec": rows_per_sec("db_write"),
+        "export_rows_per_sec": rows_per_sec("export"),
+        "stage_p95_ms": {stage: agg["p95_ms"] for stage, agg in stages.items()},
+    }
+
+
+def run_round(args, env):
+    """Runs one scan in a fresh process and working directory."""
+    command = [
+        sys.executable, "-m", "benchmarks.bench_scan", "--child",
+        "--roles", str(args.roles), "--location", args.location, "--language", args.language,
+    ]
+    if args.rate_limited:
+        command.append("--rate-limited")
+    with tempfile.TemporaryDirectory() as workdir:
+        proc = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("RESULT ")]
+    if proc.returncode != 0 or not lines:
+        sys.stderr.write(proc.stdout[-3000:] + proc.stderr[-3000:])
+        raise SystemExit(f"Scan round failed (exit code {proc.returncode})")
+    result = json.loads(lines[-1][len("RESULT "):])
+    if not result["jobs"]:
+        # Every portal failed, most likely the browser: not a number worth recording
+        sys.stderr.write(proc.stdout[-3000:])
+        raise SystemExit("Scan round found no jobs; is Chromium installed (`playwright install chromium`)?")
+    return result
+
+
+def compare(previous, current):
+    print(f"\nAgainst {previous['created']}:")
+    for key, higher_is_better in TRACKED.items():
+        old, new = previous["median"].get(key), current["median"].get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        better = (change > 0) == higher_is_better
+        print(f"  {key:<20} {old:>10} -> {new:<10} {change:+6.1f}% {'better' if better else 'worse' if change else ''}")
+
+
+def main(args):
+    import config
+    roles = config.ROLES[:args.roles]
+    server, counters = start_server(args.latency / 1000)
+    env = dict(os.environ, **portal_env(server.server_port))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    env.pop("VERCEL", None)
+
+    print(f"{args.rounds} rounds: {len(roles)} roles x {len(PORTALS)} portals, {args.latency} ms server latency")
+    runs = []
+    try:
+        for n in range(args.rounds):
+            counters.update(requests=0, bytes=0)
+            result = run_round(args, env)
+            result["requests_served"] = counters["requests"]
+            result["kib_served"] = round(counters["bytes"] / 1024, 1)
+            runs.append(result)
+            print(f"  round {n + 1}: {result['jobs']} jobs, {result['wall_s']}s, {result['pages_per_sec']} pages/s, "
+                  f"RSS {result['peak_rss_mb']} MiB (+{result['peak_child_rss_mb']} MiB child), "
+                  f"DB {result['db_rows_per_sec']} rows/s, export {result['export_rows_per_sec']} rows/s")
+    finally:
+        server.shutdown()
+
+    baseline = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {"rounds": args.rounds, "roles": roles, "portals": list(PORTALS),
+                     "latency_ms": args.latency, "rate_limited": args.rate_limited},
+        "median": {key: statistics.median(run[key] for run in runs) for key in ["jobs", "pages", *TRACKED]},
+        "runs": runs,
+    }
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--roles", type=int, default=2, help="first N of config.ROLES")
+    parser.add_argument("--location", default="Germany")
+    parser.add_argument("--language", default="Both")
+    parser.add_argument("--latency", type=float, default=0, help="ms the server waits before each response")
+    parser.add_argument("--rate-limited", action="store_true", help="keep HOST_RATE_LIMITS' default for the local hosts")
+    parser.add_argument("--output", default=os.path.join("benchmarks", "baseline.json"))
+    parser.add_argument("--compare", help="previous baseline to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import config
+        result = asyncio.run(run_scan(config.ROLES[:args.roles], args.location, args.language, args.rate_limited))
+        print("RESULT " + json.dumps(result))
+    else:
+        main(args)
@@ -0,0 +1,179 @@
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from metrics import span
+from config import HEADLESS, BROWSER_POOL_SIZE, CONTEXT_MAX_PAGES, USER_AGENT
+
+
+class _PortalContext:
+    """A browser context owned by one portal, plus its usage counters."""
+
+    def __init__(self, context, browser_index):
+        self.context = context
+        self.browser_index = browser_index
+        self.pages_opened = 0
+        self.open_pages = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """
+    Process-wide pool of Chromium browsers shared by all scrapers.
+
+    Browsers are launched once and reused across scans. Every portal gets its
+    own isolated context (cookies, storage) which is recycled after
+    `max_pages_per_context` pages; pages with JavaScript disabled get a second
+    context, since that is a context-level setting. A browser that crashed or disconnected is
+    relaunched transparently on the next request.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages_per_context=CONTEXT_MAX_PAGES, headless=HEADLESS):
+        self.size = max(1, size)
+        self.max_pages_per_context = max(1, max_pages_per_context)
+        self.headless = headless
+        self._playwright = None
+        self._browsers = [None] * self.size
+        self._contexts = {}
+        self._portal_slots = {}
+        self._page_entries = {}
+        self._lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self.stats = {"browser_launches": 0, "browser_restarts": 0, "contexts_created": 0, "pages_opened": 0}
+
+    async def start(self):
+        """Starts Playwright. Browsers themselves are launched lazily."""
+        async with self._start_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+        return self
+
+    async def close(self):
+        """Closes all contexts, browsers and the Playwright driver."""
+        async with self._lock:
+            for entry in self._contexts.values():
+                await self._close_context(entry)
+            self._contexts = {}
+            self._page_entries = {}
+            for browser in self._browsers:
+                if browser is not None and browser.is_connected():
+                    try:
+                        await browser.close()
+                    except Exception as e:
+                        print(f"Error closing browser: {e}")
+            self._browsers = [None] * self.size
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    def _slot_for(self, portal):
+        # Spread portals over the browsers round-robin, stable for the process lifetime
+        if portal not in self._portal_slots:
+            self._portal_slots[portal] = len(self._portal_slots) % self.size
+        return self._portal_slots[portal]
+
+    async def _get_browser(self, index):
+        browser = self._browsers[index]
+        if browser is not None and browser.is_connected():
+            return browser
+
+        if browser is not None:
+            print(f"Browser {index} disconnected, restarting it.")
+            self.stats["browser_restarts"] += 1
+            # Contexts of a dead browser are unusable, drop them
+            for key, entry in list(self._contexts.items()):
+                if entry.browser_index == index:
+                    del self._contexts[key]
+
+        await self.start()
+        with span("browser_launch"):
+            browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._browsers[index] = browser
+        self.stats["browser_launches"] += 1
+        return browser
+
+    async def _close_context(self, entry):
+        try:
+            await entry.context.close()
+        except Exception:
+            # The owning browser may already be gone
+            pass
+
+    async def _get_context(self, portal, javascript=True):
+        index = self._slot_for(portal)
+        browser = await self._get_browser(index)
+
+        key = (portal, javascript)
+        entry = self._contexts.get(key)
+        if entry is not None and entry.pages_opened >= self.max_pages_per_context:
+            entry.retired = True
+            if entry.open_pages == 0:
+                await self._close_context(entry)
+            entry = None
+
+        if entry is None:
+            context = await browser.new_context(user_agent=USER_AGENT, java_script_enabled=javascript)
+            entry = _PortalContext(context, index)
+            self._contexts[key] = entry
+            self.stats["contexts_created"] += 1
+        return entry
+
+    async def new_page(self, portal, javascript=True):
+        """Opens a new page in the portal's context. Release it with `release_page`."""
+        async with self._lock:
+            entry = await self._get_context(portal, javascript)
+            try:
+                page = await entry.context.new_page()
+            except Exception:
+                # Context or browser died between checks: start over with a fresh one
+                self._contexts.pop((portal, javascript), None)
+                entry = await self._get_context(portal, javascript)
+                page = await entry.context.new_page()
+            entry.pages_opened += 1
+            entry.open_pages += 1
+            self.stats["pages_opened"] += 1
+            self._page_entries[page] = entry
+        return page
+
+    async def release_page(self, page):
+        """Closes a page and disposes its context once it was retired and is idle."""
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception:
+            pass
+        async with self._lock:
+            entry = self._page_entries.pop(page, None)
+            if entry is None:
+                return
+            entry.open_pages -= 1
+            if entry.retired and entry.open_pages == 0:
+                await self._close_context(entry)
+
+    @asynccontextmanager
+    async def page(self, portal, javascript=True):
+        """`async with pool.page("LinkedIn") as page:` helper around new_page/release_page."""
+        page = await self.new_page(portal, javascript)
+        try:
+            yield page
+        finally:
+            await self.release_page(page)
+
+
+_pool = None
+
+
+async def get_browser_pool():
+    """Returns the shared BrowserPool, starting it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    await _pool.start()
+    return _pool
+
+
+async def close_browser_pool():
+    """Shuts the shared BrowserPool down (call on app shutdown / end of CLI run)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
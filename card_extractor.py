@@ -0,0 +1,30 @@
+# Runs in the page: one pass over the cards, plain strings back, no element handles
+_EXTRACT_JS = """
+({card, fields, limit}) => {
+    const read = (root, [selector, attr]) => {
+        const el = selector ? root.querySelector(selector) : root;
+        if (!el) return "";
+        return attr === "text" ? el.innerText : (el.getAttribute(attr) || "");
+    };
+    return Array.from(document.querySelectorAll(card)).slice(0, limit).map(root => {
+        const out = {};
+        for (const [name, field] of Object.entries(fields)) out[name] = read(root, field);
+        return out;
+    });
+}
+"""
+
+
+async def extract_cards(page, spec):
+    """
+    Reads every card of a listing page in a single `page.evaluate` round trip.
+
+    `spec` holds a card selector, an optional card limit and {field: (selector
+    within the card, "text" | attribute)}, see PortalAdapter.card_spec.
+    Returns one {field: str} dict per card; missing elements give "".
+    """
+    return await page.evaluate(_EXTRACT_JS, {
+        "card": spec["card"],
+        "fields": {name: list(field) for name, field in spec["fields"].items()},
+        "limit": spec.get("limit") or 10 ** 6,
+    })
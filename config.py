@@ -8,15 +8,238 @@ POSTED_LAST_24H = True
 # Scraping settings
 HEADLESS = True  # Set to False to see the browser in action
 REQUEST_TIMEOUT = 60000  # 60 seconds
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+# Browser pool settings (shared by all scrapers and the API server)
+BROWSER_POOL_SIZE = 2  # Chromium processes launched once per process
+CONTEXT_MAX_PAGES = 50  # Recycle a portal's browser context after this many pages
+
+# Detail page concurrency (open tabs at once)
+DETAIL_CONCURRENCY = {
+    "LinkedIn": 2,  # LinkedIn is quick to show the authwall when hit in parallel
+    "Stepstone": 4,
+    "Indeed": 3,
+    "StartupJobs": 4,
+}
+DETAIL_CONCURRENCY_DEFAULT = 3
+DETAIL_CONCURRENCY_GLOBAL = 10  # Cap across all portals
+
+# Scan scheduling: (role, portal) tasks running at once
+PORTAL_CONCURRENCY = {
+    "LinkedIn": 1,
+    "Stepstone": 2,
+    "Indeed": 2,
+    "StartupJobs": 2,
+}
+SCAN_CONCURRENCY = 6  # Cap across all portals
+
+# Navigation (navigation.py). Rate limits are (requests per second, burst) per host,
+# matched by domain suffix so e.g. www. and de.linkedin.com share one bucket.
+HOST_RATE_LIMITS = {
+    "linkedin.com": (0.5, 3),
+    "indeed.com": (1.0, 4),
+    "stepstone.de": (2.0, 5),
+    "startupjobs.com": (2.0, 5),
+}
+HOST_RATE_LIMIT_DEFAULT = (2.0, 5)
+NAV_RETRIES = 3  # Extra attempts after a timeout, 429 or 5xx response
+NAV_BACKOFF_BASE = 1.0  # Seconds before the first retry, doubled per attempt with +-50% jitter
+NAV_BACKOFF_MAX = 30.0
+CIRCUIT_BREAKER_THRESHOLD = 3  # Consecutive block pages (e.g. LinkedIn authwall) before a portal is paused
+CIRCUIT_BREAKER_COOLDOWN = 300  # Seconds a paused portal is skipped before one trial request
+
+# Detail page cache (SQLite file next to the jobs database)
+DETAIL_CACHE_ENABLED = True
+DETAIL_CACHE_TTL = 3 * 24 * 3600  # Seconds before a cached description is fetched again
+DETAIL_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Least recently used entries are evicted above this
+
+# SQLite tuning (applied to every connection in database.py)
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the DB file memory-mapped for reads
+SQLITE_CACHE_KB = 64 * 1024  # Page cache size per connection
+SQLITE_BUSY_TIMEOUT_MS = 5000  # Wait this long for a writer lock before failing
+
+# /api/stats responses are served from memory for this many seconds (0 = always read the DB)
+STATS_CACHE_TTL = 5
+
+# Language detection (language_detection.py)
+LANGDETECT_PREFIX_CHARS = 1000  # Only this many leading characters are sent to langdetect
+LANGDETECT_CACHE_SIZE = 20000  # Memoized results, keyed by content hash
+LANGDETECT_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Processes used by batch detection
+
+# Text pipeline: emails and language of fetched descriptions are derived in worker
+# processes so the scraping event loop is never blocked (0 = analyze inline)
+TEXT_PIPELINE_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+TEXT_PIPELINE_QUEUE_SIZE = 64  # Pending descriptions before scrapers wait for the workers
+LOOP_LAG_INTERVAL = 0.05  # Seconds between event loop lag samples
+
+# Server-Sent Events (events.py, /api/events)
+EVENT_QUEUE_SIZE = 256  # Undelivered events per client; a client that falls further behind is disconnected
+EVENT_HISTORY_SIZE = 1000  # Recent events replayed to clients reconnecting with Last-Event-ID
+EVENT_POLL_INTERVAL = 0.5  # Seconds between reads of the scan_events table by the API server
+EVENT_KEEP = 10000  # Rows kept in scan_events; older ones are pruned
+
+# Scan queue (worker.py): scans are queued in the database and run by worker processes
+SCAN_WORKERS_IN_PROCESS = 1  # Workers inside the API server itself (0 = only separate worker.py processes)
+SCAN_POLL_INTERVAL = 2.0  # Seconds an idle worker waits before checking the queue again
+SCAN_HEARTBEAT_INTERVAL = 30  # Seconds between heartbeats of a running scan
+SCAN_STALE_AFTER = 300  # A running scan without a heartbeat for this long is picked up by another worker
+
+# Keyword rules per target language, matched case-insensitively as substrings (language_rules.py)
+LANGUAGE_RULES = {
+    "English": {
+        # German as a hard requirement disqualifies a posting
+        "german_requirement": [
+            "deutsch als muttersprache", "deutschkenntnisse", "fluent german",
+            "level b2", "level c1", "voraussetzung: deutsch", "fließend deutsch",
+            "deutsch: verhandlungssicher",
+        ],
+        # Fallback for tech descriptions that langdetect might miss
+        "tech": [
+            "react", "frontend", "flutter", "angular", "javascript", "typescript", "node",
+            "experience", "requirements", "engineer", "developer",
+        ],
+        "mentions_deutsch": ["deutsch"],
+        "mentions_german": ["german"],
+    },
+    "German": {
+        "german_indicator": ["deutschkenntnisse", "deutsch", "voraussetzungen", "aufgaben", "kenntnisse"],
+        "mentions_deutsch": ["deutsch"],
+    },
+}
+
+# Known jobs: skip cards whose link is already in the jobs table
+SKIP_KNOWN_JOBS = True
+KNOWN_JOB_REFRESH_HOURS = 7 * 24  # Re-open known jobs not saved or refreshed for this long (None = never)
+
+# Incremental scans: each (role, location, language, portal) keeps a watermark, the start of its
+# last complete incremental run, and the next incremental scan only asks for postings since then
+INCREMENTAL_OVERLAP = 15 * 60  # Seconds added to the window; postings show up in search with a delay
+# Scans enqueued periodically by the scheduler (API server and `python worker.py --schedule`), e.g.
+# [{"roles": ROLES, "location": LOCATION, "language": "Both", "every_minutes": 60}]
+SCAN_SCHEDULE = []
 
 # Export settings
 if os.environ.get("VERCEL"):
     OUTPUT_FILENAME = "/tmp/jobs_report.xlsx"
+    REPORTS_DIR = "/tmp/reports"
 else:
     OUTPUT_FILENAME = "jobs_report.xlsx"
+    REPORTS_DIR = "reports"  # One report per scan: reports/jobs_report_<scan_id>.xlsx
+
+EXPORT_CHUNK_SIZE = 5000  # Rows fetched from the DB (and Parquet row group size) per chunk
+
+# Search URLs (Templates). Each can be overridden through an environment variable of the
+# same name, e.g. to point the portals at the offline fixture server (benchmarks/bench_scan.py)
+LINKEDIN_URL = os.environ.get("LINKEDIN_URL", "https://www.linkedin.com/jobs/search/?f_TPR=r86400&keywords={keyword}&location={location}")
+STEPSTONE_URL = os.environ.get("STEPSTONE_URL", "https://www.stepstone.de/jobs/{keyword}/in-{location}?radius=0&age=1")
+INDEED_URL = os.environ.get("INDEED_URL", "https://de.indeed.com/jobs?q={keyword}&l={location}&fromage=1")
+STARTUP_JOBS_URL = os.environ.get("STARTUP_JOBS_URL", "https://www.startupjobs.com/jobs?q={keyword}&l={location}")
+
+# Request interception (interception.py), applied to every listing and detail page.
+# PORTALS entries can override any key under "interception". Resource types are
+# Playwright's (document, stylesheet, image, media, font, script, xhr, fetch, ...);
+# blocked domains match the request host and its subdomains. With
+# detail_javascript off, detail pages load in a context with JavaScript disabled,
+# which only suits portals that render the description on the server.
+INTERCEPTION = {
+    "resource_types": ["image", "media", "font", "stylesheet", "texttrack", "manifest", "eventsource", "websocket"],
+    "blocked_domains": [
+        "google-analytics.com", "googletagmanager.com", "googleadservices.com", "googlesyndication.com",
+        "doubleclick.net", "adservice.google.com", "facebook.net", "connect.facebook.net",
+        "bat.bing.com", "clarity.ms", "hotjar.com", "hotjar.io", "segment.io", "segment.com",
+        "optimizely.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com",
+        "adnxs.com", "amazon-adsystem.com", "newrelic.com", "nr-data.net", "sentry.io",
+        "onetrust.com", "cookielaw.org", "usercentrics.eu", "px-cloud.net", "ads.linkedin.com",
+        "snap.licdn.com", "px.ads.linkedin.com",
+    ],
+    "detail_javascript": True,
+}
+# Per-page request and byte counters kept per portal (its most recent pages), served at /api/navigation
+INTERCEPTION_PAGES_KEPT = 50
 
-# Search URLs (Templates)
-LINKEDIN_URL = "https://www.linkedin.com/jobs/search/?f_TPR=r86400&keywords={keyword}&location={location}"
-STEPSTONE_URL = "https://www.stepstone.de/jobs/{keyword}/in-{location}?radius=0&age=1"
-INDEED_URL = "https://de.indeed.com/jobs?q={keyword}&l={location}&fromage=1"
-STARTUP_JOBS_URL = "https://www.startupjobs.com/jobs?q={keyword}&l={location}"
+# Job portals (portals.py). Every portal runs on the shared scraping engine (engine.py),
+# so adding one only takes an entry here:
+#   url / origin: search URL template and the prefix for relative links (default: the
+#     scheme and host of url)
+#   stealth: apply playwright-stealth to its pages; local_only: not scraped on Vercel
+#   card / fields: listing cards and, per field, (selector inside the card, "text" or an
+#     attribute name); filter_fields: card fields checked by the early language filter
+#   placeholder: stands in for an empty title or company
+#   description: detail page selectors, first match wins; skip_urls: detail pages that
+#     redirect to a URL containing one of these (login walls) are dropped
+#   pagination: query parameter selecting listing page n (0-based): first + n * step
+#   depth: listing pages to walk and cards to open at most. Walking stops early on an
+#     empty page or one whose cards are all known jobs.
+#   interception: overrides of the INTERCEPTION policy for this portal
+#   time_filter: query parameter limiting results to recent postings, used by incremental
+#     scans to ask only for the time since the last run: the value is template formatted
+#     with the window in `unit` seconds, rounded up to the next of `choices` if given
+#   newest_first: query parameters sorting results by date. Incremental scans of such
+#     portals stop at the first known link, since everything after it is older.
+PORTALS = {
+    "LinkedIn": {
+        "url": LINKEDIN_URL,
+        "stealth": True,
+        "local_only": True,
+        "card": ".base-card",
+        "fields": {
+            "title": (".base-search-card__title", "text"),
+            "company": (".base-search-card__subtitle", "text"),
+            "link": ("a.base-card__full-link", "href"),
+        },
+        "placeholder": "N/A",
+        "description": [".description__text", ".show-more-less-html__markup", "body"],
+        "skip_urls": ["authwall"],
+        # Guest job pages are server-rendered; without JS they also cannot bounce to the authwall
+        "interception": {"detail_javascript": False},
+        "pagination": {"param": "start", "first": 0, "step": 25},
+        "depth": {"pages": 2, "max_cards": 30},
+        "time_filter": {"param": "f_TPR", "template": "r{}", "unit": 1},
+        "newest_first": {"sortBy": "DD"},
+    },
+    "Stepstone": {
+        "url": STEPSTONE_URL,
+        "stealth": True,
+        "local_only": True,
+        "card": ".res-1v8vsm5",
+        "fields": {
+            "title": ("h2", "text"),
+            "company": (".res-v7zn8r", "text"),
+            "link": ("a", "href"),
+        },
+        "description": [".js-app-ld-ContentBlock", ".listing-content", "body"],
+        "pagination": {"param": "page", "first": 1, "step": 1},
+        "depth": {"pages": 3, "max_cards": 40},
+        "time_filter": {"param": "age", "template": "{}", "unit": 86400, "choices": [1, 7]},
+    },
+    "Indeed": {
+        "url": INDEED_URL,
+        "stealth": True,
+        "card": ".job_seen_beacon",
+        "fields": {
+            "title": ("h2.jobTitle", "text"),
+            "company": ("[data-testid='company-name']", "text"),
+            "link": ("h2.jobTitle a", "href"),
+            "snippet": (".job-snippet", "text"),
+        },
+        "filter_fields": ["title", "snippet"],  # Indeed's snippets make the early filter very effective
+        "description": ["#jobDescriptionText", "body"],
+        "pagination": {"param": "start", "first": 0, "step": 10},
+        "depth": {"pages": 3, "max_cards": 40},
+        "time_filter": {"param": "fromage", "template": "{}", "unit": 86400, "choices": [1, 3, 7, 14]},
+        "newest_first": {"sort": "date"},
+    },
+    "StartupJobs": {
+        "url": STARTUP_JOBS_URL,
+        "card": ".job-list-item",
+        "fields": {
+            "title": (".job-list-item-title", "text"),
+            "company": (".job-list-item-company", "text"),
+            "link": ("a", "href"),
+        },
+        "description": [".job-description", "body"],
+        "pagination": {"param": "page", "first": 1, "step": 1},
+        "depth": {"pages": 3, "max_cards": 40},
+    },
+}
+PORTAL_DEPTH_DEFAULT = {"pages": 1, "max_cards": 8}
@@ -1,113 +1,675 @@
+import json
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from utils import normalize_link
+from config import SQLITE_MMAP_SIZE, SQLITE_CACHE_KB, SQLITE_BUSY_TIMEOUT_MS
 
 if os.environ.get("VERCEL"):
     DB_PATH = "/tmp/jobs_agent.db"
 else:
     DB_PATH = "jobs_agent.db"
 
-def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
+_local = threading.local()
+
+def _configure_connection(conn):
+    """Applies WAL journaling and the tuned pragmas to a new connection."""
     conn.row_factory = sqlite3.Row
+    # WAL lets /api readers proceed while a scan is writing
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={int(SQLITE_MMAP_SIZE)}")
+    conn.execute(f"PRAGMA cache_size=-{int(SQLITE_CACHE_KB)}")
+    conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT_MS)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
     return conn
 
+def get_db_connection():
+    """Opens a new, tuned connection. Prefer `db_connection()` which reuses one per thread."""
+    return _configure_connection(sqlite3.connect(DB_PATH, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000))
+
+@contextmanager
+def db_connection():
+    """
+    Yields this thread's long-lived connection and commits on success (rolls back on error).
+    The connection is reopened when DB_PATH changes or after a fork.
+    """
+    key = (os.getpid(), DB_PATH)
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "key", None) != key:
+        conn = get_db_connection()
+        _local.conn = conn
+        _local.key = key
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def close_db_connection():
+    """Closes this thread's cached connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+        _local.key = None
+
 def init_db():
     """Initializes the database and creates tables if they don't exist."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Jobs Table
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Jobs Table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            company TEXT,
+            location TEXT,
+            link TEXT UNIQUE,
+            emails TEXT,
+            source TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'new',
+            description TEXT
+        )
+        ''')
+        # Databases created before descriptions were stored
+        columns = {row['name'] for row in cursor.execute('PRAGMA table_info(jobs)')}
+        if 'description' not in columns:
+            cursor.execute('ALTER TABLE jobs ADD COLUMN description TEXT')
+        # When a known job was last fetched again (KNOWN_JOB_REFRESH_HOURS); NULL until its first refresh
+        if 'refreshed_at' not in columns:
+            cursor.execute('ALTER TABLE jobs ADD COLUMN refreshed_at TIMESTAMP')
+        
+        # Scans Table
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            roles TEXT,
+            location TEXT,
+            language TEXT,
+            job_count INTEGER,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        # Scan queue state (worker.py). Rows logged before the queue existed are finished scans.
+        columns = {row['name'] for row in cursor.execute('PRAGMA table_info(scans)')}
+        for column, definition in SCAN_QUEUE_COLUMNS.items():
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE scans ADD COLUMN {column} {definition}')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_scans_status ON scans(status, id)')
+
+        # Incremental scans: when each (role, location, language, portal) last completed, as a Unix
+        # timestamp. Watermarks from before the language was part of the key may come from a scan
+        # that dropped postings of another language; they are discarded, so the next run starts over.
+        columns = {row['name'] for row in cursor.execute('PRAGMA table_info(scan_watermarks)')}
+        if columns and 'language' not in columns:
+            cursor.execute('DROP TABLE scan_watermarks')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_watermarks (
+            role TEXT NOT NULL,
+            location TEXT NOT NULL,
+            language TEXT NOT NULL,
+            portal TEXT NOT NULL,
+            since REAL NOT NULL,
+            scan_id INTEGER,
+            PRIMARY KEY (role, location, language, portal)
+        )
+        ''')
+
+        # Progress and new-job events written by workers, tailed by the API server for /api/events
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scan_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_id INTEGER,
+            type TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        # Indexes for /api/jobs: newest-first listing and the filters it supports
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at DESC, id DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source, created_at DESC, id DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at DESC, id DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs(company)')
+
+        # Stats counters, kept current by save_jobs/log_scan/finish_scan so /api/stats never counts rows
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        # Per-row insert triggers cost four upserts per job; their counts also included queued scans
+        legacy_triggers = cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ('stats_jobs_insert', 'stats_scans_insert')"
+        ).fetchone()[0]
+        cursor.execute('DROP TRIGGER IF EXISTS stats_jobs_insert')
+        cursor.execute('DROP TRIGGER IF EXISTS stats_scans_insert')
+        for statement in STATS_TRIGGERS:
+            cursor.execute(statement)
+        if legacy_triggers or cursor.execute('SELECT COUNT(*) FROM stats_counters').fetchone()[0] == 0:
+            rebuild_stats(cursor)
+
+        # Full-text index over title, company and description (external content: the jobs table)
+        fts_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+        ).fetchone()
+        cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            title, company, description,
+            content='jobs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        ''')
+        # New rows are indexed per batch by save_jobs (FTS_JOBS_SYNC) instead of by a row trigger;
+        # the update trigger is recreated so databases get its WHEN clause
+        cursor.execute('DROP TRIGGER IF EXISTS jobs_fts_insert')
+        cursor.execute('DROP TRIGGER IF EXISTS jobs_fts_update')
+        for statement in FTS_TRIGGERS:
+            cursor.execute(statement)
+        if not fts_exists:
+            cursor.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+        # Schema version 1: links stored in normalized form (cards are looked up by normalize_link)
+        if cursor.execute('PRAGMA user_version').fetchone()[0] < 1:
+            normalize_stored_links(cursor)
+            cursor.execute('PRAGMA user_version = 1')
+
+# Counter names: 'jobs', 'scans', 'source:<source>', 'status:<status>', 'day:<YYYY-MM-DD>'
+_BUMP = "INSERT INTO stats_counters (name, value) VALUES ({name}, {delta}) ON CONFLICT(name) DO UPDATE SET value = value + {delta};"
+
+def _bump(name, delta):
+    return _BUMP.format(name=name, delta=delta)
+
+# Inserts are counted per batch by save_jobs (STATS_JOBS_DELTA), finished scans by
+# log_scan/finish_scan; only the rare deletes and status changes use triggers
+STATS_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS stats_jobs_delete AFTER DELETE ON jobs BEGIN
+        {_bump("'jobs'", -1)}
+        {_bump("'source:' || COALESCE(OLD.source, 'unknown')", -1)}
+        {_bump("'status:' || COALESCE(OLD.status, 'new')", -1)}
+        {_bump("'day:' || date(OLD.created_at)", -1)}
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS stats_jobs_update AFTER UPDATE OF source, status ON jobs BEGIN
+        {_bump("'source:' || COALESCE(OLD.source, 'unknown')", -1)}
+        {_bump("'source:' || COALESCE(NEW.source, 'unknown')", 1)}
+        {_bump("'status:' || COALESCE(OLD.status, 'new')", -1)}
+        {_bump("'status:' || COALESCE(NEW.status, 'new')", 1)}
+    END
+    ''',
+]
+
+# One grouped upsert for all jobs inserted after the given id
+STATS_JOBS_DELTA = '''
+INSERT INTO stats_counters (name, value)
+SELECT name, COUNT(*) FROM (
+    SELECT 'jobs' AS name FROM jobs WHERE id > :after
+    UNION ALL SELECT 'source:' || COALESCE(source, 'unknown') FROM jobs WHERE id > :after
+    UNION ALL SELECT 'status:' || COALESCE(status, 'new') FROM jobs WHERE id > :after
+    UNION ALL SELECT 'day:' || date(created_at) FROM jobs WHERE id > :after
+)
+GROUP BY name
+ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+'''
+
+# Indexes all jobs inserted after the given id in one statement
+FTS_JOBS_SYNC = '''
+INSERT INTO jobs_fts (rowid, title, company, description)
+SELECT id, title, company, description FROM jobs WHERE id > :after
+'''
+
+FTS_TRIGGERS = [
+    '''
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.company, OLD.description);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, description ON jobs
+    -- Refreshes mostly store the same description again; skip re-indexing those
+    WHEN OLD.title IS NOT NEW.title OR OLD.company IS NOT NEW.company OR OLD.description IS NOT NEW.description
+    BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, title, company, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.company, OLD.description);
+        INSERT INTO jobs_fts (rowid, title, company, description)
+        VALUES (NEW.id, NEW.title, NEW.company, NEW.description);
+    END
+    ''',
+]
+
+def rebuild_stats(cursor):
+    """Recomputes every stats counter from the jobs and scans tables (used once to backfill)."""
+    cursor.execute('DELETE FROM stats_counters')
     cursor.execute('''
-    CREATE TABLE IF NOT EXISTS jobs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT NOT NULL,
-        company TEXT,
-        location TEXT,
-        link TEXT UNIQUE,
-        emails TEXT,
-        source TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        status TEXT DEFAULT 'new'
-    )
+    INSERT INTO stats_counters (name, value)
+    SELECT 'jobs', COUNT(*) FROM jobs
+    UNION ALL SELECT 'scans', COUNT(*) FROM scans WHERE status = 'done'
+    UNION ALL SELECT 'source:' || COALESCE(source, 'unknown'), COUNT(*) FROM jobs GROUP BY 1
+    UNION ALL SELECT 'status:' || COALESCE(status, 'new'), COUNT(*) FROM jobs GROUP BY 1
+    UNION ALL SELECT 'day:' || date(created_at), COUNT(*) FROM jobs GROUP BY 1
     ''')
-    
-    # Scans Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS scans (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        roles TEXT,
-        location TEXT,
-        language TEXT,
-        job_count INTEGER,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+
+def normalize_stored_links(cursor):
+    """
+    Rewrites stored job links to their normalize_link form, so jobs saved with tracking
+    parameters are found by the known-link check. Rows that turn out to be the same posting
+    are merged into the oldest one, which takes over a missing description or emails and a
+    status other than 'new' from the others. Returns the number of rows merged away.
+    """
+    groups = {}
+    for row in cursor.execute('SELECT id, link, emails, description, status FROM jobs ORDER BY id'):
+        if row['link']:
+            groups.setdefault(normalize_link(row['link']), []).append(dict(row))
+
+    merged = 0
+    for link, rows in groups.items():
+        if len(rows) == 1 and rows[0]['link'] == link:
+            continue
+        keep, duplicates = rows[0], rows[1:]
+        for row in reversed(duplicates):  # Newest first
+            keep['description'] = keep['description'] or row['description']
+            keep['emails'] = keep['emails'] or row['emails']
+            if keep['status'] in (None, 'new'):
+                keep['status'] = row['status']
+        if duplicates:
+            cursor.executemany('DELETE FROM jobs WHERE id = ?', [(row['id'],) for row in duplicates])
+            merged += len(duplicates)
+        cursor.execute(
+            'UPDATE jobs SET link = ?, emails = ?, description = ?, status = ? WHERE id = ?',
+            (link, keep['emails'], keep['description'], keep['status'], keep['id']),
+        )
+    if merged:
+        print(f"Merged {merged} jobs stored under links that only differed in tracking parameters.")
+    return merged
+
+def _job_row(job):
+    # Convert emails list to string
+    emails_str = "\n".join(job.get('emails', [])) if isinstance(job.get('emails'), list) else job.get('emails', '')
+    return (
+        job.get('title'),
+        job.get('company'),
+        job.get('location'),
+        job.get('link'),
+        emails_str,
+        job.get('source'),
+        job.get('description')
     )
-    ''')
-    
-    conn.commit()
-    conn.close()
 
 def save_jobs(jobs_list):
-    """Saves a list of job dictionaries to the database."""
+    """
+    Saves a list of job dictionaries in one transaction. New links are inserted; links
+    already stored were fetched again (a refresh), so their description and emails are
+    updated and refreshed_at is set.
+    Returns {"inserted": n, "refreshed": r, "ignored": m, "invalid": k}; ignored jobs are
+    duplicates within the list, invalid ones lack a title and are not saved.
+    """
     if not jobs_list:
-        return
+        return {"inserted": 0, "refreshed": 0, "ignored": 0, "invalid": 0}
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    new_jobs_count = 0
+    rows = []
     for job in jobs_list:
-        try:
-            # Convert emails list to string
-            emails_str = "\n".join(job.get('emails', [])) if isinstance(job.get('emails'), list) else job.get('emails', '')
-            
-            cursor.execute('''
-            INSERT OR IGNORE INTO jobs (title, company, location, link, emails, source)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                job.get('title'),
-                job.get('company'),
-                job.get('location'),
-                job.get('link'),
-                emails_str,
-                job.get('source')
-            ))
-            if cursor.rowcount > 0:
-                new_jobs_count += 1
-        except Exception as e:
-            print(f"Error saving job {job.get('title')}: {e}")
-            
-    conn.commit()
-    conn.close()
-    return new_jobs_count
+        if not job.get('title'):
+            print(f"Error saving job {job.get('link')}: missing title")
+            continue
+        rows.append(_job_row(job))
+    if not rows:
+        return {"inserted": 0, "refreshed": 0, "ignored": 0, "invalid": len(jobs_list)}
+
+    # The first row of a link wins; later duplicates in the list are ignored
+    seen = set()
+    unique = [row for row in rows if not (row[3] in seen or seen.add(row[3]))]
+    known = get_known_links([row[3] for row in unique])
+    with db_connection() as conn:
+        # Take the write lock first: every id above last_id is then one of this batch's rows
+        conn.execute('BEGIN IMMEDIATE')
+        last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM jobs').fetchone()[0]
+        # rowcount of an executemany sums the rows changed by each statement; unlike
+        # total_changes it does not count rows the FTS update trigger writes
+        inserted = conn.executemany('''
+        INSERT OR IGNORE INTO jobs (title, company, location, link, emails, source, description)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [row for row in unique if row[3] not in known]).rowcount
+        refreshed = conn.executemany('''
+        UPDATE jobs SET emails = ?, description = COALESCE(?, description), refreshed_at = CURRENT_TIMESTAMP
+        WHERE link = ?
+        ''', [(row[4], row[6], row[3]) for row in unique if row[3] in known]).rowcount
+        if inserted:
+            conn.execute(FTS_JOBS_SYNC, {"after": last_id})
+            conn.execute(STATS_JOBS_DELTA, {"after": last_id})
+
+    return {
+        "inserted": inserted,
+        "refreshed": refreshed,
+        "ignored": len(rows) - inserted - refreshed,
+        "invalid": len(jobs_list) - len(rows),
+    }
+
+def get_known_links(links, refresh_after_hours=None):
+    """
+    Returns the subset of `links` already stored in the jobs table.
+    With `refresh_after_hours`, jobs not saved or refreshed within that many hours are not
+    reported as known, so they get fetched again (and save_jobs refreshes them).
+    """
+    links = list({link for link in links if link})
+    if not links:
+        return set()
+
+    known = set()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        # Stay well below SQLite's bound-variable limit
+        for i in range(0, len(links), 500):
+            chunk = links[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            query = f'SELECT link FROM jobs WHERE link IN ({placeholders})'
+            params = list(chunk)
+            if refresh_after_hours is not None:
+                query += " AND COALESCE(refreshed_at, created_at) >= datetime('now', ?)"
+                params.append(f"-{refresh_after_hours} hours")
+            cursor.execute(query, params)
+            known.update(row['link'] for row in cursor.fetchall())
+    return known
+
+SCAN_QUEUE_COLUMNS = {
+    "status": "TEXT DEFAULT 'done'",  # queued, running, done, failed
+    "progress": "INTEGER DEFAULT 100",
+    "message": "TEXT",
+    "current_role": "TEXT",
+    "worker": "TEXT",
+    "error": "TEXT",
+    "report": "TEXT",
+    "started_at": "TIMESTAMP",
+    "finished_at": "TIMESTAMP",
+    "heartbeat_at": "TIMESTAMP",
+    "incremental": "INTEGER DEFAULT 0",  # Only ask portals for postings since the last run
+    "metrics": "TEXT",  # JSON stage timings (metrics.py)
+}
 
 def log_scan(roles, location, language, count):
-    """Logs a search session."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-    INSERT INTO scans (roles, location, language, job_count)
-    VALUES (?, ?, ?, ?)
-    ''', (", ".join(roles), location, language, count))
-    conn.commit()
-    conn.close()
+    """Logs a finished search session and returns its scan id."""
+    with db_connection() as conn:
+        cursor = conn.execute('''
+        INSERT INTO scans (roles, location, language, job_count)
+        VALUES (?, ?, ?, ?)
+        ''', (", ".join(roles), location, language, count))
+        conn.execute(_bump("'scans'", 1))
+    return cursor.lastrowid
+
+def enqueue_scan(roles, location, language, incremental=False):
+    """Queues a scan for the workers and returns its scan id."""
+    with db_connection() as conn:
+        cursor = conn.execute('''
+        INSERT INTO scans (roles, location, language, job_count, status, progress, message, incremental)
+        VALUES (?, ?, ?, 0, 'queued', 0, 'Queued', ?)
+        ''', (", ".join(roles), location, language, int(incremental)))
+    return cursor.lastrowid
+
+def enqueue_scheduled_scan(roles, location, language, every_seconds):
+    """
+    Queues an incremental scan unless the same one is queued, running or was queued
+    less than `every_seconds` ago. Returns the new scan id, or None. The check and the
+    insert are one statement, so schedulers sharing the database never queue a scan twice.
+    """
+    roles = ", ".join(roles)
+    with db_connection() as conn:
+        row = conn.execute('''
+        INSERT INTO scans (roles, location, language, job_count, status, progress, message, incremental)
+        SELECT ?, ?, ?, 0, 'queued', 0, 'Queued', 1
+        WHERE NOT EXISTS (
+            SELECT 1 FROM scans
+            WHERE roles = ? AND location = ? AND language = ? AND incremental = 1
+              AND (status IN ('queued', 'running') OR timestamp > datetime('now', ?))
+        )
+        RETURNING id
+        ''', (roles, location, language, roles, location, language, f"-{int(every_seconds)} seconds")).fetchone()
+    return row[0] if row else None
+
+def get_watermarks(roles, location, language):
+    """{(role, portal): since} for the given roles in a location, for scans with this language filter."""
+    placeholders = ", ".join("?" for _ in roles)
+    with db_connection() as conn:
+        rows = conn.execute(
+            f'SELECT role, portal, since FROM scan_watermarks WHERE location = ? AND language = ? AND role IN ({placeholders})',
+            (location, language, *roles),
+        ).fetchall()
+    return {(row['role'], row['portal']): row['since'] for row in rows}
+
+def set_watermark(role, location, language, portal, since, scan_id=None):
+    """Records that `portal` has been read for `role` in `location` with the `language` filter up to `since`."""
+    with db_connection() as conn:
+        conn.execute('''
+        INSERT INTO scan_watermarks (role, location, language, portal, since, scan_id) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(role, location, language, portal) DO UPDATE SET since = MAX(since, excluded.since), scan_id = excluded.scan_id
+        ''', (role, location, language, portal, since, scan_id))
+
+def claim_scan(worker, stale_after_seconds):
+    """
+    Atomically hands the oldest queued scan to `worker` and returns it (None if the
+    queue is empty). Running scans whose worker stopped heartbeating are reclaimed.
+    """
+    with db_connection() as conn:
+        row = conn.execute('''
+        UPDATE scans
+        SET status = 'running', worker = ?, message = 'Starting...', progress = 0,
+            started_at = CURRENT_TIMESTAMP, heartbeat_at = CURRENT_TIMESTAMP
+        WHERE id = (
+            SELECT id FROM scans
+            WHERE status = 'queued'
+               OR (status = 'running' AND heartbeat_at < datetime('now', ?))
+            ORDER BY id LIMIT 1
+        )
+        RETURNING *
+        ''', (worker, f"-{int(stale_after_seconds)} seconds")).fetchone()
+    return dict(row) if row else None
+
+def update_scan(scan_id, **fields):
+    """Updates a running scan's progress columns and its heartbeat."""
+    assignments = "".join(f"{column} = ?, " for column in fields)
+    with db_connection() as conn:
+        conn.execute(
+            f'UPDATE scans SET {assignments}heartbeat_at = CURRENT_TIMESTAMP WHERE id = ?',
+            (*fields.values(), scan_id),
+        )
+
+def finish_scan(scan_id, status, job_count=0, report=None, message=None, error=None):
+    """Marks a scan done or failed. Only done scans count towards the scans stats counter."""
+    with db_connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        previous = conn.execute('SELECT status FROM scans WHERE id = ?', (scan_id,)).fetchone()
+        conn.execute('''
+        UPDATE scans
+        SET status = ?, job_count = ?, report = ?, message = ?, error = ?, progress = 100,
+            finished_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+        ''', (status, job_count, report, message, error, scan_id))
+        if previous and previous['status'] != 'done' and status == 'done':
+            conn.execute(_bump("'scans'", 1))
+
+def save_scan_metrics(scan_id, metrics):
+    with db_connection() as conn:
+        conn.execute('UPDATE scans SET metrics = ? WHERE id = ?', (json.dumps(metrics), scan_id))
+
+def latest_scan_metrics():
+    """(scan_id, metrics) of the most recent scan that recorded metrics, or None."""
+    with db_connection() as conn:
+        row = conn.execute('SELECT id, metrics FROM scans WHERE metrics IS NOT NULL ORDER BY id DESC LIMIT 1').fetchone()
+    return (row['id'], json.loads(row['metrics'])) if row else None
+
+def count_scans_by_status():
+    with db_connection() as conn:
+        rows = conn.execute('SELECT status, COUNT(*) AS n FROM scans GROUP BY status').fetchall()
+    return {row['status']: row['n'] for row in rows}
+
+def get_scan(scan_id):
+    with db_connection() as conn:
+        row = conn.execute('SELECT * FROM scans WHERE id = ?', (scan_id,)).fetchone()
+    return dict(row) if row else None
+
+def list_scans(limit=20, status=None):
+    """Most recent scans first, optionally only those with the given status."""
+    query = 'SELECT * FROM scans'
+    params = []
+    if status:
+        query += ' WHERE status = ?'
+        params.append(status)
+    query += ' ORDER BY id DESC LIMIT ?'
+    params.append(limit)
+    with db_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [dict(row) for row in rows]
+
+def add_scan_event(scan_id, event_type, data):
+    with db_connection() as conn:
+        conn.execute(
+            'INSERT INTO scan_events (scan_id, type, data) VALUES (?, ?, ?)',
+            (scan_id, event_type, json.dumps(data, default=str)),
+        )
+
+def get_scan_events(after_id, limit=500):
+    """Events with an id above `after_id`, oldest first, as (id, type, data) tuples."""
+    with db_connection() as conn:
+        rows = conn.execute(
+            'SELECT id, type, data FROM scan_events WHERE id > ? ORDER BY id LIMIT ?', (after_id, limit)
+        ).fetchall()
+    return [(row['id'], row['type'], json.loads(row['data'])) for row in rows]
+
+def last_scan_event_id():
+    with db_connection() as conn:
+        return conn.execute('SELECT COALESCE(MAX(id), 0) FROM scan_events').fetchone()[0]
+
+def prune_scan_events(keep):
+    """Deletes all but the newest `keep` events."""
+    with db_connection() as conn:
+        conn.execute('DELETE FROM scan_events WHERE id <= (SELECT MAX(id) FROM scan_events) - ?', (keep,))
 
 def get_all_jobs(limit=100):
     """Returns all jobs from the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,))
-    rows = cursor.fetchall()
-    conn.close()
+    with db_connection() as conn:
+        rows = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC, id DESC LIMIT ?', (limit,)).fetchall()
     return [dict(row) for row in rows]
 
-def get_stats():
-    """Returns basic stats about the database."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT COUNT(*) as total FROM jobs')
-    total_jobs = cursor.fetchone()['total']
-    cursor.execute('SELECT COUNT(*) as total FROM scans')
-    total_scans = cursor.fetchone()['total']
-    conn.close()
-    return {"total_jobs": total_jobs, "total_scans": total_scans}
+def iter_jobs(chunk_size=1000):
+    """Yields every job row (sqlite3.Row), newest first, fetching `chunk_size` rows at a time."""
+    with db_connection() as conn:
+        cursor = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC, id DESC')
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+
+def encode_cursor(job):
+    """Builds the `after` token pointing just past the given job row."""
+    return f"{job['created_at']},{job['id']}"
+
+def decode_cursor(after):
+    """Parses an `after=<created_at,id>` token. Raises ValueError when malformed."""
+    created_at, _, job_id = after.rpartition(",")
+    if not created_at or not job_id.isdigit():
+        raise ValueError(f"Invalid cursor: {after!r}")
+    return created_at, int(job_id)
+
+def get_jobs_page(limit=50, after=None, source=None, status=None, since=None, until=None):
+    """
+    Returns one page of jobs, newest first, using keyset pagination.
+    `after` is the `next_cursor` of the previous page; `since`/`until` bound created_at
+    (inclusive/exclusive, e.g. "2026-10-01" or "2026-10-01 12:00:00").
+    Every page is an index range scan, so deep pages cost the same as the first.
+    """
+    conditions = []
+    params = []
+    if after:
+        created_at, job_id = decode_cursor(after)
+        conditions.append('(created_at, id) < (?, ?)')
+        params.extend([created_at, job_id])
+    if source:
+        conditions.append('source = ?')
+        params.append(source)
+    if status:
+        conditions.append('status = ?')
+        params.append(status)
+    if since:
+        conditions.append('created_at >= ?')
+        params.append(since)
+    if until:
+        conditions.append('created_at < ?')
+        params.append(until)
+
+    query = 'SELECT * FROM jobs'
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+    # Fetch one extra row to know whether another page exists
+    params.append(limit + 1)
+
+    with db_connection() as conn:
+        rows = [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    jobs = rows[:limit]
+    next_cursor = encode_cursor(jobs[-1]) if len(rows) > limit else None
+    return {"jobs": jobs, "next_cursor": next_cursor}
+
+def _fts_query(q):
+    """Turns free text into an FTS5 query: every term quoted (no syntax errors), all terms required."""
+    terms = [term.replace('"', '""') for term in q.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+def search_jobs(q, limit=20, offset=0):
+    """
+    Full-text search over title, company and description, best matches first.
+    Title hits weigh more than company hits, which weigh more than description hits.
+    Returns {"results": [...], "next_offset": n or None}; each result carries a highlighted `snippet`.
+    """
+    match = _fts_query(q or "")
+    if not match:
+        return {"results": [], "next_offset": None}
+
+    with db_connection() as conn:
+        rows = conn.execute('''
+        SELECT jobs.id, jobs.title, jobs.company, jobs.location, jobs.link, jobs.emails,
+               jobs.source, jobs.status, jobs.created_at,
+               snippet(jobs_fts, 2, '<mark>', '</mark>', '…', 16) AS snippet,
+               bm25(jobs_fts, 10.0, 5.0, 1.0) AS rank
+        FROM jobs_fts
+        JOIN jobs ON jobs.id = jobs_fts.rowid
+        WHERE jobs_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+        ''', (match, limit + 1, offset)).fetchall()
+
+    results = [dict(row) for row in rows[:limit]]
+    next_offset = offset + limit if len(rows) > limit else None
+    return {"results": results, "next_offset": next_offset}
+
+def get_stats(days=30):
+    """
+    Returns totals plus per-source, per-status and per-day (last `days` days) breakdowns.
+    Reads the stats_counters table, so the cost does not grow with the jobs table.
+    """
+    with db_connection() as conn:
+        rows = conn.execute(
+            "SELECT name, value FROM stats_counters WHERE name NOT LIKE 'day:%' OR name >= 'day:' || date('now', ?)",
+            (f"-{days} days",)
+        ).fetchall()
+
+    stats = {"total_jobs": 0, "total_scans": 0, "by_source": {}, "by_status": {}, "by_day": {}}
+    for row in rows:
+        name, value = row['name'], row['value']
+        if name == 'jobs':
+            stats["total_jobs"] = value
+        elif name == 'scans':
+            stats["total_scans"] = value
+        elif value:
+            kind, _, key = name.partition(':')
+            stats[f"by_{kind}"][key] = value
+    return stats
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from database import DB_PATH, _configure_connection
+from utils import normalize_link
+from config import DETAIL_CACHE_ENABLED, DETAIL_CACHE_TTL, DETAIL_CACHE_MAX_BYTES, SQLITE_BUSY_TIMEOUT_MS
+
+CACHE_PATH = os.path.join(os.path.dirname(DB_PATH), "detail_cache.db")
+
+
+class DetailCache:
+    """
+    On-disk cache of fetched job descriptions and the fields derived from them.
+
+    Entries are keyed by the normalized job link, expire after `ttl` seconds and
+    the least recently used ones are evicted once the stored text exceeds
+    `max_bytes`. Hit/miss counters cover the lifetime of the process.
+
+    The file is shared by every worker process, so it uses the jobs database's
+    WAL setup. Hits only note their access time in memory; those are written in
+    batches together with the next store. A locked or failing cache counts as a
+    miss and never fails the scrape. The engine calls it from worker threads, so
+    one lock serializes the shared connection.
+    """
+
+    ACCESS_FLUSH_SIZE = 100  # Pending access times written at once, if no store comes first
+
+    def __init__(self, path=CACHE_PATH, ttl=DETAIL_CACHE_TTL, max_bytes=DETAIL_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._accessed = {}  # link -> last access time not yet written
+        self._lock = threading.Lock()
+        self.conn = _configure_connection(
+            sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        )
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS detail_cache (
+            link TEXT PRIMARY KEY,
+            description TEXT,
+            emails TEXT,
+            language TEXT,
+            size INTEGER,
+            fetched_at REAL,
+            last_access REAL
+        )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_detail_cache_last_access ON detail_cache(last_access)')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM detail_cache').fetchone()[0]
+
+    def get(self, link):
+        """Returns the cached detail dict for a link, or None on a miss or expired entry."""
+        with self._lock:
+            return self._get(normalize_link(link))
+
+    def _get(self, key):
+        try:
+            row = self.conn.execute(
+                'SELECT description, emails, language, fetched_at FROM detail_cache WHERE link = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Detail cache read failed: {e}")
+            row = None
+        now = time.time()
+        if row is None or now - row['fetched_at'] > self.ttl:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._accessed[key] = now
+        if len(self._accessed) >= self.ACCESS_FLUSH_SIZE:
+            try:
+                self._flush_access()
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"Detail cache write failed: {e}")
+        return {
+            "description": row['description'],
+            "emails": json.loads(row['emails']),
+            "language": row['language'],
+        }
+
+    def _flush_access(self):
+        if self._accessed:
+            self.conn.executemany(
+                'UPDATE detail_cache SET last_access = ? WHERE link = ?',
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed = {}
+
+    def put(self, link, detail):
+        """Stores an analyzed detail ({"description", "emails", "language"}) and returns it."""
+        with self._lock:
+            return self._put(normalize_link(link), detail)
+
+    def _put(self, key, detail):
+        description = detail["description"]
+        size = len(description.encode("utf-8"))
+        now = time.time()
+
+        try:
+            old = self.conn.execute('SELECT size FROM detail_cache WHERE link = ?', (key,)).fetchone()
+            self.conn.execute('''
+            INSERT OR REPLACE INTO detail_cache (link, description, emails, language, size, fetched_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (key, description, json.dumps(detail["emails"]), detail["language"], size, now, now))
+            self._flush_access()
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Detail cache write failed: {e}")
+            return detail
+        self.total_bytes += size - (old['size'] if old else 0)
+
+        if self.total_bytes > self.max_bytes:
+            try:
+                self._evict()
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                print(f"Detail cache eviction failed: {e}")
+        return detail
+
+    def evict(self):
+        """Drops expired entries, then least recently used ones until below 90% of max_bytes."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        self._flush_access()
+        cursor = self.conn.cursor()
+        cursor.execute('DELETE FROM detail_cache WHERE fetched_at < ?', (time.time() - self.ttl,))
+        self.total_bytes = cursor.execute('SELECT COALESCE(SUM(size), 0) FROM detail_cache').fetchone()[0]
+
+        target = self.max_bytes * 0.9
+        if self.total_bytes > target:
+            rows = cursor.execute('SELECT link, size FROM detail_cache ORDER BY last_access ASC').fetchall()
+            doomed = []
+            for row in rows:
+                if self.total_bytes <= target:
+                    break
+                doomed.append((row['link'],))
+                self.total_bytes -= row['size']
+            cursor.executemany('DELETE FROM detail_cache WHERE link = ?', doomed)
+        self.conn.commit()
+
+    def stats(self):
+        """Returns hit/miss counters and the current cache size."""
+        with self._lock:
+            entries = self.conn.execute('SELECT COUNT(*) FROM detail_cache').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": self.total_bytes,
+        }
+
+
+class _NullCache:
+    """Stand-in used when DETAIL_CACHE_ENABLED is False: always misses, stores nothing."""
+
+    hits = 0
+    misses = 0
+
+    def get(self, link):
+        return None
+
+    def put(self, link, detail):
+        return detail
+
+    def stats(self):
+        return {"hits": 0, "misses": 0, "hit_rate": 0.0, "entries": 0, "bytes": 0}
+
+
+_cache = None
+
+
+def get_detail_cache():
+    """Returns the shared detail cache for this process."""
+    global _cache
+    if _cache is None:
+        _cache = DetailCache() if DETAIL_CACHE_ENABLED else _NullCache()
+    return _cache
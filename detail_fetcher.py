@@ -0,0 +1,44 @@
+import asyncio
+from config import DETAIL_CONCURRENCY, DETAIL_CONCURRENCY_DEFAULT, DETAIL_CONCURRENCY_GLOBAL
+
+# Semaphores are bound to the event loop they are first used on, so keep one set per loop
+_semaphores = {}
+
+
+def _get_semaphores(portal):
+    loop = asyncio.get_running_loop()
+    state = _semaphores.get(loop)
+    if state is None:
+        # Drop semaphores of loops that are gone (e.g. previous asyncio.run calls)
+        for old_loop in [l for l in _semaphores if l.is_closed()]:
+            del _semaphores[old_loop]
+        state = {"global": asyncio.Semaphore(DETAIL_CONCURRENCY_GLOBAL), "portals": {}}
+        _semaphores[loop] = state
+
+    portal_sem = state["portals"].get(portal)
+    if portal_sem is None:
+        portal_sem = asyncio.Semaphore(DETAIL_CONCURRENCY.get(portal, DETAIL_CONCURRENCY_DEFAULT))
+        state["portals"][portal] = portal_sem
+    return portal_sem, state["global"]
+
+
+async def fetch_details(portal, items, fetch_one, process=None):
+    """
+    Runs `fetch_one(item)` for every item with bounded concurrency.
+
+    At most DETAIL_CONCURRENCY[portal] detail tabs are open for a portal and at
+    most DETAIL_CONCURRENCY_GLOBAL across all portals. If given, `process(item,
+    fetched)` runs after the slots are released, so post-processing never holds
+    up the next navigation. Results are returned in the same order as `items`
+    so the output stays deterministic.
+    """
+    portal_sem, global_sem = _get_semaphores(portal)
+
+    async def run(item):
+        # Take the portal slot first so one busy portal cannot hog the global slots
+        async with portal_sem:
+            async with global_sem:
+                fetched = await fetch_one(item)
+        return await process(item, fetched) if process else fetched
+
+    return await asyncio.gather(*(run(item) for item in items))
@@ -0,0 +1,227 @@
+import asyncio
+import os
+import sys
+from utils import check_language_requirements, clean_text
+from browser_pool import get_browser_pool, close_browser_pool
+from card_extractor import extract_cards
+from detail_fetcher import fetch_details
+from detail_cache import get_detail_cache
+from text_pipeline import get_text_pipeline, close_text_pipeline
+from database import get_known_links
+from portals import get_adapter
+from navigation import navigate, CircuitOpen
+from metrics import span, set_span_labels
+from config import REQUEST_TIMEOUT, SKIP_KNOWN_JOBS, KNOWN_JOB_REFRESH_HOURS
+
+
+async def crawl_listing(pool, adapter, base_url, target_lang, process_cards, stop_at_known=False, outcome=None):
+    """
+    Walks a portal's listing pages up to its depth and returns the jobs found.
+
+    `process_cards(cards)` opens the details of one page's new (title, company,
+    link) cards and returns its jobs. Page n+1 is loaded while page n's details
+    are processed. Walking stops at max_cards and on an empty or failed page. With
+    `stop_at_known`, for results sorted newest first, it stops at the first known job;
+    otherwise (with SKIP_KNOWN_JOBS) known jobs are left out and the walk goes on, as
+    results in a portal's default order can hold new postings on any page.
+    If the first page cannot be reached at all, the error is raised.
+    Walks cut short by a failed page, max_cards or the page limit are recorded
+    as outcome["truncated"] (the reason; None when the results ran out).
+    """
+    portal = adapter.name
+    depth = adapter.depth
+
+    async def load(n):
+        url = adapter.page_url(base_url, n)
+        print(f"Navigating to {portal} (page {n + 1}): {url}")
+        reached = False
+        try:
+            async with pool.page(portal) as page:
+                await adapter.prepare_page(page)
+                with span("listing_navigation"):
+                    await navigate(page, url, portal, adapter.is_blocked, timeout=REQUEST_TIMEOUT)
+                reached = True
+                # Includes waiting for the cards to render; fails on a page without results
+                with span("card_extraction"):
+                    await page.wait_for_selector(adapter.card_spec["card"], timeout=10000)
+                    return await extract_cards(page, adapter.card_spec)
+        except Exception as e:
+            if not reached:
+                # Not an empty page: the walk ends here, but not because the results ran out
+                raise
+            print(f"Error navigating to {portal} (page {n + 1}): {e}")
+            return None
+
+    results = []
+    seen = set()
+    taken = 0
+    truncated = None
+    next_page = asyncio.create_task(load(0))
+    try:
+        for n in range(depth["pages"]):
+            try:
+                raw_cards = await next_page
+            except Exception as e:
+                if n == 0:
+                    # Nothing was read, which must not pass for "no new postings"
+                    raise
+                print(f"Error navigating to {portal} (page {n + 1}): {e}")
+                truncated = f"page {n + 1} failed"
+                break
+            finally:
+                next_page = None
+            if not raw_cards:
+                break
+            if n + 1 < depth["pages"]:
+                # Prefetch the next listing page while this page's details are fetched
+                next_page = asyncio.create_task(load(n + 1))
+            print(f"Found {len(raw_cards)} potential job listings on {portal} page {n + 1}.")
+
+            cards = []
+            for raw in raw_cards:
+                card = adapter.to_card(raw, target_lang)
+                # Result pages overlap when new jobs are posted during the walk
+                if card and card[2] not in seen:
+                    seen.add(card[2])
+                    cards.append(card)
+
+            last_page = False
+            if stop_at_known and cards:
+                known = await asyncio.to_thread(get_known_links, [link for _, _, link in cards])
+                first_known = next((i for i, card in enumerate(cards) if card[2] in known), None)
+                if first_known is not None:
+                    print(f"Stopping {portal} at its first known job, {first_known} new on page {n + 1}.")
+                    cards = cards[:first_known]
+                    last_page = True
+            elif SKIP_KNOWN_JOBS and cards:
+                # Jobs already saved are not opened again until they are older than the refresh threshold
+                known = await asyncio.to_thread(
+                    get_known_links, [link for _, _, link in cards], refresh_after_hours=KNOWN_JOB_REFRESH_HOURS
+                )
+                if known:
+                    print(f"Skipping {len(known)} already known {portal} jobs.")
+                    cards = [card for card in cards if card[2] not in known]
+                    if not cards:
+                        continue
+
+            room = depth["max_cards"] - taken
+            if len(cards) > room or (len(cards) == room and not last_page):
+                truncated = f"max_cards ({depth['max_cards']}) reached"
+            cards = cards[:room]
+            taken += len(cards)
+            results.extend(await process_cards(cards))
+            if truncated or last_page:
+                break
+        else:
+            truncated = f"page limit ({depth['pages']}) reached"
+    finally:
+        if outcome is not None:
+            outcome["truncated"] = truncated
+        if next_page is not None:
+            next_page.cancel()
+            await asyncio.gather(next_page, return_exceptions=True)
+    return results
+
+
+async def scrape_portal(portal, search_term="Frontend", location="Germany", target_lang="English", since=None, outcome=None):
+    """
+    Scrapes one portal (a config.PORTALS name or a PortalAdapter) for a search term.
+
+    Every portal gets the same machinery: the shared browser pool, paginated
+    listing walk with prefetch, bounded concurrent detail fetching, the detail
+    cache and the off-loop text pipeline. With `since` (a Unix timestamp) only
+    postings since then are asked for, where the portal can filter and sort by date.
+
+    A dict passed as `outcome` gets how complete the scrape was: "detail_failures"
+    (details that could not be loaded or analyzed), "truncated" (why the listing
+    walk was cut short, or None) and "complete", true only if neither happened.
+    """
+    outcome = {} if outcome is None else outcome
+    outcome.update(detail_failures=0, truncated=None, complete=False)
+    adapter = get_adapter(portal) if isinstance(portal, str) else portal
+    if adapter.local_only and os.environ.get("VERCEL"):
+        print(f"Scraping {adapter.name} is not supported in Vercel environment.")
+        return []
+
+    set_span_labels(adapter.name, search_term)
+    base_url = adapter.search_url(search_term, location, since)
+    pool = await get_browser_pool()
+    cache = get_detail_cache()
+    pipeline = get_text_pipeline()
+
+    async def load_detail(link):
+        detail_page = await pool.new_page(adapter.name, javascript=adapter.interception.detail_javascript)
+        try:
+            await adapter.prepare_page(detail_page)
+            with span("detail_fetch"):
+                await navigate(detail_page, link, adapter.name, adapter.is_blocked, timeout=30000)
+                return await adapter.read_description(detail_page)
+        except CircuitOpen:
+            # Paused portal: skip quietly, the breaker already reported why
+            outcome["detail_failures"] += 1
+        except Exception as e:
+            print(f"Error scraping {adapter.name} detail {link}: {e}")
+            outcome["detail_failures"] += 1
+        finally:
+            await pool.release_page(detail_page)
+        return None
+
+    async def fetch_detail(card):
+        # Cached details skip the browser navigation entirely; the cache is SQLite, so off the loop
+        return await asyncio.to_thread(cache.get, card[2]) or await load_detail(card[2])
+
+    async def build_job(card, detail):
+        title, company, link = card
+        if isinstance(detail, str):
+            if not detail.strip():
+                # A page that loaded blank is not cached, so the next scan tries it again
+                outcome["detail_failures"] += 1
+                return None
+            # Freshly fetched description: emails and language come from the text pipeline
+            try:
+                with span("language_detection"):
+                    analyzed = await pipeline.process(detail)
+            except Exception as e:
+                # Drop just this card; the rest of the page and earlier pages are kept
+                print(f"Error analyzing {adapter.name} detail {link}: {e}")
+                outcome["detail_failures"] += 1
+                return None
+            detail = await asyncio.to_thread(cache.put, link, analyzed)
+        if detail and check_language_requirements(detail["description"], target_lang, detail["language"]):
+            return {
+                "title": clean_text(title),
+                "company": clean_text(company),
+                "link": link,
+                "emails": detail["emails"],
+                "description": detail["description"],
+                "location": location,
+                "source": adapter.name
+            }
+        return None
+
+    async def process_cards(cards):
+        # Fetch detail pages concurrently, keeping card order
+        details = await fetch_details(adapter.name, cards, fetch_detail, build_job)
+        return [job for job in details if job]
+
+    stop_at_known = since is not None and bool(adapter.newest_first)
+    jobs = await crawl_listing(pool, adapter, base_url, target_lang, process_cards, stop_at_known, outcome)
+    outcome["complete"] = not outcome["truncated"] and not outcome["detail_failures"]
+    return jobs
+
+
+async def _main(portal, search_term):
+    try:
+        return await scrape_portal(portal, search_term)
+    finally:
+        await close_browser_pool()
+        await close_text_pipeline()
+
+
+if __name__ == "__main__":
+    # python engine.py <portal> [search term]
+    portal = sys.argv[1] if len(sys.argv) > 1 else "LinkedIn"
+    search_term = sys.argv[2] if len(sys.argv) > 2 else "Frontend"
+    jobs = asyncio.run(_main(portal, search_term))
+    for job in jobs:
+        print(f"--- \nTitle: {job['title']}\nCompany: {job['company']}\nEmails: {job['emails']}\nLink: {job['link']}\n")
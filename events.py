@@ -0,0 +1,107 @@
+import asyncio
+import itertools
+import json
+from collections import deque
+from config import EVENT_QUEUE_SIZE, EVENT_HISTORY_SIZE
+
+
+class Subscriber:
+    """One connected client: a bounded queue of pre-encoded SSE messages."""
+
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+    def offer(self, event):
+        if self.dropped:
+            return
+        if self.queue.full():
+            # Progress is a snapshot, so an older one can go; anything else would be
+            # lost, so the subscriber is cut off and resumes from history on reconnect
+            if not self._discard_progress():
+                self.dropped = True
+                return
+        self.queue.put_nowait(event)
+
+    def _discard_progress(self):
+        kept = [e for e in self._drain() if e[1] != "progress"]
+        for e in kept:
+            self.queue.put_nowait(e)
+        return not self.queue.full()
+
+    def _drain(self):
+        while not self.queue.empty():
+            yield self.queue.get_nowait()
+
+
+class EventBroker:
+    """
+    Fan-out of scan events to any number of Server-Sent Events subscribers.
+
+    `publish` never waits: every event is encoded once and offered to each
+    subscriber's bounded queue, so a slow client cannot hold up the scan or
+    the other clients. Recent events are kept so that a client reconnecting
+    with Last-Event-ID gets what it missed.
+    """
+
+    def __init__(self, queue_size=EVENT_QUEUE_SIZE, history_size=EVENT_HISTORY_SIZE):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.history = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+
+    def publish(self, event_type, data, event_id=None):
+        """Sends an event to every subscriber; `event_id` defaults to the next local id."""
+        if event_id is None:
+            event_id = next(self._ids)
+        payload = json.dumps(data, default=str, separators=(",", ":"))
+        event = (event_id, event_type, f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n")
+        self.history.append(event)
+        for subscriber in self.subscribers:
+            subscriber.offer(event)
+        return event_id
+
+    def subscribe(self, last_event_id=None):
+        subscriber = Subscriber(self.queue_size)
+        if last_event_id is not None:
+            for event in self.history:
+                if event[0] > last_event_id:
+                    subscriber.offer(event)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    async def stream(self, subscriber, snapshot=None, is_disconnected=None, keepalive=15.0):
+        """
+        Yields SSE messages for one subscriber until it disconnects or is cut off.
+        `snapshot` (an SSE message) is sent first so a new client starts from the
+        current state; a comment line every `keepalive` seconds keeps proxies from
+        closing an idle connection.
+        """
+        try:
+            if snapshot:
+                yield snapshot
+            while not subscriber.dropped:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    if is_disconnected and await is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield event[2]
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        return {"subscribers": len(self.subscribers), "last_event_id": self.history[-1][0] if self.history else 0}
+
+
+def sse_message(event_type, data):
+    """An SSE message without an id (not replayed), e.g. the initial snapshot."""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+broker = EventBroker()
@@ -1,9 +1,235 @@
 import os
+import csv
+import json
+import tempfile
+import time
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
-from config import OUTPUT_FILENAME
+from openpyxl.utils import get_column_letter
+from config import OUTPUT_FILENAME, EXPORT_CHUNK_SIZE, REPORTS_DIR
+from database import iter_jobs
 
-def export_to_excel(jobs_list):
+COLUMNS = ['title', 'company', 'location', 'link', 'emails', 'source']
+LINK_COLUMN = COLUMNS.index('link')
+# Columns of the machine-readable formats (CSV, JSONL, Parquet)
+DATA_COLUMNS = ['id', 'title', 'company', 'location', 'link', 'emails', 'source', 'status', 'created_at', 'description']
+
+# Format name -> {"writer", "extension", "media_type"}; see register_exporter
+EXPORTERS = {}
+
+# Format name -> throughput of the most recent export in that format
+export_stats = {}
+
+def register_exporter(fmt, extension, media_type):
+    """Registers `writer(rows, path) -> row_count` as the exporter for `fmt`."""
+    def decorator(writer):
+        EXPORTERS[fmt] = {"writer": writer, "extension": extension, "media_type": media_type}
+        return writer
+    return decorator
+
+# --- PROFESSIONAL STYLING ---
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=12)
+HEADER_FILL = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+CENTER_ALIGN = Alignment(horizontal='center', vertical='center', wrap_text=True)
+LEFT_WRAP = Alignment(horizontal='left', vertical='top', wrap_text=True)
+LINK_FONT = Font(color="0563C1", underline="single")
+
+COLUMN_WIDTHS = {
+    1: 40, # Title
+    2: 25, # Company
+    3: 20, # Location
+    4: 25, # Link
+    5: 35, # Emails
+    6: 15  # Source
+}
+
+def _field(row, col):
+    """Reads a column from a job dict or a sqlite3.Row, missing columns read as ""."""
+    try:
+        val = row[col]
+    except (KeyError, IndexError):
+        return ""
+    return "" if val is None else val
+
+def _clean(val):
+    """Prepares a value for Excel: lists become lines, non-printable characters are dropped."""
+    if isinstance(val, list):
+        val = "\n".join(val)
+    # isprintable() runs in C; only fall back to the per-character filter when it fails
+    if isinstance(val, str) and not val.isprintable():
+        val = "".join(c for c in val if c.isprintable() or c in "\n\r\t")
+    return val
+
+def _emails_list(val):
+    if isinstance(val, list):
+        return val
+    return [e for e in str(val).split("\n") if e] if val else []
+
+@register_exporter("xlsx", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+def write_xlsx(rows, path):
+    """
+    Streams job rows (dicts or sqlite3.Row, any iterable such as a DB cursor) into a
+    styled xlsx file using openpyxl's write-only mode. Every cell is styled as it is
+    written, so memory stays flat regardless of the number of rows. Returns the row count.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Job Leads")
+
+    # --- AUTO-ADJUST COLUMN WIDTHS --- (must be set before any row is written)
+    for col_idx, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+    # Freeze panes
+    ws.freeze_panes = 'A2'
+
+    header = []
+    for col in COLUMNS:
+        cell = WriteOnlyCell(ws, value=col.capitalize())
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = CENTER_ALIGN
+        header.append(cell)
+    ws.append(header)
+
+    count = 0
+    for job in rows:
+        row_cells = []
+        for col_idx, col in enumerate(COLUMNS):
+            val = _clean(_field(job, col))
+            cell = WriteOnlyCell(ws)
+            cell.alignment = LEFT_WRAP
+            if col_idx == LINK_COLUMN and val and str(val).startswith("http"):
+                cell.value = f'=HYPERLINK("{val}", "OPEN JOB POSTING")'
+                cell.font = LINK_FONT
+            else:
+                cell.value = val
+            row_cells.append(cell)
+        ws.append(row_cells)
+        count += 1
+
+    wb.save(path)
+    return count
+
+@register_exporter("csv", ".csv", "text/csv")
+def write_csv(rows, path):
+    """Writes rows as UTF-8 CSV with a header line; emails are newline separated inside the cell."""
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(DATA_COLUMNS)
+        for job in rows:
+            writer.writerow([_clean(_field(job, col)) for col in DATA_COLUMNS])
+            count += 1
+    return count
+
+@register_exporter("jsonl", ".jsonl", "application/x-ndjson")
+def write_jsonl(rows, path):
+    """Writes one JSON object per line; emails become a list."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for job in rows:
+            record = {col: _field(job, col) for col in DATA_COLUMNS}
+            record["emails"] = _emails_list(record["emails"])
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+@register_exporter("parquet", ".parquet", "application/vnd.apache.parquet")
+def write_parquet(rows, path):
+    """Writes rows as Parquet in EXPORT_CHUNK_SIZE row groups. Needs the optional `pyarrow` package."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        (col, pa.int64() if col == 'id' else pa.list_(pa.string()) if col == 'emails' else pa.string())
+        for col in DATA_COLUMNS
+    ])
+
+    def to_batch(chunk):
+        columns = {col: [] for col in DATA_COLUMNS}
+        for job in chunk:
+            for col in DATA_COLUMNS:
+                val = _field(job, col)
+                if col == 'emails':
+                    val = _emails_list(val)
+                elif col == 'id':
+                    val = val if val != "" else None
+                else:
+                    val = str(val)
+                columns[col].append(val)
+        return pa.record_batch([columns[col] for col in DATA_COLUMNS], schema=schema)
+
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        chunk = []
+        for job in rows:
+            chunk.append(job)
+            if len(chunk) >= EXPORT_CHUNK_SIZE:
+                writer.write_batch(to_batch(chunk))
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            writer.write_batch(to_batch(chunk))
+            count += len(chunk)
+    return count
+
+def default_export_path(fmt):
+    """OUTPUT_FILENAME with the extension of the given format."""
+    return os.path.splitext(OUTPUT_FILENAME)[0] + EXPORTERS[fmt]["extension"]
+
+def export_jobs(fmt="xlsx", path=None, rows=None):
+    """
+    Exports jobs in the given format and returns throughput stats for the run.
+    `rows` defaults to the whole jobs table, streamed from the DB in EXPORT_CHUNK_SIZE chunks.
+    The file is written to a temporary name next to `path` and renamed into place,
+    so readers never see a half-written report.
+    """
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of: {', '.join(EXPORTERS)}")
+    exporter = EXPORTERS[fmt]
+    path = path or default_export_path(fmt)
+    if rows is None:
+        rows = iter_jobs(EXPORT_CHUNK_SIZE)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".export-", suffix=exporter["extension"])
+    os.close(fd)
+    start = time.perf_counter()
+    try:
+        count = exporter["writer"](rows, tmp_path)
+        # mkstemp creates the file owner-only; reports are regular files
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    size = os.path.getsize(path)
+    stats = {
+        "format": fmt,
+        "path": os.path.abspath(path),
+        "rows": count,
+        "bytes": size,
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(count / elapsed, 1),
+        "bytes_per_sec": round(size / elapsed, 1),
+    }
+    export_stats[fmt] = stats
+    print(f"Exported {count} jobs as {fmt} to {path} ({stats['rows_per_sec']:.0f} rows/s, {size / elapsed / 1024:.0f} KB/s)")
+    return stats
+
+def report_path(scan_id):
+    """Path of the Excel report written for a scan."""
+    return os.path.join(REPORTS_DIR, f"jobs_report_{scan_id}.xlsx")
+
+def export_to_excel(jobs_list, path=OUTPUT_FILENAME):
     """
     Exports a list of job dictionaries to a professional, formatted Excel file using openpyxl directly.
     This replaces pandas to reduce the deployment size for Vercel.
@@ -13,70 +239,18 @@ def export_to_excel(jobs_list):
         return None
 
     try:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Job Leads"
-
-        columns = ['title', 'company', 'location', 'link', 'emails', 'source']
-        ws.append([col.capitalize() for col in columns])
-
-        # --- PROFESSIONAL STYLING ---
-        header_font = Font(bold=True, color="FFFFFF", size=12)
-        header_fill = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
-        center_align = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        left_wrap = Alignment(horizontal='left', vertical='top', wrap_text=True)
-        link_font = Font(color="0563C1", underline="single")
-
-        # Style header row
-        for cell in ws[1]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = center_align
-
-        # Add data
-        for job in jobs_list:
-            row_data = []
-            for col in columns:
-                val = job.get(col, "")
-                if isinstance(val, list):
-                    val = "\n".join(val)
-                # Clean strings for Excel
-                if isinstance(val, str):
-                    val = "".join(c for c in val if c.isprintable() or c in "\n\r\t")
-                row_data.append(val)
-            ws.append(row_data)
-
-        # Style data rows and add hyperlinks
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, max_row=ws.max_row), start=2):
-            for cell in row:
-                cell.alignment = left_wrap
-                
-                # Check for link column (Column 4 corresponds to index 3 in 0-based, but 4 in 1-based)
-                if cell.column == 4:
-                    raw_url = cell.value
-                    if raw_url and str(raw_url).startswith("http"):
-                        cell.value = f'=HYPERLINK("{raw_url}", "OPEN JOB POSTING")'
-                        cell.font = link_font
-
-        # --- AUTO-ADJUST COLUMN WIDTHS ---
-        column_widths = {
-            1: 40, # Title
-            2: 25, # Company
-            3: 20, # Location
-            4: 25, # Link
-            5: 35, # Emails
-            6: 15  # Source
-        }
-        for col_idx, width in column_widths.items():
-            col_letter = ws.cell(row=1, column=col_idx).column_letter
-            ws.column_dimensions[col_letter].width = width
-
-        # Freeze panes
-        ws.freeze_panes = 'A2'
-
-        wb.save(OUTPUT_FILENAME)
-        print(f"Successfully exported {len(jobs_list)} jobs to {OUTPUT_FILENAME}")
-        return os.path.abspath(OUTPUT_FILENAME)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return export_jobs("xlsx", path, rows=jobs_list)["path"]
+    except Exception as e:
+        print(f"Error exporting to Excel: {e}")
+        return None
+
+def export_db_to_excel(path=OUTPUT_FILENAME):
+    """Exports every stored job straight from a database cursor, newest first."""
+    try:
+        return export_jobs("xlsx", path)["path"]
     except Exception as e:
         print(f"Error exporting to Excel: {e}")
         return None
@@ -0,0 +1,97 @@
+from collections import deque
+from urllib.parse import urlsplit
+from playwright.async_api import Error as PlaywrightError
+from config import INTERCEPTION, INTERCEPTION_PAGES_KEPT
+
+
+def _new_stats():
+    return {
+        "pages": 0, "requests_allowed": 0, "requests_blocked": 0, "bytes_loaded": 0,
+        "blocked_by_type": {}, "blocked_by_domain": {},
+        "recent_pages": deque(maxlen=INTERCEPTION_PAGES_KEPT),
+    }
+
+
+_stats = {}
+
+
+class InterceptionPolicy:
+    """
+    Decides which requests a page may make: resource types and tracker/ad
+    domains in the policy are aborted before they hit the network.
+
+    Counters are kept per portal: requests allowed and blocked (by resource
+    type and by domain) and bytes loaded, the response body sizes Chromium
+    reports for finished requests (chunked and compressed responses often
+    have no Content-Length). The same counters are kept for each of the
+    portal's most recent pages.
+    """
+
+    def __init__(self, resource_types=(), blocked_domains=(), detail_javascript=True):
+        self.resource_types = frozenset(resource_types)
+        self.blocked_domains = tuple(d.lower() for d in blocked_domains)
+        self.detail_javascript = detail_javascript
+
+    @classmethod
+    def for_portal(cls, overrides=None):
+        """The default INTERCEPTION policy with a portal's overrides applied."""
+        return cls(**dict(INTERCEPTION, **(overrides or {})))
+
+    def blocked_domain(self, url):
+        host = (urlsplit(url).hostname or "").lower()
+        for domain in self.blocked_domains:
+            if host == domain or host.endswith("." + domain):
+                return domain
+        return None
+
+    async def apply(self, page, portal):
+        """Installs the policy on a page before its first navigation."""
+        stats = _stats.setdefault(portal, _new_stats())
+        stats["pages"] += 1
+        page_stats = {"url": "", "requests_allowed": 0, "requests_blocked": 0, "bytes_loaded": 0}
+        stats["recent_pages"].append(page_stats)
+
+        async def handle(route):
+            request = route.request
+            if request.resource_type in self.resource_types:
+                key, reason = "blocked_by_type", request.resource_type
+            else:
+                key, reason = "blocked_by_domain", self.blocked_domain(request.url)
+            if request.is_navigation_request() and not page_stats["url"]:
+                page_stats["url"] = request.url
+            if reason:
+                stats["requests_blocked"] += 1
+                page_stats["requests_blocked"] += 1
+                stats[key][reason] = stats[key].get(reason, 0) + 1
+                await route.abort("blockedbyclient")
+            else:
+                stats["requests_allowed"] += 1
+                page_stats["requests_allowed"] += 1
+                await route.continue_()
+
+        async def on_request_finished(request):
+            try:
+                size = (await request.sizes())["responseBodySize"]
+            except PlaywrightError:
+                # The page was closed before the sizes came back
+                return
+            stats["bytes_loaded"] += size
+            page_stats["bytes_loaded"] += size
+
+        await page.route("**/*", handle)
+        page.on("requestfinished", on_request_finished)
+
+
+def interception_stats():
+    """Per-portal request counters, with the share of requests that were blocked and per-page averages."""
+    result = {}
+    for portal, stats in _stats.items():
+        total = stats["requests_allowed"] + stats["requests_blocked"]
+        result[portal] = dict(
+            stats,
+            recent_pages=[dict(page) for page in stats["recent_pages"]],
+            blocked_share=round(stats["requests_blocked"] / total, 3) if total else 0.0,
+            requests_per_page=round(total / stats["pages"], 1) if stats["pages"] else 0.0,
+            bytes_per_page=round(stats["bytes_loaded"] / stats["pages"]) if stats["pages"] else 0,
+        )
+    return result
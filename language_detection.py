@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from langdetect import detect, DetectorFactory
+from config import LANGDETECT_PREFIX_CHARS, LANGDETECT_CACHE_SIZE, LANGDETECT_WORKERS
+
+# Ensure consistent language detection (also applies inside pool worker processes)
+DetectorFactory.seed = 0
+
+
+class LanguageCache:
+    """Thread-safe LRU of detection results keyed by a hash of the detected text."""
+
+    def __init__(self, maxsize=LANGDETECT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, language):
+        with self._lock:
+            self._data[key] = language
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+_cache = LanguageCache()
+
+
+def _prefix(text):
+    # Language is settled within the first thousand or so characters; langdetect's
+    # cost grows with the n-grams it extracts, so never feed it whole descriptions
+    return text.strip()[:LANGDETECT_PREFIX_CHARS]
+
+
+def _key(prefix):
+    return hashlib.blake2b(prefix.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _detect_prefix(prefix):
+    """Uncached detection of an already truncated text. Runs in pool workers too."""
+    if len(prefix) < 10:
+        return 'unknown'
+    try:
+        return detect(prefix)
+    except Exception:
+        return 'unknown'
+
+
+def detect_language(text):
+    """Detects the language of the given text, memoized by content hash."""
+    if not text or len(text.strip()) < 10:
+        return 'unknown'
+    prefix = _prefix(text)
+    key = _key(prefix)
+    language = _cache.get(key)
+    if language is None:
+        language = _detect_prefix(prefix)
+        _cache.put(key, language)
+    return language
+
+
+_pool = None
+
+
+def get_detection_pool():
+    """Shared process pool for batch detection (langdetect is pure Python, so threads do not scale)."""
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs Playwright's driver threads is unsafe
+        _pool = ProcessPoolExecutor(max_workers=LANGDETECT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_detection_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _split_batch(texts):
+    """Resolves cache hits; returns (results, {key: (prefix, [indexes])} still to detect)."""
+    results = [None] * len(texts)
+    pending = {}
+    for i, text in enumerate(texts):
+        if not text or len(text.strip()) < 10:
+            results[i] = 'unknown'
+            continue
+        prefix = _prefix(text)
+        key = _key(prefix)
+        language = _cache.get(key)
+        if language is not None:
+            results[i] = language
+        else:
+            # Duplicates inside one batch are detected once
+            pending.setdefault(key, (prefix, []))[1].append(i)
+    return results, pending
+
+
+def _merge_batch(results, pending, languages):
+    for (key, (_, indexes)), language in zip(pending.items(), languages):
+        _cache.put(key, language)
+        for i in indexes:
+            results[i] = language
+    return results
+
+
+def classify_batch(texts, executor=None):
+    """
+    Detects the language of every text; returns codes in input order.
+    Cache misses are fanned out to `executor` (defaults to the shared process pool).
+    """
+    results, pending = _split_batch(texts)
+    if not pending:
+        return results
+    executor = executor or get_detection_pool()
+    prefixes = [prefix for prefix, _ in pending.values()]
+    chunksize = max(1, len(prefixes) // (4 * LANGDETECT_WORKERS))
+    languages = list(executor.map(_detect_prefix, prefixes, chunksize=chunksize))
+    return _merge_batch(results, pending, languages)
+
+
+async def classify_batch_async(texts, executor=None):
+    """Like classify_batch but awaitable, so detection never runs on the event loop."""
+    results, pending = _split_batch(texts)
+    if not pending:
+        return results
+    loop = asyncio.get_running_loop()
+    executor = executor or get_detection_pool()
+    languages = await asyncio.gather(*(
+        loop.run_in_executor(executor, _detect_prefix, prefix) for prefix, _ in pending.values()
+    ))
+    return _merge_batch(results, pending, languages)
+
+
+def cache_stats():
+    return _cache.stats()
@@ -0,0 +1,44 @@
+from config import LANGUAGE_RULES
+
+
+class RuleSet:
+    """
+    Keyword categories of one target language, prepared once at import time.
+
+    `match` lowercases the text once and reports every category with at least one
+    keyword in it (substring semantics, like `keyword in text`). Keywords are
+    deduplicated and tried shortest first within a category, and a category stops
+    at its first hit. For rule sets of this size CPython's substring search beats
+    a combined regex or an Aho-Corasick automaton (see benchmarks/bench_language_rules.py).
+    """
+
+    def __init__(self, categories):
+        self.categories = {
+            name: tuple(sorted({k.lower() for k in keywords}, key=len))
+            for name, keywords in categories.items()
+        }
+
+    def match(self, text):
+        """Returns the set of category names with at least one keyword in `text`."""
+        if not text:
+            return set()
+        text = text.lower()
+        return {
+            name for name, keywords in self.categories.items()
+            if any(keyword in text for keyword in keywords)
+        }
+
+
+def compile_rules(rules=LANGUAGE_RULES):
+    """Builds RuleSets from a {target language: {category: [keywords]}} mapping."""
+    return {target_lang: RuleSet(categories) for target_lang, categories in rules.items()}
+
+
+# Prepared once at import time
+RULES = compile_rules()
+_EMPTY = RuleSet({})
+
+
+def match_categories(text, target_lang):
+    """All keyword categories of `target_lang`'s rule set found in `text`."""
+    return RULES.get(target_lang, _EMPTY).match(text)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+from collections import deque
+from config import LOOP_LAG_INTERVAL
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag: how late a periodic `asyncio.sleep(interval)` wakes up.
+
+    Anything that blocks the loop (CPU work in a coroutine, sync I/O) shows up
+    as lag, which is also the extra latency every other task and request sees.
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, max_samples=10000):
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        return self.stats()
+
+    def reset(self):
+        self.samples.clear()
+
+    def stats(self):
+        """Lag percentiles in milliseconds over the recorded samples."""
+        if not self.samples:
+            return {"samples": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self.samples)
+        pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+        return {
+            "samples": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p50_ms": round(pick(0.50), 2),
+            "p95_ms": round(pick(0.95), 2),
+            "p99_ms": round(pick(0.99), 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
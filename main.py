@@ -1,79 +1,160 @@
 import asyncio
-from scraper_linkedin import scrape_linkedin
-from scraper_stepstone import scrape_stepstone
-from scraper_indeed import scrape_indeed
-from scraper_startup import scrape_startup_jobs
-from exporter import export_to_excel
-from database import save_jobs, log_scan
+import time
+from engine import scrape_portal
+from portals import ADAPTERS
+from exporter import export_to_excel, report_path
+from database import save_jobs, log_scan, get_watermarks, set_watermark, save_scan_metrics
+from browser_pool import close_browser_pool
+from detail_cache import get_detail_cache
+from text_pipeline import close_text_pipeline
+from loop_monitor import LoopLagMonitor
+from navigation import navigation_stats
+from interception import interception_stats
+from scheduler import JobScheduler, ScrapeTask
+from metrics import start_scan_metrics, span
 from config import ROLES, LOCATION
 
 # Global status for the SaaS API
 scraping_status = {"active": False, "progress": 0, "message": "Idle", "job_count": 0}
 
-async def run_job_agent(roles=ROLES, location=LOCATION, language="Both", status_callback=None):
+async def run_job_agent(roles=ROLES, location=LOCATION, language="Both", status_callback=None, jobs_callback=None, scan_id=None, incremental=False):
+    """
+    Scrapes every portal for every role, saves the jobs and writes the scan's report.
+    `status_callback(status)` is awaited on every progress change and
+    `jobs_callback(task, new_jobs)` with the new jobs of each finished (role, portal) task.
+    Pass the `scan_id` of a queued scan; without one the scan is logged when it finishes.
+    An `incremental` scan asks each portal only for postings since its last complete run
+    (no failed details, listing walk not cut short).
+    """
     global scraping_status
-    scraping_status = {
+    # Each run has its own status dict, so runs in the same process can overlap
+    status = scraping_status = {
         "active": True, 
         "progress": 0, 
         "message": "Initializing...", 
         "job_count": 0,
-        "current_role": ""
+        "current_role": "",
+        "scan_id": scan_id
     }
-    if status_callback: await status_callback(scraping_status)
+    if status_callback: await status_callback(status)
+    # Stage timings of this scan, stored with it in the scans table (/api/metrics)
+    metrics = start_scan_metrics()
 
     all_jobs = []
-    total_steps = len(roles)
-    
-    for i, role in enumerate(roles):
-        scraping_status["message"] = f"Deploying agent for {role}..."
-        scraping_status["current_role"] = role
-        scraping_status["progress"] = int((i / total_steps) * 100)
-        if status_callback: await status_callback(scraping_status)
-        
-        # Run scrapers for each role
-        scraping_status["message"] = f"Gathering {role} leads (LinkedIn, Stepstone, Indeed, Startup)..."
-        if status_callback: await status_callback(scraping_status)
-        
-        results = await asyncio.gather(
-            scrape_linkedin(role, location, language),
-            scrape_stepstone(role, location, language),
-            scrape_indeed(role, location, language),
-            scrape_startup_jobs(role, location, language)
-        )
-        
-        # Flatten and filter
-        seen_links = {job['link'] for job in all_jobs}
-        new_count = 0
-        for portal_results in results:
-            for job in portal_results:
-                if job['link'] not in seen_links:
-                    all_jobs.append(job)
-                    seen_links.add(job['link'])
-                    new_count += 1
-        
-        scraping_status["job_count"] = len(all_jobs)
-        scraping_status["message"] = f"Role {role} complete: Scanned {new_count} new strict matches."
-        if status_callback: await status_callback(scraping_status)
+    seen_links = set()
+    # Watermarks are taken at the start, so postings that appear during the scan are covered next time
+    started = time.time()
+    watermarks = await asyncio.to_thread(get_watermarks, roles, location, language) if incremental else {}
+    # How completely each (role, portal) task covered its window, filled in by scrape_portal
+    outcomes = {}
+    tasks = [
+        # Every configured portal runs on the shared engine, once per role
+        ScrapeTask(role, portal, lambda role=role, portal=portal: scrape_portal(
+            portal, role, location, language, since=watermarks.get((role, portal)),
+            outcome=outcomes.setdefault((role, portal), {}),
+        ))
+        for role in roles
+        for portal in ADAPTERS
+    ]
+    total_steps = len(tasks)
+    completed = 0
+    # Tasks whose whole window was processed: no failed details, no walk cut short
+    succeeded = []
+
+    # Database writes run in a thread: with in-process workers this loop also serves the API
+    async def save_watermarks():
+        # Only incremental scans move their window, and only once the jobs are saved: they stop at
+        # the first job already in the DB. Keyed by language, since postings the filter dropped are not saved.
+        if not incremental:
+            return
+        for task in succeeded:
+            await asyncio.to_thread(set_watermark, task.role, location, language, task.portal, started, scan_id)
+
+    async def save_metrics():
+        summary = metrics.summary()
+        print(f"Scan metrics: {summary['wall_s']}s, {summary['pages_per_sec']} pages/s, "
+              + ", ".join(f"{stage} p95 {agg['p95_ms']}ms" for stage, agg in summary["stages"].items()))
+        if scan_id is not None:
+            await asyncio.to_thread(save_scan_metrics, scan_id, summary)
+
+    status["message"] = f"Gathering leads for {len(roles)} roles ({', '.join(ADAPTERS)})..."
+    if status_callback: await status_callback(status)
+
+    async def on_complete(task, portal_results, error):
+        nonlocal completed
+        completed += 1
+
+        # Merge and dedupe as soon as each (role, portal) task finishes
+        new_jobs = []
+        for job in portal_results:
+            if job['link'] not in seen_links:
+                all_jobs.append(job)
+                seen_links.add(job['link'])
+                new_jobs.append(job)
+        new_count = len(new_jobs)
+        if jobs_callback and new_jobs: await jobs_callback(task, new_jobs)
+
+        status["current_role"] = task.role
+        status["progress"] = int((completed / total_steps) * 100)
+        status["job_count"] = len(all_jobs)
+        outcome = outcomes.get((task.role, task.portal), {})
+        if error:
+            status["message"] = f"{task.portal} failed for {task.role}."
+        else:
+            status["message"] = f"{task.portal} done for {task.role}: Scanned {new_count} new strict matches."
+            if outcome.get("complete"):
+                succeeded.append(task)
+            else:
+                # The watermark stays put, so the next incremental scan covers this window again
+                print(f"{task.portal} incomplete for {task.role}: {outcome.get('detail_failures', 0)} detail failures, "
+                      f"walk cut short: {outcome.get('truncated') or 'no'}.")
+        if status_callback: await status_callback(status)
+
+    # Event loop lag during the scrape shows whether anything still blocks the loop
+    monitor = LoopLagMonitor().start()
+    try:
+        await JobScheduler().run(tasks, on_complete)
+    finally:
+        print(f"Event loop lag: {await monitor.stop()}")
+    print(f"Detail cache: {await asyncio.to_thread(get_detail_cache().stats)}")
+    print(f"Navigation: {navigation_stats()}")
+    print(f"Interception: {interception_stats()}")
     
-    scraping_status["progress"] = 100
-    scraping_status["message"] = "Exporting results..."
-    if status_callback: await status_callback(scraping_status)
+    status["progress"] = 100
+    status["message"] = "Exporting results..."
+    if status_callback: await status_callback(status)
 
     if all_jobs:
         # SaaS Upgrade: Save to Database
-        new_count = save_jobs(all_jobs)
-        log_scan(roles, location, language, len(all_jobs))
+        with span("db_write"):
+            saved = await asyncio.to_thread(save_jobs, all_jobs)
+            if scan_id is None:
+                scan_id = await asyncio.to_thread(log_scan, roles, location, language, len(all_jobs))
+                status["scan_id"] = scan_id
+            await save_watermarks()
         
-        report_path = export_to_excel(all_jobs)
-        scraping_status["message"] = f"Finished! Found {len(all_jobs)} total ({new_count} new saved)."
-        scraping_status["active"] = False
-        if status_callback: await status_callback(scraping_status)
-        return report_path
+        # Every scan gets its own report file, so concurrent scans never overwrite each other
+        with span("export"):
+            report = await asyncio.to_thread(export_to_excel, all_jobs, report_path(scan_id))
+        await save_metrics()
+        status["message"] = f"Finished! Found {len(all_jobs)} total ({saved['inserted']} new saved, {saved['refreshed']} refreshed)."
+        status["active"] = False
+        if status_callback: await status_callback(status)
+        return report
     else:
-        scraping_status["message"] = "No jobs found."
-        scraping_status["active"] = False
-        if status_callback: await status_callback(scraping_status)
+        await save_watermarks()
+        await save_metrics()
+        status["message"] = "No jobs found."
+        status["active"] = False
+        if status_callback: await status_callback(status)
         return None
 
+async def _main():
+    try:
+        return await run_job_agent()
+    finally:
+        await close_browser_pool()
+        await close_text_pipeline()
+
 if __name__ == "__main__":
-    asyncio.run(run_job_agent())
+    asyncio.run(_main())
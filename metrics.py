@@ -0,0 +1,164 @@
+import contextvars
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Stages timed during a scan, in pipeline order
+STAGES = (
+    "browser_launch", "listing_navigation", "card_extraction", "detail_fetch",
+    "language_detection", "db_write", "export",
+)
+# Stages that load a page, counted for pages per second
+PAGE_STAGES = ("listing_navigation", "detail_fetch")
+
+_current = contextvars.ContextVar("scan_metrics", default=None)
+_labels = contextvars.ContextVar("span_labels", default=("", ""))
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _stage_order(stage):
+    return STAGES.index(stage) if stage in STAGES else len(STAGES)
+
+
+def _aggregate(samples):
+    ordered = sorted(seconds for seconds, _ in samples)
+    failures = sum(1 for _, ok in samples if not ok)
+    return {
+        "count": len(samples),
+        "failures": failures,
+        "failure_rate": round(failures / len(samples), 3),
+        "total_s": round(sum(ordered), 3),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+    }
+
+
+class ScanMetrics:
+    """
+    Durations of one scan's stages, labelled with the portal and role they ran for.
+
+    Spans find the scan through a context variable, so the engine needs no extra
+    arguments: tasks started inside run_job_agent inherit it, and each
+    (role, portal) task sets its own labels.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.samples = defaultdict(list)  # (stage, portal, role) -> [(seconds, ok)]
+
+    def record(self, stage, seconds, ok=True, portal="", role=""):
+        self.samples[(stage, portal, role)].append((seconds, ok))
+
+    def summary(self):
+        """p50/p95 latency, count and failure rate per stage, per portal and per role, plus pages/s."""
+        wall = time.perf_counter() - self.started
+        by = {"stages": defaultdict(list), "portals": defaultdict(lambda: defaultdict(list)),
+              "roles": defaultdict(lambda: defaultdict(list))}
+        for (stage, portal, role), samples in sorted(self.samples.items(), key=lambda item: _stage_order(item[0][0])):
+            by["stages"][stage].extend(samples)
+            if portal:
+                by["portals"][portal][stage].extend(samples)
+            if role:
+                by["roles"][role][stage].extend(samples)
+        pages = sum(1 for stage in PAGE_STAGES for _, ok in by["stages"].get(stage, ()) if ok)
+        return {
+            "wall_s": round(wall, 3),
+            "pages": pages,
+            "pages_per_sec": round(pages / wall, 3) if wall else 0.0,
+            "stages": {stage: _aggregate(samples) for stage, samples in by["stages"].items()},
+            "portals": {portal: {stage: _aggregate(s) for stage, s in stages.items()} for portal, stages in by["portals"].items()},
+            "roles": {role: {stage: _aggregate(s) for stage, s in stages.items()} for role, stages in by["roles"].items()},
+        }
+
+
+def start_scan_metrics():
+    """Starts collecting spans for the scan running in the current context."""
+    metrics = ScanMetrics()
+    _current.set(metrics)
+    return metrics
+
+
+def set_span_labels(portal="", role=""):
+    """Labels the spans of the current task (and the tasks it starts)."""
+    _labels.set((portal, role))
+
+
+@contextmanager
+def span(stage):
+    """Times the block as `stage`; it counts as failed if it raises. A no-op outside a scan."""
+    metrics = _current.get()
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        if metrics is not None:
+            portal, role = _labels.get()
+            metrics.record(stage, time.perf_counter() - start, ok, portal, role)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _line(name, value, **labels):
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+
+def prometheus_text(scan_counts, latest=None, loop_lag=None):
+    """
+    Prometheus text exposition: scans by status, the stage timings of the latest
+    scan with metrics (a (scan_id, summary) pair) and the server's event loop lag.
+    """
+    lines = [
+        "# HELP jobs_agent_scans Scans in the database by status.",
+        "# TYPE jobs_agent_scans gauge",
+    ]
+    lines += [_line("jobs_agent_scans", count, status=status) for status, count in sorted(scan_counts.items())]
+
+    if latest:
+        scan_id, summary = latest
+        lines += [
+            "# HELP jobs_agent_last_scan_id Scan the jobs_agent_scan_* and jobs_agent_stage_* metrics describe.",
+            "# TYPE jobs_agent_last_scan_id gauge",
+            _line("jobs_agent_last_scan_id", scan_id),
+            "# HELP jobs_agent_scan_duration_seconds Wall time of the scan.",
+            "# TYPE jobs_agent_scan_duration_seconds gauge",
+            _line("jobs_agent_scan_duration_seconds", summary["wall_s"]),
+            "# HELP jobs_agent_scan_pages_per_second Listing and detail pages loaded per second.",
+            "# TYPE jobs_agent_scan_pages_per_second gauge",
+            _line("jobs_agent_scan_pages_per_second", summary["pages_per_sec"]),
+            "# HELP jobs_agent_stage_latency_seconds Stage latency quantiles; portal=\"\" is all portals.",
+            "# TYPE jobs_agent_stage_latency_seconds summary",
+        ]
+        groups = [("", summary["stages"])] + sorted(summary["portals"].items())
+        for portal, stages in groups:
+            for stage, agg in stages.items():
+                lines.append(_line("jobs_agent_stage_latency_seconds", round(agg["p50_ms"] / 1000, 6), stage=stage, portal=portal, quantile="0.5"))
+                lines.append(_line("jobs_agent_stage_latency_seconds", round(agg["p95_ms"] / 1000, 6), stage=stage, portal=portal, quantile="0.95"))
+                lines.append(_line("jobs_agent_stage_latency_seconds_sum", agg["total_s"], stage=stage, portal=portal))
+                lines.append(_line("jobs_agent_stage_latency_seconds_count", agg["count"], stage=stage, portal=portal))
+        lines += [
+            "# HELP jobs_agent_stage_failure_ratio Share of a stage's spans that failed.",
+            "# TYPE jobs_agent_stage_failure_ratio gauge",
+        ]
+        for portal, stages in groups:
+            for stage, agg in stages.items():
+                lines.append(_line("jobs_agent_stage_failure_ratio", agg["failure_rate"], stage=stage, portal=portal))
+
+    if loop_lag:
+        lines += [
+            "# HELP jobs_agent_event_loop_lag_seconds API server event loop lag quantiles.",
+            "# TYPE jobs_agent_event_loop_lag_seconds gauge",
+        ]
+        for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms"), ("1", "max_ms")):
+            lines.append(_line("jobs_agent_event_loop_lag_seconds", round(loop_lag[key] / 1000, 6), quantile=quantile))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,219 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from config import (
+    HOST_RATE_LIMITS, HOST_RATE_LIMIT_DEFAULT, NAV_RETRIES, NAV_BACKOFF_BASE, NAV_BACKOFF_MAX,
+    CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_COOLDOWN,
+)
+
+
+class NavigationError(Exception):
+    """A page could not be loaded, even after retries."""
+
+
+class PortalBlocked(NavigationError):
+    """The portal answered with a block page (login wall, captcha, ...)."""
+
+
+class CircuitOpen(NavigationError):
+    """The portal is paused after repeated blocks; no request was sent."""
+
+
+class TokenBucket:
+    """
+    Per-host rate limit. Callers reserve a token and sleep until it is due, so
+    concurrent waiters queue up in order instead of all retrying at once.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self):
+        """Takes a token and returns how many seconds to wait for it."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Pauses a portal after `threshold` consecutive block pages. Once `cooldown`
+    seconds have passed one trial request goes through; success closes the
+    circuit again, another block reopens it.
+    """
+
+    def __init__(self, threshold=CIRCUIT_BREAKER_THRESHOLD, cooldown=CIRCUIT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.blocks = 0
+        self.opened_at = None
+        self.trial = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def record_success(self):
+        self.blocks = 0
+        self.opened_at = None
+        self.trial = False
+
+    def record_error(self):
+        # A trial request that failed for other reasons does not count; allow another
+        self.trial = False
+
+    def record_block(self):
+        self.blocks += 1
+        if self.trial or self.blocks >= self.threshold:
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+
+def _new_host_stats():
+    return {
+        "requests": 0, "ok": 0, "retries": 0, "timeouts": 0, "errors": 0, "http_429": 0, "http_5xx": 0,
+        "blocked": 0, "failed": 0, "throttle_wait_s": 0.0, "latency_s": 0.0,
+    }
+
+
+_buckets = {}
+_breakers = {}
+_host_stats = {}
+
+
+def _limit_key(host):
+    for domain in HOST_RATE_LIMITS:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return host
+
+
+def _bucket(host):
+    key = _limit_key(host)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        bucket = _buckets[key] = TokenBucket(*HOST_RATE_LIMITS.get(key, HOST_RATE_LIMIT_DEFAULT))
+    return bucket
+
+
+def get_breaker(portal):
+    breaker = _breakers.get(portal)
+    if breaker is None:
+        breaker = _breakers[portal] = CircuitBreaker()
+    return breaker
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Jittered exponential backoff; a server's Retry-After is honoured as a minimum."""
+    delay = min(NAV_BACKOFF_MAX, NAV_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+    if retry_after:
+        delay = max(delay, retry_after)
+    return min(delay, NAV_BACKOFF_MAX)
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+async def navigate(page, url, portal, is_blocked=None, retries=NAV_RETRIES, **goto_kwargs):
+    """
+    `page.goto(url)` with the portal's circuit breaker, the host's rate limit and
+    retries with backoff on timeouts, 429 and 5xx. `is_blocked(final_url)` flags
+    block pages. Returns the response; raises a NavigationError subclass on failure.
+    """
+    breaker = get_breaker(portal)
+    host = urlsplit(url).hostname or ""
+    stats = _host_stats.setdefault(host, _new_host_stats())
+    goto_kwargs.setdefault("wait_until", "domcontentloaded")
+
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise CircuitOpen(f"{portal} is paused after repeated block pages")
+        stats["throttle_wait_s"] += await _bucket(host).acquire()
+        stats["requests"] += 1
+        if attempt:
+            stats["retries"] += 1
+
+        retry_after = None
+        start = time.perf_counter()
+        try:
+            response = await page.goto(url, **goto_kwargs)
+        except PlaywrightTimeoutError as e:
+            stats["timeouts"] += 1
+            breaker.record_error()
+            error = e
+        except PlaywrightError as e:
+            # Connection resets and similar network errors are usually transient too
+            stats["errors"] += 1
+            breaker.record_error()
+            error = e
+        else:
+            stats["latency_s"] += time.perf_counter() - start
+            status = response.status if response else 200
+            if is_blocked and is_blocked(page.url):
+                stats["blocked"] += 1
+                was_open = breaker.state == "open"
+                breaker.record_block()
+                if not was_open and breaker.state == "open":
+                    print(f"{portal} paused for {breaker.cooldown}s after {breaker.blocks} block pages.")
+                raise PortalBlocked(f"{portal} redirected {url} to {page.url}")
+            if status == 429 or status >= 500:
+                stats["http_429" if status == 429 else "http_5xx"] += 1
+                retry_after = _retry_after(response)
+                breaker.record_error()
+                error = NavigationError(f"HTTP {status} for {url}")
+            else:
+                stats["ok"] += 1
+                breaker.record_success()
+                return response
+
+        if attempt < retries:
+            await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+    stats["failed"] += 1
+    raise NavigationError(f"Giving up on {url} after {retries + 1} attempts: {error}")
+
+
+def navigation_stats():
+    """Per-host counters and per-portal circuit breaker states."""
+    hosts = {}
+    for host, stats in _host_stats.items():
+        answered = stats["requests"] - stats["timeouts"] - stats["errors"]
+        hosts[host] = dict(
+            stats,
+            throttle_wait_s=round(stats["throttle_wait_s"], 2),
+            latency_s=round(stats["latency_s"], 2),
+            avg_latency_ms=round(stats["latency_s"] / answered * 1000, 1) if answered else 0.0,
+        )
+    portals = {
+        portal: {"state": breaker.state, "consecutive_blocks": breaker.blocks}
+        for portal, breaker in _breakers.items()
+    }
+    return {"hosts": hosts, "portals": portals}
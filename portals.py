@@ -0,0 +1,128 @@
+import math
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, quote, urlencode
+from playwright_stealth import Stealth
+from utils import is_likely_target_language, normalize_link
+from interception import InterceptionPolicy
+from config import PORTALS, PORTAL_DEPTH_DEFAULT, INCREMENTAL_OVERLAP
+
+# Returns the innerText of the first element matching one of the selectors
+_DESCRIPTION_JS = """
+selectors => {
+    for (const selector of selectors) {
+        const el = document.querySelector(selector);
+        if (el) return el.innerText;
+    }
+    return "";
+}
+"""
+
+
+def _set_query(url, params):
+    """`url` with the given query parameters added or replaced."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in params]
+    query.extend((k, str(v)) for k, v in params.items())
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class PortalAdapter:
+    """
+    Declarative description of a job portal, built from a config.PORTALS entry.
+
+    The shared engine (engine.py) only talks to portals through these methods,
+    so a portal with unusual markup can subclass PortalAdapter, override the
+    hook it needs (`to_card`, `read_description`, ...) and `register_portal` it.
+    """
+
+    def __init__(self, name, url, card, fields, origin="", stealth=False, local_only=False,
+                 filter_fields=("title",), placeholder="", description=("body",), skip_urls=(),
+                 pagination=None, depth=None, interception=None, time_filter=None, newest_first=None):
+        self.name = name
+        self.url = url
+        if not origin:
+            parts = urlsplit(url)
+            origin = f"{parts.scheme}://{parts.netloc}"
+        self.origin = origin
+        self.stealth = Stealth() if stealth else None
+        self.local_only = local_only
+        self.card_spec = {"card": card, "fields": fields}
+        self.filter_fields = tuple(filter_fields)
+        self.placeholder = placeholder
+        self.description = list(description)
+        self.skip_urls = tuple(skip_urls)
+        self.pagination = pagination
+        self.depth = depth or PORTAL_DEPTH_DEFAULT
+        self.interception = InterceptionPolicy.for_portal(interception)
+        self.time_filter = time_filter
+        self.newest_first = newest_first
+
+    def search_url(self, search_term, location, since=None):
+        """
+        Search URL for a term and location. With `since` (a Unix timestamp) the
+        portal's time filter, if it has one, is narrowed to postings since then.
+        """
+        url = self.url.format(keyword=quote(search_term), location=quote(location))
+        if since is None:
+            return url
+        params = dict(self.newest_first or {})
+        if self.time_filter:
+            params[self.time_filter["param"]] = self.time_filter["template"].format(self.time_window(since))
+        return _set_query(url, params) if params else url
+
+    def time_window(self, since):
+        """Time filter value, in the filter's units, covering everything posted since `since`."""
+        spec = self.time_filter
+        units = max(1, math.ceil((time.time() - since + INCREMENTAL_OVERLAP) / spec["unit"]))
+        choices = spec.get("choices")
+        if choices:
+            units = next((choice for choice in sorted(choices) if choice >= units), max(choices))
+        return units
+
+    def page_url(self, base_url, n):
+        """URL of listing page `n` (0-based); page 0 is the search URL itself."""
+        if n == 0 or not self.pagination:
+            return base_url
+        return _set_query(base_url, {self.pagination["param"]: self.pagination["first"] + n * self.pagination["step"]})
+
+    async def prepare_page(self, page):
+        """Runs on every listing and detail page before navigation."""
+        await self.interception.apply(page, self.name)
+        if self.stealth:
+            await self.stealth.apply_stealth_async(page)
+
+    def to_card(self, raw, target_lang):
+        """Turns an extracted card into (title, company, link), or None to skip it."""
+        link = raw.get("link")
+        if not link:
+            return None
+        # EARLY EXIT: card text already in the wrong language
+        text = " ".join(raw.get(field) or "" for field in self.filter_fields)
+        if not is_likely_target_language(text, target_lang):
+            return None
+        if not link.startswith("http"):
+            link = self.origin + link
+        title = raw.get("title") or self.placeholder
+        company = raw.get("company") or self.placeholder
+        return (title, company, normalize_link(link))
+
+    def is_blocked(self, url):
+        """True for detail pages that ended on a login wall or similar."""
+        return any(marker in url for marker in self.skip_urls)
+
+    async def read_description(self, page):
+        """Description text of a loaded detail page, in a single round trip."""
+        return await page.evaluate(_DESCRIPTION_JS, self.description)
+
+
+ADAPTERS = {name: PortalAdapter(name, **entry) for name, entry in PORTALS.items()}
+
+
+def register_portal(adapter):
+    """Adds (or replaces) a portal, e.g. a PortalAdapter subclass with custom hooks."""
+    ADAPTERS[adapter.name] = adapter
+    return adapter
+
+
+def get_adapter(name):
+    return ADAPTERS[name]
@@ -0,0 +1,47 @@
+import asyncio
+from config import PORTAL_CONCURRENCY, SCAN_CONCURRENCY
+
+
+class ScrapeTask:
+    """One (role, portal) unit of work for the scheduler."""
+
+    def __init__(self, role, portal, run):
+        self.role = role
+        self.portal = portal
+        self.run = run  # Zero-argument coroutine function returning a list of jobs
+
+
+class JobScheduler:
+    """
+    Runs (role, portal) scrape tasks concurrently.
+
+    At most `portal_limits[portal]` tasks of one portal and `global_limit`
+    tasks overall run at the same time, so a slow portal never leaves the
+    others idle. `on_complete(task, jobs, error)` is awaited as soon as each
+    task finishes, in completion order.
+    """
+
+    def __init__(self, portal_limits=PORTAL_CONCURRENCY, global_limit=SCAN_CONCURRENCY):
+        self.portal_limits = portal_limits
+        self.global_limit = global_limit
+
+    async def run(self, tasks, on_complete=None):
+        global_sem = asyncio.Semaphore(self.global_limit)
+        portal_sems = {
+            portal: asyncio.Semaphore(self.portal_limits.get(portal, 1))
+            for portal in {task.portal for task in tasks}
+        }
+
+        async def run_one(task):
+            async with portal_sems[task.portal]:
+                async with global_sem:
+                    try:
+                        return task, await task.run(), None
+                    except Exception as e:
+                        print(f"Error running {task.portal} for {task.role}: {e}")
+                        return task, [], e
+
+        for next_done in asyncio.as_completed([run_one(task) for task in tasks]):
+            task, jobs, error = await next_done
+            if on_complete:
+                await on_complete(task, jobs, error)
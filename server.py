@@ -1,17 +1,77 @@
-from fastapi import FastAPI, BackgroundTasks, Response
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import json
 import os
-from main import run_job_agent, scraping_status
-from config import OUTPUT_FILENAME
-from database import init_db, get_all_jobs, get_stats
+import time
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from config import OUTPUT_FILENAME, REPORTS_DIR, STATS_CACHE_TTL, SCAN_WORKERS_IN_PROCESS, SCAN_SCHEDULE, EVENT_POLL_INTERVAL, EVENT_KEEP
+from database import (
+    init_db, get_jobs_page, get_stats, search_jobs, enqueue_scan, get_scan, list_scans,
+    add_scan_event, get_scan_events, last_scan_event_id, prune_scan_events,
+    latest_scan_metrics, count_scans_by_status,
+)
+from exporter import EXPORTERS, export_jobs, report_path
+from browser_pool import close_browser_pool
+from text_pipeline import close_text_pipeline
+from loop_monitor import LoopLagMonitor
+from navigation import navigation_stats
+from interception import interception_stats
+from events import broker, sse_message
+from metrics import prometheus_text
+from worker import run_worker, run_schedule, scan_status, worker_name
+
+loop_monitor = LoopLagMonitor()
+
+async def relay_scan_events():
+    """
+    Publishes the events workers write to scan_events, whichever process they run in.
+    Database ids are used as SSE ids, so Last-Event-ID means the same thing to every server.
+    """
+    last_id = await run_in_threadpool(last_scan_event_id)
+    polls = 0
+    while True:
+        events = await run_in_threadpool(get_scan_events, last_id)
+        for event_id, event_type, data in events:
+            broker.publish(event_type, data, event_id=event_id)
+            last_id = event_id
+        polls += 1
+        if polls % 1000 == 0:
+            await run_in_threadpool(prune_scan_events, EVENT_KEEP)
+        if not events:
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Browsers are launched lazily by the first scan and reused by every later one
+    loop_monitor.start()
+    background = [asyncio.create_task(relay_scan_events())]
+    if not os.environ.get("VERCEL"):
+        background += [asyncio.create_task(run_worker(worker_name(n))) for n in range(SCAN_WORKERS_IN_PROCESS)]
+        if SCAN_SCHEDULE:
+            background.append(asyncio.create_task(run_schedule()))
+    yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await loop_monitor.stop()
+    await close_browser_pool()
+    await close_text_pipeline()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "ok", "environment": "vercel" if os.environ.get("VERCEL") else "local"}
+    return {
+        "status": "ok",
+        "environment": "vercel" if os.environ.get("VERCEL") else "local",
+        "loop_lag": loop_monitor.stats(),
+        "events": broker.stats(),
+    }
 
 # SaaS Setup: Initialize Database
 init_db()
@@ -31,100 +91,201 @@ class SearchFilters(BaseModel):
     roles: List[str]
     location: str
     language: str # 'English', 'German', or 'Both'
+    incremental: bool = False # Only postings since the last scan of each role and portal
+
+def _current_scan(scan_id=None):
+    """The given scan, else the running scan started last, else the latest scan."""
+    if scan_id is not None:
+        return get_scan(scan_id)
+    scans = list_scans(limit=1, status="running") or list_scans(limit=1)
+    return scans[0] if scans else None
 
-# Shared state
-scraping_state = {
-    "active": False,
-    "progress": 0,
-    "message": "Idle",
-    "job_count": 0,
-    "ready_to_download": False,
-    "current_role": "",
-    "filters": None
-}
+# Endpoints run their SQLite calls in the threadpool: in-process scan workers share this event loop
 
 @app.get("/api/status")
-async def get_status():
-    return scraping_state
-
-async def status_updater(new_state):
-    global scraping_state
-    scraping_state.update(new_state)
-
-async def search_task(roles: List[str], location: str, language: str):
-    global scraping_state
-    report_path = await run_job_agent(
-        roles=roles, 
-        location=location, 
-        language=language,
-        status_callback=status_updater
+async def get_status(scan_id: Optional[int] = None):
+    return scan_status(await run_in_threadpool(_current_scan, scan_id))
+
+@app.get("/api/scans")
+async def get_scans(limit: int = 20, status: Optional[str] = None):
+    """Recent scans, newest first, optionally filtered by status (queued, running, done, failed)."""
+    scans = await run_in_threadpool(list_scans, limit=max(1, min(limit, 200)), status=status)
+    return {"scans": [scan_status(scan) for scan in scans]}
+
+@app.get("/api/scans/{scan_id}")
+async def get_scan_status(scan_id: int):
+    """Status of one scan, with its stage timings once it has finished."""
+    scan = await run_in_threadpool(get_scan, scan_id)
+    if scan is None:
+        return {"error": "Scan not found"}
+    return dict(scan_status(scan), metrics=json.loads(scan["metrics"]) if scan["metrics"] else None)
+
+@app.get("/api/events")
+async def scan_events(request: Request):
+    """
+    Server-Sent Events stream of scan progress ("progress") and newly found jobs ("jobs").
+    Starts with the current status; reconnecting clients resume after Last-Event-ID.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    subscriber = broker.subscribe(int(last_event_id) if last_event_id and last_event_id.isdigit() else None)
+    current = scan_status(await run_in_threadpool(_current_scan))
+    return StreamingResponse(
+        broker.stream(subscriber, sse_message("progress", current), request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    if report_path:
-        scraping_state["ready_to_download"] = True
-    else:
-        scraping_state["ready_to_download"] = False
-    scraping_state["active"] = False
 
 @app.post("/api/start-search")
-async def start_search(filters: SearchFilters, background_tasks: BackgroundTasks):
-    global scraping_state
-    if scraping_state["active"]:
-        return {"error": "Search already in progress"}
-    
+async def start_search(filters: SearchFilters):
+    """Queues a scan; any number can be queued and the workers run them concurrently."""
     if os.environ.get("VERCEL"):
-        scraping_state = {
-            "active": False,
-            "progress": 0,
-            "message": "Scraping not supported on Vercel Serverless. Run locally for full functionality.",
-            "job_count": 0,
-            "ready_to_download": False,
-            "current_role": "",
-            "filters": filters.dict()
+        return {
+            "error": "Scraping not supported on Vercel Serverless. Run locally for full functionality.",
+            "unsupported": True,
         }
-        return {"message": "Scraping not supported on Vercel", "unsupported": True}
-
-    scraping_state = {
-        "active": True,
-        "progress": 0,
-        "message": "Starting...",
-        "job_count": 0,
-        "ready_to_download": False,
-        "current_role": "",
-        "filters": filters.dict()
+
+    scan_id = await run_in_threadpool(enqueue_scan, filters.roles, filters.location, filters.language, filters.incremental)
+    queued = scan_status(await run_in_threadpool(get_scan, scan_id))
+    await run_in_threadpool(add_scan_event, scan_id, "progress", queued)
+    return {"message": "Search queued", "scan_id": scan_id}
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+def _find_report(scan_id=None):
+    """Report file of the given scan, else of the last finished scan, else the newest one on disk."""
+    if scan_id is None:
+        done = list_scans(limit=1, status="done")
+        if done and done[0]["report"] and os.path.exists(done[0]["report"]):
+            return done[0]["report"]
+    if scan_id is not None:
+        path = report_path(scan_id)
+        return path if os.path.exists(path) else None
+    if os.path.isdir(REPORTS_DIR):
+        reports = [os.path.join(REPORTS_DIR, name) for name in os.listdir(REPORTS_DIR) if name.endswith(".xlsx")]
+        if reports:
+            return max(reports, key=os.path.getmtime)
+    # Reports written before per-scan files existed
+    return OUTPUT_FILENAME if os.path.exists(OUTPUT_FILENAME) else None
+
+def _not_modified(request, etag, mtime):
+    """Evaluates If-None-Match / If-Modified-Since against the file's validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _report_response(request, path):
+    """
+    Streams a report with ETag/Last-Modified validators. Repeat downloads get a 304,
+    and Range requests are served by FileResponse without reading the whole file.
+    """
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        # Clients may keep a copy but must revalidate, which is a cheap 304
+        "Cache-Control": "private, no-cache",
     }
-    background_tasks.add_task(search_task, filters.roles, filters.location, filters.language)
-    return {"message": "Search started"}
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path,
+        media_type=XLSX_MEDIA_TYPE,
+        filename=os.path.basename(path),
+        headers=headers,
+        stat_result=stat,
+    )
 
 @app.get("/api/download-report")
-async def download_report():
-    print(f"DEBUG: Export download requested. File exists: {os.path.exists(OUTPUT_FILENAME)}")
-    if os.path.exists(OUTPUT_FILENAME):
-        with open(OUTPUT_FILENAME, "rb") as f:
-            file_content = f.read()
-        
-        # Manually construct the response to avoid any auto-header conflicts
-        return Response(
-            content=file_content,
-            media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={
-                "Content-Disposition": 'attachment; filename="jobs_report.xlsx"',
-                "Content-Length": str(len(file_content)),
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-            }
-        )
+async def download_report(request: Request, scan_id: Optional[int] = None):
+    path = await run_in_threadpool(_find_report, scan_id)
+    if path:
+        return _report_response(request, path)
     return {"error": "File not found"}
 
+@app.get("/api/reports/{scan_id}")
+async def get_scan_report(request: Request, scan_id: int):
+    """Report of one specific scan."""
+    return await download_report(request, scan_id)
+
+@app.get("/api/export")
+async def export_saved_jobs(format: str = "csv"):
+    """Exports every stored job as xlsx, csv, jsonl or parquet and returns the file."""
+    if format not in EXPORTERS:
+        return {"error": f"Unknown format {format!r}, expected one of: {', '.join(EXPORTERS)}"}
+    try:
+        # Exporting the full table is blocking work, keep it off the event loop
+        stats = await run_in_threadpool(export_jobs, format)
+    except RuntimeError as e:
+        return {"error": str(e)}
+    return FileResponse(
+        stats["path"],
+        media_type=EXPORTERS[format]["media_type"],
+        filename=os.path.basename(stats["path"]),
+        headers={"X-Export-Rows": str(stats["rows"]), "X-Export-Rows-Per-Sec": str(stats["rows_per_sec"])},
+    )
+
 # --- SAAS ENDPOINTS ---
 
+_stats_cache = {"data": None, "expires": 0.0}
+
 @app.get("/api/stats")
 async def get_db_stats():
-    """Returns total jobs and scans from DB."""
-    return get_stats()
+    """Returns total jobs and scans from DB, cached for STATS_CACHE_TTL seconds."""
+    now = time.monotonic()
+    if _stats_cache["data"] is None or now >= _stats_cache["expires"]:
+        _stats_cache["data"] = await run_in_threadpool(get_stats)
+        _stats_cache["expires"] = now + STATS_CACHE_TTL
+    return _stats_cache["data"]
+
+@app.get("/api/navigation")
+async def get_navigation_stats():
+    """Per-host request, retry, throttle and block counters, per-portal circuit breaker state and interception counters."""
+    return dict(navigation_stats(), interception=interception_stats())
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """Prometheus metrics: scans by status, stage timings of the latest scan and event loop lag."""
+    scan_counts = await run_in_threadpool(count_scans_by_status)
+    latest = await run_in_threadpool(latest_scan_metrics)
+    text = prometheus_text(scan_counts, latest, loop_monitor.stats())
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
 
 @app.get("/api/jobs")
-async def get_saved_jobs(limit: int = 50):
-    """Returns recent job leads from DB."""
-    return get_all_jobs(limit=limit)
+async def get_saved_jobs(
+    limit: int = 50,
+    after: Optional[str] = None,
+    source: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+):
+    """Returns job leads from DB, newest first. Pass `next_cursor` back as `after` for the next page."""
+    try:
+        return await run_in_threadpool(
+            get_jobs_page,
+            limit=max(1, min(limit, 500)),
+            after=after,
+            source=source,
+            status=status,
+            since=since,
+            until=until,
+        )
+    except ValueError as e:
+        return {"error": str(e)}
+
+@app.get("/api/jobs/search")
+async def search_saved_jobs(q: str, limit: int = 20, offset: int = 0):
+    """Full-text search over stored jobs, ranked, with highlighted description snippets."""
+    return await run_in_threadpool(search_jobs, q, limit=max(1, min(limit, 100)), offset=max(0, offset))
 
 # Serve React production build only when not on Vercel
 # Vercel handles static file serving via vercel.json rewrites
@@ -0,0 +1,51 @@
+"""
+Shared fixtures. Every test gets its own SQLite database and working directory,
+so reports and exports land in a temporary directory. No browser is needed.
+"""
+import os
+import tempfile
+
+import pytest
+
+import database
+
+# server.py runs init_db() on import; keep that away from the working copy's database
+database.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="jobs-agent-tests-"), "jobs_agent.db")
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh, initialized database; the test runs inside tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "jobs_agent.db"))
+    database.close_db_connection()
+    database.init_db()
+    yield database
+    database.close_db_connection()
+
+
+@pytest.fixture
+def make_job():
+    """Builds a job dict as the engine produces it; keyword arguments override fields."""
+    def make(n, **fields):
+        job = {
+            "title": f"Frontend Developer {n}",
+            "company": f"Company {n}",
+            "location": "Germany",
+            "link": f"https://example.com/jobs/{n}",
+            "emails": [f"jobs{n}@example.com"],
+            "source": "LinkedIn",
+            "description": f"We are hiring a frontend developer, posting {n}.",
+        }
+        job.update(fields)
+        return job
+    return make
+
+
+@pytest.fixture
+def client(db):
+    """FastAPI test client. The lifespan (in-process workers, event relay) is not started."""
+    from fastapi.testclient import TestClient
+    import server
+    server._stats_cache.update(data=None, expires=0.0)
+    return TestClient(server.app)
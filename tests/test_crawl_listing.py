@@ -0,0 +1,133 @@
+"""crawl_listing against a fake browser pool; listing pages are lists of card links."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import engine
+
+
+class FakePage:
+    def __init__(self, portal):
+        self.portal = portal
+
+    async def wait_for_selector(self, selector, timeout=None):
+        pass
+
+
+class FakePool:
+    @asynccontextmanager
+    async def page(self, portal):
+        yield FakePage(portal)
+
+
+class FakeAdapter:
+    name = "Fake"
+    card_spec = {"card": ".card"}
+
+    def __init__(self, pages=5, max_cards=100):
+        self.depth = {"pages": pages, "max_cards": max_cards}
+
+    def page_url(self, base_url, n):
+        return n
+
+    async def prepare_page(self, page):
+        pass
+
+    def is_blocked(self, *args):
+        return False
+
+    def to_card(self, raw, target_lang):
+        return ("Title", "Company", raw["link"])
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    """Returns crawl(pages_of_links, ...) -> (processed links, outcome, navigation log)."""
+    monkeypatch.setattr(engine, "get_known_links", lambda links, **kw: {l for l in links if l.startswith("old")})
+    monkeypatch.setattr(engine, "SKIP_KNOWN_JOBS", True)
+
+    def crawl(pages, pages_limit=5, max_cards=100, failing=(), stop_at_known=False):
+        log = []
+
+        async def navigate(page, url, *args, **kwargs):
+            log.append(("navigate", url))
+            if url in failing:
+                raise RuntimeError("navigation failed")
+
+        async def extract_cards(page, spec):
+            return [{"link": link} for link in pages.pop(0)] if pages else []
+
+        async def process_cards(cards):
+            log.append(("process", [card[2] for card in cards]))
+            return [card[2] for card in cards]
+
+        monkeypatch.setattr(engine, "navigate", navigate)
+        monkeypatch.setattr(engine, "extract_cards", extract_cards)
+        outcome = {}
+        jobs = asyncio.run(engine.crawl_listing(
+            FakePool(), FakeAdapter(pages_limit, max_cards), "https://example.com", "English",
+            process_cards, stop_at_known=stop_at_known, outcome=outcome,
+        ))
+        return jobs, outcome, log
+
+    return crawl
+
+
+def test_walk_ends_when_results_run_out(listing):
+    jobs, outcome, _ = listing([["a", "b"], ["b", "c"], []])
+    assert jobs == ["a", "b", "c"]
+    assert outcome["truncated"] is None
+
+
+def test_next_page_is_prefetched_while_details_are_processed(listing):
+    _, _, log = listing([["a"], ["b"], []])
+    assert log.index(("navigate", 1)) < log.index(("process", ["a"]))
+    assert log.index(("navigate", 2)) < log.index(("process", ["b"]))
+
+
+def test_page_of_known_jobs_does_not_end_a_full_scan(listing):
+    jobs, outcome, _ = listing([["old1", "old2"], ["a", "old3"], []])
+    assert jobs == ["a"]
+    assert outcome["truncated"] is None
+
+
+def test_incremental_walk_stops_at_the_first_known_job(listing):
+    jobs, outcome, log = listing([["a", "old1", "b"], ["c"]], stop_at_known=True)
+    assert jobs == ["a"]
+    assert outcome["truncated"] is None
+    assert ("process", ["c"]) not in log
+
+
+@pytest.mark.parametrize("pages, pages_limit, max_cards, reason", [
+    ([["a"], ["b"], ["c"]], 2, 100, "page limit (2) reached"),
+    ([["a", "b"], ["c", "d"]], 5, 3, "max_cards (3) reached"),
+])
+def test_truncated_walks_are_recorded(listing, pages, pages_limit, max_cards, reason):
+    jobs, outcome, _ = listing(pages, pages_limit=pages_limit, max_cards=max_cards)
+    assert len(jobs) == min(max_cards, pages_limit)
+    assert outcome["truncated"] == reason
+
+
+def test_filling_max_cards_exactly_counts_as_truncated(listing):
+    # More postings may follow on the next page, so the window was not fully read
+    jobs, outcome, _ = listing([["a", "b"], ["c"]], max_cards=2)
+    assert jobs == ["a", "b"]
+    assert outcome["truncated"] == "max_cards (2) reached"
+
+
+def test_filling_max_cards_at_the_first_known_job_is_complete(listing):
+    jobs, outcome, _ = listing([["a", "b", "old1"]], max_cards=2, stop_at_known=True)
+    assert jobs == ["a", "b"]
+    assert outcome["truncated"] is None
+
+
+def test_failed_later_page_truncates_the_walk(listing):
+    jobs, outcome, _ = listing([["a"], ["b"]], failing=(1,))
+    assert jobs == ["a"]
+    assert outcome["truncated"] == "page 2 failed"
+
+
+def test_unreachable_first_page_raises(listing):
+    with pytest.raises(RuntimeError):
+        listing([["a"]], failing=(0,))
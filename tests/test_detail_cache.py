@@ -0,0 +1,91 @@
+import sqlite3
+import time
+
+import pytest
+
+from detail_cache import DetailCache
+from utils import normalize_link
+
+DETAIL = {"description": "We are hiring.", "emails": ["jobs@example.com"], "language": "en"}
+
+
+@pytest.mark.parametrize("link, expected", [
+    ("https://www.linkedin.com/jobs/view/123/?refId=abc&trackingId=xyz", "https://www.linkedin.com/jobs/view/123"),
+    ("HTTPS://DE.Indeed.com/viewjob?jk=9&from=serp&utm_source=mail", "https://de.indeed.com/viewjob?jk=9"),
+    ("https://example.com/jobs?b=2&a=1#apply", "https://example.com/jobs?a=1&b=2"),
+    ("https://example.com/", "https://example.com/"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_link(link, expected):
+    assert normalize_link(link) == expected
+
+
+def test_normalize_link_is_idempotent():
+    link = normalize_link("https://example.com/jobs/1/?trk=a&id=5")
+    assert normalize_link(link) == link
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = DetailCache(path=str(tmp_path / "detail_cache.db"), ttl=3600, max_bytes=10_000)
+    yield cache
+    cache.conn.close()
+
+
+def test_put_and_get_by_normalized_link(cache):
+    cache.put("https://example.com/jobs/1?trk=listing", DETAIL)
+    assert cache.get("https://example.com/jobs/1/?refId=other") == DETAIL
+    assert cache.get("https://example.com/jobs/2") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_expired_entries_miss(cache):
+    cache.put("https://example.com/jobs/1", DETAIL)
+    cache.ttl = -1
+    assert cache.get("https://example.com/jobs/1") is None
+
+
+def test_evicts_least_recently_used(cache):
+    big = dict(DETAIL, description="x" * 4000)
+    cache.put("https://example.com/jobs/1", big)
+    time.sleep(0.01)
+    cache.put("https://example.com/jobs/2", big)
+    time.sleep(0.01)
+    assert cache.get("https://example.com/jobs/1")
+    time.sleep(0.01)
+    # Over max_bytes: the least recently used entry (2) goes, the recently read one stays
+    cache.put("https://example.com/jobs/3", big)
+    assert cache.get("https://example.com/jobs/2") is None
+    assert cache.get("https://example.com/jobs/1")
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_access_times_are_written_in_batches(cache):
+    cache.put("https://example.com/jobs/1", DETAIL)
+    before = cache.conn.execute("SELECT last_access FROM detail_cache").fetchone()[0]
+    time.sleep(0.01)
+    cache.get("https://example.com/jobs/1")
+    assert cache.conn.execute("SELECT last_access FROM detail_cache").fetchone()[0] == before
+    cache.put("https://example.com/jobs/2", DETAIL)
+    rows = dict(cache.conn.execute("SELECT link, last_access FROM detail_cache").fetchall())
+    assert rows["https://example.com/jobs/1"] > before
+
+
+def test_locked_database_does_not_raise(cache):
+    cache.put("https://example.com/jobs/1", DETAIL)
+    cache.conn.execute("PRAGMA busy_timeout = 10")
+    other = sqlite3.connect(cache.path)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        # Reads still work in WAL mode; the write fails with "database is locked" and is skipped
+        assert cache.get("https://example.com/jobs/1") == DETAIL
+        assert cache.put("https://example.com/jobs/2", DETAIL) == DETAIL
+    finally:
+        other.rollback()
+        other.close()
+    assert cache.get("https://example.com/jobs/2") is None
+    cache.put("https://example.com/jobs/2", DETAIL)
+    assert cache.get("https://example.com/jobs/2") == DETAIL
@@ -0,0 +1,97 @@
+import asyncio
+
+from starlette.requests import Request
+
+import events
+
+
+def _ids(subscriber):
+    return [event[0] for event in subscriber._drain()]
+
+
+def test_publish_fans_out_one_encoded_message():
+    broker = events.EventBroker()
+    first, second = broker.subscribe(), broker.subscribe()
+    event_id = broker.publish("jobs", {"count": 2})
+    assert event_id == 1
+    message = first.queue.get_nowait()[2]
+    assert message == 'id: 1\nevent: jobs\ndata: {"count":2}\n\n'
+    assert second.queue.get_nowait()[2] is message
+    assert broker.stats() == {"subscribers": 2, "last_event_id": 1}
+
+
+def test_reconnect_replays_events_after_last_event_id():
+    broker = events.EventBroker(history_size=3)
+    for n in range(5):
+        broker.publish("progress", {"n": n}, event_id=10 + n)
+    assert _ids(broker.subscribe(last_event_id=11)) == [12, 13, 14]
+    assert _ids(broker.subscribe(last_event_id=13)) == [14]
+    assert _ids(broker.subscribe()) == []
+
+
+def test_slow_subscriber_loses_progress_snapshots_first():
+    broker = events.EventBroker(queue_size=3)
+    subscriber = broker.subscribe()
+    broker.publish("progress", {})
+    broker.publish("jobs", {})
+    broker.publish("progress", {})
+    broker.publish("jobs", {})
+    assert not subscriber.dropped
+    assert [event[1] for event in subscriber._drain()] == ["jobs", "jobs"]
+
+
+def test_subscriber_is_cut_off_when_only_jobs_are_queued():
+    broker = events.EventBroker(queue_size=2)
+    subscriber = broker.subscribe()
+    for _ in range(3):
+        broker.publish("jobs", {})
+    assert subscriber.dropped
+    assert _ids(subscriber) == [1, 2]
+
+    async def read():
+        return [message async for message in broker.stream(subscriber)]
+    assert asyncio.run(read()) == []
+    assert subscriber not in broker.subscribers
+
+    # It picks up from history when it reconnects
+    assert _ids(broker.subscribe(last_event_id=2)) == [3]
+
+
+def test_stream_sends_snapshot_then_events_and_keepalives():
+    broker = events.EventBroker()
+
+    async def read():
+        subscriber = broker.subscribe()
+        stream = broker.stream(subscriber, events.sse_message("progress", {"status": "idle"}), keepalive=0.01)
+        messages = [await stream.__anext__()]
+        broker.publish("jobs", {"count": 1})
+        messages.append(await stream.__anext__())
+        messages.append(await stream.__anext__())
+        await stream.aclose()
+        return messages
+
+    snapshot, event, keepalive = asyncio.run(read())
+    assert snapshot == 'event: progress\ndata: {"status":"idle"}\n\n'
+    assert event.startswith("id: 1\nevent: jobs\n")
+    assert keepalive == ": keepalive\n\n"
+    assert broker.subscribers == set()
+
+
+def test_events_endpoint_starts_with_status_and_replays(db, monkeypatch):
+    import server
+    broker = events.EventBroker()
+    monkeypatch.setattr(server, "broker", broker)
+    for n in range(1, 4):
+        broker.publish("jobs", {"n": n}, event_id=n)
+
+    async def read():
+        request = Request({"type": "http", "method": "GET", "path": "/api/events", "headers": [(b"last-event-id", b"2")]})
+        response = await server.scan_events(request)
+        assert response.media_type == "text/event-stream"
+        messages = [await response.body_iterator.__anext__() for _ in range(2)]
+        await response.body_iterator.aclose()
+        return messages
+
+    snapshot, replayed = asyncio.run(read())
+    assert snapshot.startswith("event: progress\n")
+    assert replayed.startswith("id: 3\nevent: jobs\n")
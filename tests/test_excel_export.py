@@ -0,0 +1,50 @@
+from openpyxl import load_workbook
+
+import exporter
+
+
+def _read(path):
+    ws = load_workbook(path).active
+    return [[cell.value for cell in row] for row in ws.iter_rows()]
+
+
+def test_write_xlsx_styles_links_and_cleans_values(tmp_path, make_job):
+    path = tmp_path / "jobs.xlsx"
+    jobs = [
+        make_job(1, emails=["a@example.com", "b@example.com"], company="Acme\x07 GmbH"),
+        make_job(2, link="", source=None),
+    ]
+    assert exporter.write_xlsx(iter(jobs), path) == 2
+
+    rows = _read(path)
+    assert rows[0] == ["Title", "Company", "Location", "Link", "Emails", "Source"]
+    assert rows[1] == [
+        "Frontend Developer 1", "Acme GmbH", "Germany",
+        '=HYPERLINK("https://example.com/jobs/1", "OPEN JOB POSTING")',
+        "a@example.com\nb@example.com", "LinkedIn",
+    ]
+    assert rows[2][3] is None and rows[2][5] is None
+
+    ws = load_workbook(path).active
+    assert ws.freeze_panes == "A2"
+    assert ws["A1"].font.bold
+    assert ws.column_dimensions["A"].width == 40
+
+
+def test_iter_jobs_streams_every_row_newest_first(db, make_job):
+    db.save_jobs([make_job(n) for n in range(7)])
+    rows = list(db.iter_jobs(chunk_size=3))
+    assert [row["id"] for row in rows] == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_export_db_to_excel_reads_from_the_database(db, make_job, tmp_path):
+    db.save_jobs([make_job(n) for n in range(3)])
+    path = exporter.export_db_to_excel(str(tmp_path / "all.xlsx"))
+    assert [row[0] for row in _read(path)[1:]] == [f"Frontend Developer {n}" for n in (2, 1, 0)]
+
+
+def test_export_to_excel_creates_the_directory(tmp_path, make_job):
+    path = tmp_path / "reports" / "scan.xlsx"
+    assert exporter.export_to_excel([make_job(1)], str(path)) == str(path)
+    assert len(_read(path)) == 2
+    assert exporter.export_to_excel([], str(path)) is None
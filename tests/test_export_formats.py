@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import os
+
+import pyarrow.parquet as pq
+import pytest
+
+import exporter
+
+
+@pytest.fixture
+def saved(db, make_job):
+    db.save_jobs([
+        make_job(1, emails=["a@example.com", "b@example.com"]),
+        make_job(2, emails=[], description="Zürich, ünïcode"),
+    ])
+    return db
+
+
+def test_csv_has_header_and_newline_separated_emails(saved, tmp_path):
+    stats = exporter.export_jobs("csv", str(tmp_path / "jobs.csv"))
+    assert stats["rows"] == 2 and stats["format"] == "csv"
+    with open(stats["path"], newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == exporter.DATA_COLUMNS
+    assert rows[1]["emails"] == "a@example.com\nb@example.com"
+    assert rows[0]["description"] == "Zürich, ünïcode"
+
+
+def test_jsonl_writes_emails_as_a_list(saved, tmp_path):
+    path = exporter.export_jobs("jsonl", str(tmp_path / "jobs.jsonl"))["path"]
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["id"] for r in records] == [2, 1]
+    assert records[0]["emails"] == []
+    assert records[1]["emails"] == ["a@example.com", "b@example.com"]
+
+
+def test_parquet_round_trips(saved, tmp_path, monkeypatch):
+    monkeypatch.setattr(exporter, "EXPORT_CHUNK_SIZE", 1)
+    path = exporter.export_jobs("parquet", str(tmp_path / "jobs.parquet"))["path"]
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read().to_pydict()
+    assert table["id"] == [2, 1]
+    assert table["emails"] == [[], ["a@example.com", "b@example.com"]]
+
+
+def test_export_is_atomic_and_records_throughput(saved, tmp_path):
+    stats = exporter.export_jobs("csv", str(tmp_path / "jobs.csv"))
+    assert stats["bytes"] == os.path.getsize(stats["path"])
+    assert exporter.export_stats["csv"] is stats
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".export-")]
+
+
+def test_failed_export_leaves_no_files(db, tmp_path):
+    def broken_rows():
+        yield {"title": "x"}
+        raise RuntimeError("db went away")
+
+    with pytest.raises(RuntimeError):
+        exporter.export_jobs("jsonl", str(tmp_path / "jobs.jsonl"), rows=broken_rows())
+    assert [name for name in os.listdir(tmp_path) if not name.startswith("jobs_agent.db")] == []
+
+
+def test_unknown_format_is_rejected(db):
+    with pytest.raises(ValueError):
+        exporter.export_jobs("xml")
+
+
+def test_export_endpoint(client, saved):
+    response = client.get("/api/export", params={"format": "jsonl"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["x-export-rows"] == "2"
+    assert len(response.text.splitlines()) == 2
+    assert os.path.exists(exporter.default_export_path("jsonl"))
+
+    response = client.get("/api/export", params={"format": "csv"})
+    assert next(csv.reader(io.StringIO(response.text))) == exporter.DATA_COLUMNS
+
+    assert "error" in client.get("/api/export", params={"format": "xml"}).json()
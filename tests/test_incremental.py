@@ -0,0 +1,141 @@
+import asyncio
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import main
+import portals
+import worker
+
+NOW = 1_000_000.0
+CLOCK = SimpleNamespace(time=lambda: NOW)
+
+
+def test_watermarks_are_keyed_by_language_and_only_move_forward(db):
+    db.set_watermark("Dev", "Berlin", "English", "LinkedIn", 100.0, scan_id=1)
+    db.set_watermark("Dev", "Berlin", "German", "LinkedIn", 300.0)
+    db.set_watermark("QA", "Berlin", "English", "Indeed", 200.0)
+    db.set_watermark("Dev", "Munich", "English", "LinkedIn", 400.0)
+
+    assert db.get_watermarks(["Dev", "QA"], "Berlin", "English") == {("Dev", "LinkedIn"): 100.0, ("QA", "Indeed"): 200.0}
+    assert db.get_watermarks(["Dev"], "Berlin", "German") == {("Dev", "LinkedIn"): 300.0}
+
+    db.set_watermark("Dev", "Berlin", "English", "LinkedIn", 50.0, scan_id=2)
+    assert db.get_watermarks(["Dev"], "Berlin", "English") == {("Dev", "LinkedIn"): 100.0}
+    db.set_watermark("Dev", "Berlin", "English", "LinkedIn", 150.0, scan_id=3)
+    assert db.get_watermarks(["Dev"], "Berlin", "English") == {("Dev", "LinkedIn"): 150.0}
+
+
+def test_watermarks_without_a_language_are_discarded(db):
+    with db.db_connection() as conn:
+        conn.execute("DROP TABLE scan_watermarks")
+        conn.execute("CREATE TABLE scan_watermarks (role TEXT, location TEXT, portal TEXT, since REAL, scan_id INTEGER, "
+                     "PRIMARY KEY (role, location, portal))")
+        conn.execute("INSERT INTO scan_watermarks VALUES ('Dev', 'Berlin', 'LinkedIn', 100.0, 1)")
+    db.init_db()
+    assert db.get_watermarks(["Dev"], "Berlin", "Both") == {}
+    db.set_watermark("Dev", "Berlin", "Both", "LinkedIn", 100.0)
+    db.init_db()
+    assert db.get_watermarks(["Dev"], "Berlin", "Both") == {("Dev", "LinkedIn"): 100.0}
+
+
+def _adapter(**options):
+    return portals.PortalAdapter("Fake", "https://jobs.example/search?q={keyword}&l={location}", ".card", {}, **options)
+
+
+def _query(url):
+    return {key: values[0] for key, values in parse_qs(urlsplit(url).query).items()}
+
+
+def test_search_url_narrows_to_the_window(monkeypatch):
+    monkeypatch.setattr(portals, "time", CLOCK)
+    adapter = _adapter(time_filter={"param": "age", "template": "r{}", "unit": 1}, newest_first={"sort": "date"})
+
+    assert adapter.search_url("Frontend Dev", "Berlin") == "https://jobs.example/search?q=Frontend%20Dev&l=Berlin"
+    since = NOW - 3600
+    assert _query(adapter.search_url("Frontend Dev", "Berlin", since)) == {
+        "q": "Frontend Dev", "l": "Berlin", "sort": "date", "age": f"r{3600 + portals.INCREMENTAL_OVERLAP}",
+    }
+
+
+def test_time_window_rounds_up_to_the_portal_choices(monkeypatch):
+    monkeypatch.setattr(portals, "time", CLOCK)
+    adapter = _adapter(time_filter={"param": "fromage", "template": "{}", "unit": 86400, "choices": [1, 3, 7]})
+    assert adapter.time_window(NOW - 60) == 1
+    assert adapter.time_window(NOW - 2 * 86400) == 3
+    assert adapter.time_window(NOW - 30 * 86400) == 7
+
+
+def test_portal_without_filters_keeps_its_url():
+    adapter = _adapter()
+    assert adapter.search_url("Dev", "Berlin", since=NOW) == "https://jobs.example/search?q=Dev&l=Berlin"
+
+
+@pytest.fixture
+def fake_portals(db, monkeypatch):
+    """Two portals; `results[portal]` is (jobs, outcome fields). Returns the `since` values asked for."""
+    monkeypatch.setattr(main, "ADAPTERS", {"Good": None, "Cut": None})
+    asked = {}
+    results = {
+        "Good": ([{"title": "Dev", "company": "A", "location": "Berlin", "link": "https://a.example/1",
+                   "emails": [], "source": "Good", "description": "x"}], {}),
+        "Cut": ([], {"truncated": "page 2 failed"}),
+    }
+
+    async def scrape_portal(portal, role, location, language, since=None, outcome=None):
+        asked[(role, portal)] = since
+        jobs, fields = results[portal]
+        outcome.update(detail_failures=0, truncated=None)
+        outcome.update(fields)
+        outcome["complete"] = not outcome["detail_failures"] and not outcome["truncated"]
+        return jobs
+
+    monkeypatch.setattr(main, "scrape_portal", scrape_portal)
+    return asked
+
+
+def test_incremental_scan_moves_only_complete_watermarks(fake_portals, db, monkeypatch):
+    monkeypatch.setattr(main, "time", CLOCK)
+    db.set_watermark("Dev", "Berlin", "English", "Cut", 500.0)
+
+    scan_id = db.enqueue_scan(["Dev"], "Berlin", "English", incremental=True)
+    report = asyncio.run(main.run_job_agent(["Dev"], "Berlin", "English", scan_id=scan_id, incremental=True))
+    assert report.endswith(f"jobs_report_{scan_id}.xlsx")
+    assert fake_portals == {("Dev", "Good"): None, ("Dev", "Cut"): 500.0}
+    assert db.get_watermarks(["Dev"], "Berlin", "English") == {("Dev", "Good"): NOW, ("Dev", "Cut"): 500.0}
+    assert db.get_watermarks(["Dev"], "Berlin", "German") == {}
+
+
+def test_full_scan_ignores_and_keeps_watermarks(fake_portals, db):
+    db.set_watermark("Dev", "Berlin", "English", "Good", 500.0)
+    asyncio.run(main.run_job_agent(["Dev"], "Berlin", "English"))
+    assert fake_portals == {("Dev", "Good"): None, ("Dev", "Cut"): None}
+    assert db.get_watermarks(["Dev"], "Berlin", "English") == {("Dev", "Good"): 500.0}
+
+
+def test_scheduled_scans_are_not_queued_twice(db):
+    first = db.enqueue_scheduled_scan(["Dev"], "Berlin", "Both", 3600)
+    assert first is not None and db.get_scan(first)["incremental"] == 1
+    assert db.enqueue_scheduled_scan(["Dev"], "Berlin", "Both", 3600) is None
+    assert db.enqueue_scheduled_scan(["Dev"], "Munich", "Both", 3600) is not None
+
+    # Finished, but queued within the interval
+    db.finish_scan(first, "done")
+    assert db.enqueue_scheduled_scan(["Dev"], "Berlin", "Both", 3600) is None
+    with db.db_connection() as conn:
+        conn.execute("UPDATE scans SET timestamp = datetime('now', '-2 hours') WHERE id = ?", (first,))
+    assert db.enqueue_scheduled_scan(["Dev"], "Berlin", "Both", 3600) is not None
+
+
+def test_run_schedule_queues_due_scans(db):
+    schedule = [{"roles": ["Dev"], "location": "Berlin", "language": "Both", "every_minutes": 60}]
+
+    async def run():
+        scheduler = asyncio.create_task(worker.run_schedule(schedule, poll_interval=0.01))
+        await asyncio.sleep(0.05)
+        scheduler.cancel()
+        await asyncio.gather(scheduler, return_exceptions=True)
+
+    asyncio.run(run())
+    assert [(scan["roles"], scan["incremental"]) for scan in db.list_scans()] == [("Dev", 1)]
@@ -0,0 +1,129 @@
+"""InterceptionPolicy against fake Playwright pages, routes and requests."""
+import asyncio
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+
+import interception
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type, navigation=False, size=100, closed=False):
+        self.url = url
+        self.resource_type = resource_type
+        self.navigation = navigation
+        self.size = size
+        self.closed = closed
+
+    def is_navigation_request(self):
+        return self.navigation
+
+    async def sizes(self):
+        if self.closed:
+            raise PlaywrightError("Target page, context or browser has been closed")
+        return {"responseBodySize": self.size, "requestBodySize": 0}
+
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.result = None
+
+    async def abort(self, error_code=None):
+        self.result = ("abort", error_code)
+
+    async def continue_(self):
+        self.result = ("continue", None)
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(interception, "_stats", {})
+
+
+def _load(policy, requests, portal="Fake"):
+    """Routes the requests through a new page; requests that were let through finish."""
+    async def run():
+        page = FakePage()
+        await policy.apply(page, portal)
+        routes = []
+        for request in requests:
+            route = FakeRoute(request)
+            await page.route_handler(route)
+            if route.result[0] == "continue":
+                await page.handlers["requestfinished"](request)
+            routes.append(route)
+        return routes
+    return asyncio.run(run())
+
+
+def test_blocks_resource_types_and_tracker_domains():
+    policy = interception.InterceptionPolicy(resource_types=["image", "font"], blocked_domains=["Tracker.com"])
+    routes = _load(policy, [
+        FakeRequest("https://jobs.example/list", "document", navigation=True, size=5000),
+        FakeRequest("https://jobs.example/logo.png", "image"),
+        FakeRequest("https://cdn.tracker.com/t.js", "script"),
+        FakeRequest("https://tracker.com.example/app.js", "script", size=300),
+    ])
+    assert [route.result[0] for route in routes] == ["continue", "abort", "abort", "continue"]
+    assert routes[1].result == ("abort", "blockedbyclient")
+
+    stats = interception.interception_stats()["Fake"]
+    assert stats["requests_allowed"] == 2 and stats["requests_blocked"] == 2
+    assert stats["blocked_by_type"] == {"image": 1}
+    assert stats["blocked_by_domain"] == {"tracker.com": 1}
+    assert stats["bytes_loaded"] == 5300
+    assert stats["blocked_share"] == 0.5
+
+
+def test_counters_are_kept_per_page():
+    policy = interception.InterceptionPolicy(resource_types=["image"])
+    _load(policy, [FakeRequest("https://jobs.example/1", "document", navigation=True, size=1000)])
+    _load(policy, [
+        FakeRequest("https://jobs.example/2", "document", navigation=True, size=3000),
+        FakeRequest("https://jobs.example/2.png", "image"),
+        FakeRequest("https://jobs.example/closed.js", "script", closed=True),
+    ])
+
+    stats = interception.interception_stats()["Fake"]
+    assert stats["pages"] == 2
+    assert stats["bytes_per_page"] == 2000
+    assert stats["requests_per_page"] == 2.0
+    assert stats["recent_pages"] == [
+        {"url": "https://jobs.example/1", "requests_allowed": 1, "requests_blocked": 0, "bytes_loaded": 1000},
+        {"url": "https://jobs.example/2", "requests_allowed": 2, "requests_blocked": 1, "bytes_loaded": 3000},
+    ]
+
+
+def test_recent_pages_are_bounded(monkeypatch):
+    monkeypatch.setattr(interception, "INTERCEPTION_PAGES_KEPT", 3)
+    policy = interception.InterceptionPolicy()
+    for n in range(5):
+        _load(policy, [FakeRequest(f"https://jobs.example/{n}", "document", navigation=True)])
+    stats = interception.interception_stats()["Fake"]
+    assert stats["pages"] == 5
+    assert [page["url"] for page in stats["recent_pages"]] == [f"https://jobs.example/{n}" for n in (2, 3, 4)]
+
+
+def test_portal_overrides_replace_defaults():
+    policy = interception.InterceptionPolicy.for_portal({"resource_types": ["media"], "detail_javascript": False})
+    assert policy.resource_types == {"media"}
+    assert policy.detail_javascript is False
+    assert policy.blocked_domains == tuple(d.lower() for d in interception.INTERCEPTION["blocked_domains"])
+
+
+def test_navigation_endpoint_serves_interception_counters(client):
+    _load(interception.InterceptionPolicy(), [FakeRequest("https://jobs.example/1", "document", navigation=True)])
+    body = client.get("/api/navigation").json()
+    assert body["interception"]["Fake"]["recent_pages"][0]["url"] == "https://jobs.example/1"
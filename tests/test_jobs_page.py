@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def jobs(db, make_job):
+    """25 jobs, two per day going back from 2026-10-12, alternating sources."""
+    db.save_jobs([make_job(n, source=("LinkedIn", "Indeed")[n % 2]) for n in range(25)])
+    with db.db_connection() as conn:
+        conn.execute("UPDATE jobs SET created_at = datetime('2026-10-12 12:00:00', '-' || (id / 2) || ' days')")
+    return db
+
+
+def _walk(db, **filters):
+    seen, after = [], None
+    while True:
+        page = db.get_jobs_page(limit=10, after=after, **filters)
+        seen += page["jobs"]
+        after = page["next_cursor"]
+        if after is None:
+            return seen
+
+
+def test_pages_cover_every_job_once_newest_first(jobs):
+    seen = _walk(jobs)
+    assert len(seen) == 25
+    assert len({job["id"] for job in seen}) == 25
+    keys = [(job["created_at"], job["id"]) for job in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_last_page_has_no_cursor(jobs):
+    first = jobs.get_jobs_page(limit=25)
+    assert len(first["jobs"]) == 25
+    assert first["next_cursor"] is None
+
+
+def test_filters(jobs):
+    linkedin = _walk(jobs, source="LinkedIn")
+    assert len(linkedin) == 13
+    assert {job["source"] for job in linkedin} == {"LinkedIn"}
+
+    window = _walk(jobs, since="2026-10-10", until="2026-10-12")
+    assert {job["created_at"][:10] for job in window} == {"2026-10-10", "2026-10-11"}
+    assert _walk(jobs, status="applied") == []
+
+
+def test_cursor_round_trip():
+    from database import encode_cursor, decode_cursor
+    token = encode_cursor({"created_at": "2026-10-12 12:00:00", "id": 42})
+    assert decode_cursor(token) == ("2026-10-12 12:00:00", 42)
+
+
+@pytest.mark.parametrize("token", ["", "42", "2026-10-12,abc", ",7"])
+def test_malformed_cursor(token):
+    from database import decode_cursor
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_jobs_endpoint(client, jobs):
+    first = client.get("/api/jobs", params={"limit": 10}).json()
+    assert len(first["jobs"]) == 10
+    second = client.get("/api/jobs", params={"limit": 10, "after": first["next_cursor"]}).json()
+    assert not {job["id"] for job in first["jobs"]} & {job["id"] for job in second["jobs"]}
+
+    assert client.get("/api/jobs", params={"source": "Indeed", "limit": 500}).json()["next_cursor"] is None
+    assert "error" in client.get("/api/jobs", params={"after": "not-a-cursor"}).json()
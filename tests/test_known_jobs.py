@@ -0,0 +1,87 @@
+def _age(db, link, days):
+    with db.db_connection() as conn:
+        conn.execute(
+            "UPDATE jobs SET created_at = datetime('now', ?), refreshed_at = NULL WHERE link = ?",
+            (f"-{days} days", link),
+        )
+
+
+def _job(db, link):
+    with db.db_connection() as conn:
+        return dict(conn.execute("SELECT * FROM jobs WHERE link = ?", (link,)).fetchone())
+
+
+def test_get_known_links(db, make_job):
+    db.save_jobs([make_job(1), make_job(2)])
+    links = [make_job(n)["link"] for n in (1, 2, 3)] + ["", None]
+    assert db.get_known_links(links) == {make_job(1)["link"], make_job(2)["link"]}
+    assert db.get_known_links([]) == set()
+
+
+def test_get_known_links_in_chunks(db, make_job):
+    db.save_jobs([make_job(n) for n in range(1200)])
+    links = [make_job(n)["link"] for n in range(1500)]
+    assert len(db.get_known_links(links)) == 1200
+
+
+def test_old_jobs_are_due_for_a_refresh(db, make_job):
+    db.save_jobs([make_job(1), make_job(2)])
+    _age(db, make_job(1)["link"], 10)
+    links = [make_job(1)["link"], make_job(2)["link"]]
+    assert db.get_known_links(links, refresh_after_hours=24) == {make_job(2)["link"]}
+    assert db.get_known_links(links) == set(links)
+
+
+def test_refresh_updates_the_stored_job(db, make_job):
+    db.save_jobs([make_job(1)])
+    link = make_job(1)["link"]
+    _age(db, link, 10)
+    refreshed = make_job(1, description="Now also hiring remote.", emails=["new@example.com"])
+
+    assert db.save_jobs([refreshed]) == {"inserted": 0, "refreshed": 1, "ignored": 0, "invalid": 0}
+    job = _job(db, link)
+    assert job["description"] == "Now also hiring remote."
+    assert job["emails"] == "new@example.com"
+    assert job["refreshed_at"] is not None
+    # Refreshed, so known again under the threshold; still a single row
+    assert db.get_known_links([link], refresh_after_hours=24) == {link}
+    assert db.get_stats()["total_jobs"] == 1
+    assert [r["link"] for r in db.search_jobs("remote")["results"]] == [link]
+
+
+def test_refresh_keeps_description_when_none_was_read(db, make_job):
+    db.save_jobs([make_job(1)])
+    db.save_jobs([make_job(1, description=None)])
+    assert _job(db, make_job(1)["link"])["description"] == make_job(1)["description"]
+
+
+def test_init_db_normalizes_stored_links(db, make_job):
+    raw = [
+        ("A", "https://www.linkedin.com/jobs/view/1?refId=x&trk=y", None, "new"),
+        ("A", "https://www.linkedin.com/jobs/view/1/?trackingId=z", "Description of the duplicate", "applied"),
+        ("B", "https://de.indeed.com/viewjob?jk=9&from=serp", "B", "new"),
+        ("C", "https://example.com/jobs/3", "C", "new"),
+    ]
+    with db.db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO jobs (title, link, description, status, source) VALUES (?, ?, ?, ?, 'LinkedIn')", raw
+        )
+        conn.execute("INSERT INTO jobs_fts (rowid, title, company, description) SELECT id, title, company, description FROM jobs")
+        db.rebuild_stats(conn.cursor())
+        conn.execute("PRAGMA user_version = 0")
+
+    db.init_db()
+
+    with db.db_connection() as conn:
+        rows = [dict(row) for row in conn.execute("SELECT id, link, description, status FROM jobs ORDER BY id")]
+        conn.execute("INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('integrity-check', 1)")
+    assert rows == [
+        {"id": 1, "link": "https://www.linkedin.com/jobs/view/1", "description": "Description of the duplicate", "status": "applied"},
+        {"id": 3, "link": "https://de.indeed.com/viewjob?jk=9", "description": "B", "status": "new"},
+        {"id": 4, "link": "https://example.com/jobs/3", "description": "C", "status": "new"},
+    ]
+    stats = db.get_stats()
+    assert stats["total_jobs"] == 3
+    assert stats["by_status"] == {"applied": 1, "new": 2}
+    assert db.get_known_links(["https://www.linkedin.com/jobs/view/1"]) == {"https://www.linkedin.com/jobs/view/1"}
+    assert [r["id"] for r in db.search_jobs("duplicate")["results"]] == [1]
@@ -0,0 +1,114 @@
+import asyncio
+import contextvars
+
+import pytest
+
+import metrics
+
+
+def _in_scan(fn):
+    """Runs fn(scan_metrics) in its own context, so the scan does not leak into other tests."""
+    def run():
+        return fn(metrics.start_scan_metrics())
+    return contextvars.copy_context().run(run)
+
+
+def test_spans_are_labelled_and_failures_counted():
+    def scan(scan_metrics):
+        metrics.set_span_labels("LinkedIn", "Dev")
+        with metrics.span("detail_fetch"):
+            pass
+        with pytest.raises(RuntimeError):
+            with metrics.span("detail_fetch"):
+                raise RuntimeError("timeout")
+        metrics.set_span_labels()
+        with metrics.span("db_write"):
+            pass
+        return scan_metrics.summary()
+
+    summary = _in_scan(scan)
+    assert list(summary["stages"]) == ["detail_fetch", "db_write"]
+    fetch = summary["stages"]["detail_fetch"]
+    assert (fetch["count"], fetch["failures"], fetch["failure_rate"]) == (2, 1, 0.5)
+    assert summary["pages"] == 1
+    assert list(summary["portals"]) == ["LinkedIn"] and list(summary["roles"]) == ["Dev"]
+    assert summary["portals"]["LinkedIn"]["detail_fetch"]["count"] == 2
+
+
+def test_tasks_inherit_the_scan_with_their_own_labels():
+    async def task(portal):
+        metrics.set_span_labels(portal, "Dev")
+        with metrics.span("listing_navigation"):
+            await asyncio.sleep(0)
+
+    def scan(scan_metrics):
+        async def run():
+            await asyncio.gather(task("LinkedIn"), task("Indeed"))
+        asyncio.run(run())
+        return scan_metrics.summary()
+
+    summary = _in_scan(scan)
+    assert sorted(summary["portals"]) == ["Indeed", "LinkedIn"]
+    assert summary["roles"]["Dev"]["listing_navigation"]["count"] == 2
+
+
+def test_span_outside_a_scan_is_a_no_op():
+    def outside():
+        with metrics.span("export"):
+            return "ran"
+    assert contextvars.Context().run(outside) == "ran"
+
+
+def test_percentiles():
+    scan_metrics = metrics.ScanMetrics()
+    for ms in range(1, 101):
+        scan_metrics.record("detail_fetch", ms / 1000)
+    agg = scan_metrics.summary()["stages"]["detail_fetch"]
+    assert (agg["p50_ms"], agg["p95_ms"], agg["max_ms"]) == (51.0, 96.0, 100.0)
+    assert agg["total_s"] == 5.05
+
+
+def test_prometheus_text():
+    scan_metrics = metrics.ScanMetrics()
+    scan_metrics.record("detail_fetch", 0.2, portal='Stepstone "DE"')
+    scan_metrics.record("detail_fetch", 0.4, ok=False, portal='Stepstone "DE"')
+    text = metrics.prometheus_text(
+        {"running": 1, "done": 3}, (7, scan_metrics.summary()),
+        {"p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 3.0, "max_ms": 4.0},
+    )
+    lines = text.splitlines()
+    assert 'jobs_agent_scans{status="done"} 3' in lines
+    assert "jobs_agent_last_scan_id 7" in lines
+    assert 'jobs_agent_stage_latency_seconds{stage="detail_fetch",portal="",quantile="0.95"} 0.4' in lines
+    assert 'jobs_agent_stage_latency_seconds_count{stage="detail_fetch",portal="Stepstone \\"DE\\""} 2' in lines
+    assert 'jobs_agent_stage_failure_ratio{stage="detail_fetch",portal=""} 0.5' in lines
+    assert 'jobs_agent_event_loop_lag_seconds{quantile="1"} 0.004' in lines
+    assert text.endswith("\n")
+
+    assert metrics.prometheus_text({}).splitlines()[-1] == "# TYPE jobs_agent_scans gauge"
+
+
+def test_scan_metrics_are_stored_per_scan(db):
+    assert db.latest_scan_metrics() is None
+    first = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    second = db.enqueue_scan(["QA"], "Berlin", "Both")
+    db.enqueue_scan(["Ops"], "Berlin", "Both")
+    db.save_scan_metrics(first, {"wall_s": 1.0})
+    db.save_scan_metrics(second, {"wall_s": 2.0})
+    db.claim_scan("w1", 60)
+    db.finish_scan(second, "done")
+
+    assert db.latest_scan_metrics() == (second, {"wall_s": 2.0})
+    assert db.count_scans_by_status() == {"running": 1, "done": 1, "queued": 1}
+
+
+def test_metrics_endpoint(client, db):
+    scan_id = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    scan_metrics = metrics.ScanMetrics()
+    scan_metrics.record("db_write", 0.01)
+    db.save_scan_metrics(scan_id, scan_metrics.summary())
+
+    response = client.get("/api/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'jobs_agent_scans{status="queued"} 1' in response.text
+    assert f"jobs_agent_last_scan_id {scan_id}" in response.text
@@ -0,0 +1,55 @@
+import os
+
+import exporter
+
+
+def _write_report(db, make_job, count=1):
+    scan_id = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    path = exporter.export_to_excel([make_job(n) for n in range(count)], exporter.report_path(scan_id))
+    db.finish_scan(scan_id, "done", job_count=count, report=path)
+    return scan_id, path
+
+
+def test_report_path_is_per_scan():
+    assert exporter.report_path(42) == os.path.join(exporter.REPORTS_DIR, "jobs_report_42.xlsx")
+
+
+def test_download_serves_the_last_finished_scan(client, db, make_job):
+    _write_report(db, make_job, 1)
+    second, path = _write_report(db, make_job, 2)
+    response = client.get("/api/download-report")
+    assert response.status_code == 200
+    assert response.content == open(path, "rb").read()
+    assert response.headers["content-type"] == exporter.EXPORTERS["xlsx"]["media_type"]
+    assert f"jobs_report_{second}.xlsx" in response.headers["content-disposition"]
+
+
+def test_repeat_downloads_are_not_modified(client, db, make_job):
+    scan_id, _ = _write_report(db, make_job)
+    first = client.get(f"/api/reports/{scan_id}")
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    cached = client.get(f"/api/reports/{scan_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert client.get(f"/api/reports/{scan_id}", headers={"If-None-Match": f"W/{etag}, \"other\""}).status_code == 304
+    assert client.get(f"/api/reports/{scan_id}", headers={"If-None-Match": '"stale"'}).status_code == 200
+    assert client.get(f"/api/reports/{scan_id}", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get(f"/api/reports/{scan_id}", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+    assert client.get(f"/api/reports/{scan_id}", headers={"If-Modified-Since": "garbage"}).status_code == 200
+
+
+def test_range_requests_are_served(client, db, make_job):
+    scan_id, path = _write_report(db, make_job)
+    response = client.get(f"/api/reports/{scan_id}", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.content == open(path, "rb").read()[:10]
+
+
+def test_missing_reports(client, db, make_job):
+    assert client.get("/api/download-report").json() == {"error": "File not found"}
+    assert client.get("/api/reports/999").json() == {"error": "File not found"}
+
+    # A report written before per-scan files existed is still served
+    exporter.export_to_excel([make_job(1)], exporter.OUTPUT_FILENAME)
+    assert client.get("/api/download-report").status_code == 200
@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+
+def test_save_jobs_counts(db, make_job):
+    assert db.save_jobs([]) == {"inserted": 0, "refreshed": 0, "ignored": 0, "invalid": 0}
+    assert db.save_jobs([make_job(n) for n in range(5)]) == {"inserted": 5, "refreshed": 0, "ignored": 0, "invalid": 0}
+
+    batch = [make_job(1), make_job(5), make_job(5), make_job(6, title="")]
+    assert db.save_jobs(batch) == {"inserted": 1, "refreshed": 1, "ignored": 1, "invalid": 1}
+    assert db.get_stats()["total_jobs"] == 6
+
+
+def test_save_jobs_stores_fields(db, make_job):
+    db.save_jobs([make_job(1, emails=["a@example.com", "b@example.com"])])
+    job = db.get_all_jobs()[0]
+    assert job["title"] == "Frontend Developer 1"
+    assert job["emails"] == "a@example.com\nb@example.com"
+    assert job["status"] == "new"
+    assert job["description"] == make_job(1)["description"]
+
+
+def test_db_connection_is_reused_per_thread(db):
+    with db.db_connection() as first:
+        pass
+    with db.db_connection() as second:
+        assert second is first
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.db_connection().__enter__()))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+
+def test_db_connection_rolls_back_on_error(db, make_job):
+    with pytest.raises(RuntimeError):
+        with db.db_connection() as conn:
+            conn.execute("INSERT INTO jobs (title, link) VALUES ('Lost', 'https://example.com/lost')")
+            raise RuntimeError("boom")
+    assert db.get_known_links(["https://example.com/lost"]) == set()
+
+
+def test_connections_use_wal(db):
+    with db.db_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
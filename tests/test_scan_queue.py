@@ -0,0 +1,164 @@
+import asyncio
+from types import SimpleNamespace
+
+import events
+import worker
+
+
+def test_claim_hands_out_the_oldest_queued_scan_once(db):
+    first = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    second = db.enqueue_scan(["QA"], "Munich", "English", incremental=True)
+
+    claimed = db.claim_scan("w1", 60)
+    assert claimed["id"] == first
+    assert (claimed["status"], claimed["worker"], claimed["message"]) == ("running", "w1", "Starting...")
+    assert db.claim_scan("w2", 60)["id"] == second
+    assert db.claim_scan("w3", 60) is None
+
+
+def test_scans_of_a_dead_worker_are_reclaimed(db):
+    scan_id = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    db.claim_scan("w1", 60)
+    assert db.claim_scan("w2", 60) is None
+
+    with db.db_connection() as conn:
+        conn.execute("UPDATE scans SET heartbeat_at = datetime('now', '-120 seconds') WHERE id = ?", (scan_id,))
+    assert db.claim_scan("w2", 60)["worker"] == "w2"
+
+
+def test_update_scan_records_progress_and_heartbeat(db):
+    scan_id = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    db.claim_scan("w1", 60)
+    with db.db_connection() as conn:
+        conn.execute("UPDATE scans SET heartbeat_at = datetime('now', '-120 seconds') WHERE id = ?", (scan_id,))
+
+    db.update_scan(scan_id, progress=40, message="Scraping", current_role="Dev")
+    scan = db.get_scan(scan_id)
+    assert (scan["progress"], scan["message"], scan["current_role"]) == (40, "Scraping", "Dev")
+    assert db.claim_scan("w2", 60) is None
+
+
+def test_finish_and_list_scans(db):
+    done = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    failed = db.enqueue_scan(["QA"], "Berlin", "Both")
+    db.finish_scan(done, "done", job_count=3, report="reports/r.xlsx", message="Done")
+    db.finish_scan(failed, "failed", error="boom")
+
+    scan = db.get_scan(done)
+    assert (scan["status"], scan["job_count"], scan["report"], scan["progress"]) == ("done", 3, "reports/r.xlsx", 100)
+    assert scan["finished_at"]
+    assert [s["id"] for s in db.list_scans()] == [failed, done]
+    assert [s["id"] for s in db.list_scans(status="failed")] == [failed]
+    assert db.get_scan(999) is None
+
+
+def test_scan_events_are_read_after_an_id_and_pruned(db):
+    assert db.last_scan_event_id() == 0
+    for n in range(5):
+        db.add_scan_event(1, "progress", {"n": n})
+    assert db.last_scan_event_id() == 5
+    assert db.get_scan_events(3) == [(4, "progress", {"n": 3}), (5, "progress", {"n": 4})]
+    assert len(db.get_scan_events(0, limit=2)) == 2
+
+    db.prune_scan_events(2)
+    assert [event[0] for event in db.get_scan_events(0)] == [4, 5]
+
+
+def test_worker_runs_a_queued_scan(db, monkeypatch):
+    calls = {}
+
+    async def run_job_agent(roles, location, language, status_callback, jobs_callback, scan_id, incremental):
+        calls.update(roles=roles, location=location, language=language, scan_id=scan_id, incremental=incremental)
+        await status_callback({"progress": 50, "message": "Halfway", "current_role": "Dev", "job_count": 1})
+        await jobs_callback(SimpleNamespace(role="Dev", portal="LinkedIn"), [{"title": "Dev", "description": "long"}])
+        return "reports/jobs_report_1.xlsx"
+
+    monkeypatch.setattr(worker, "run_job_agent", run_job_agent)
+    scan_id = db.enqueue_scan(["Dev", "QA"], "Berlin", "English", incremental=True)
+    asyncio.run(worker.run_worker("w1", once=True))
+
+    assert calls == {"roles": ["Dev", "QA"], "location": "Berlin", "language": "English", "scan_id": scan_id, "incremental": True}
+    scan = db.get_scan(scan_id)
+    assert (scan["status"], scan["job_count"], scan["message"]) == ("done", 1, "Halfway")
+    assert scan["report"] == "reports/jobs_report_1.xlsx"
+
+    progress, jobs, final = db.get_scan_events(0)
+    assert progress[2]["progress"] == 50 and progress[2]["filters"]["roles"] == ["Dev", "QA"]
+    assert jobs[2]["jobs"] == [{"title": "Dev", "company": None, "link": None, "emails": None, "source": None}]
+    assert final[2]["status"] == "done" and final[2]["ready_to_download"] is True
+
+
+def test_worker_records_a_failed_scan(db, monkeypatch):
+    async def run_job_agent(**kwargs):
+        raise RuntimeError("browser crashed")
+
+    monkeypatch.setattr(worker, "run_job_agent", run_job_agent)
+    scan_id = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    asyncio.run(worker.run_worker("w1", once=True))
+
+    scan = db.get_scan(scan_id)
+    assert (scan["status"], scan["error"]) == ("failed", "browser crashed")
+    assert db.get_scan_events(0)[-1][2]["active"] is False
+
+
+def test_relay_publishes_database_events_with_their_ids(db, monkeypatch):
+    import server
+    broker = events.EventBroker()
+    monkeypatch.setattr(server, "broker", broker)
+    monkeypatch.setattr(server, "EVENT_POLL_INTERVAL", 0.01)
+    db.add_scan_event(1, "progress", {"n": 0})
+
+    async def run():
+        relay = asyncio.create_task(server.relay_scan_events())
+        await asyncio.sleep(0.05)
+        db.add_scan_event(1, "jobs", {"n": 1})
+        db.add_scan_event(1, "progress", {"n": 2})
+        for _ in range(100):
+            if broker.history:
+                break
+            await asyncio.sleep(0.01)
+        relay.cancel()
+        await asyncio.gather(relay, return_exceptions=True)
+
+    asyncio.run(run())
+    # Events written before the server started are not replayed
+    assert [(event[0], event[1]) for event in broker.history] == [(2, "jobs"), (3, "progress")]
+
+
+def test_start_search_queues_scans(client, db):
+    first = client.post("/api/start-search", json={"roles": ["Dev"], "location": "Berlin", "language": "Both"}).json()
+    second = client.post("/api/start-search", json={"roles": ["QA"], "location": "Munich", "language": "German", "incremental": True}).json()
+    assert first == {"message": "Search queued", "scan_id": 1}
+    assert second["scan_id"] == 2
+    assert db.get_scan(2)["incremental"] == 1
+    assert [event[2]["scan_id"] for event in db.get_scan_events(0)] == [1, 2]
+
+
+def test_start_search_is_refused_on_vercel(client, monkeypatch):
+    monkeypatch.setenv("VERCEL", "1")
+    body = client.post("/api/start-search", json={"roles": ["Dev"], "location": "Berlin", "language": "Both"}).json()
+    assert body["unsupported"] is True
+
+
+def test_status_and_scan_endpoints(client, db):
+    assert client.get("/api/status").json() == worker.IDLE_STATUS
+
+    done = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    db.finish_scan(done, "done", job_count=2, report="r.xlsx")
+    running = db.enqueue_scan(["QA"], "Berlin", "Both")
+    db.claim_scan("w1", 60)
+    db.enqueue_scan(["Ops"], "Berlin", "Both")
+
+    status = client.get("/api/status").json()
+    assert (status["scan_id"], status["status"], status["active"]) == (running, "running", True)
+    assert client.get("/api/status", params={"scan_id": done}).json()["ready_to_download"] is True
+
+    scans = client.get("/api/scans", params={"limit": 2}).json()["scans"]
+    assert [scan["scan_id"] for scan in scans] == [3, running]
+    assert [scan["scan_id"] for scan in client.get("/api/scans", params={"status": "done"}).json()["scans"]] == [done]
+
+    db.save_scan_metrics(done, {"stages": {}})
+    body = client.get(f"/api/scans/{done}").json()
+    assert body["job_count"] == 2 and body["metrics"] == {"stages": {}}
+    assert client.get(f"/api/scans/{running}").json()["metrics"] is None
+    assert client.get("/api/scans/999").json() == {"error": "Scan not found"}
@@ -0,0 +1,66 @@
+import pytest
+
+
+def _titles(result):
+    return [row["title"] for row in result["results"]]
+
+
+def test_title_hits_rank_above_description_hits(db, make_job):
+    db.save_jobs([
+        make_job(1, title="Backend Engineer", description="Works next to the kotlin team."),
+        make_job(2, title="Kotlin Developer", description="Android apps."),
+    ])
+    result = db.search_jobs("kotlin")
+    assert _titles(result) == ["Kotlin Developer", "Backend Engineer"]
+    assert "<mark>kotlin</mark>" in result["results"][1]["snippet"]
+    assert result["next_offset"] is None
+
+
+def test_all_terms_are_required(db, make_job):
+    db.save_jobs([
+        make_job(1, description="react and typescript"),
+        make_job(2, description="react only"),
+    ])
+    assert _titles(db.search_jobs("react typescript")) == ["Frontend Developer 1"]
+
+
+@pytest.mark.parametrize("q", ['c++ "senior', "-remote", "dev*", "react OR vue", "title:hack", "(", "NEAR"])
+def test_query_syntax_is_treated_as_text(db, make_job, q):
+    db.save_jobs([make_job(1)])
+    assert db.search_jobs(q)["results"] == []
+
+
+def test_empty_query_returns_nothing(db, make_job):
+    db.save_jobs([make_job(1)])
+    assert db.search_jobs("") == {"results": [], "next_offset": None}
+    assert db.search_jobs("   ") == {"results": [], "next_offset": None}
+
+
+def test_offsets_page_through_results(db, make_job):
+    db.save_jobs([make_job(n) for n in range(5)])
+    first = db.search_jobs("frontend", limit=2)
+    second = db.search_jobs("frontend", limit=2, offset=first["next_offset"])
+    third = db.search_jobs("frontend", limit=2, offset=second["next_offset"])
+    assert (first["next_offset"], second["next_offset"], third["next_offset"]) == (2, 4, None)
+    ids = [row["id"] for page in (first, second, third) for row in page["results"]]
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+
+
+def test_refreshed_and_deleted_jobs_are_reindexed(db, make_job):
+    db.save_jobs([make_job(1)])
+    db.save_jobs([make_job(1, description="Now with rust.")])
+    assert _titles(db.search_jobs("rust")) == ["Frontend Developer 1"]
+    assert db.search_jobs("hiring")["results"] == []
+
+    with db.db_connection() as conn:
+        conn.execute("DELETE FROM jobs WHERE id = 1")
+        conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('integrity-check')")
+    assert db.search_jobs("rust")["results"] == []
+
+
+def test_search_endpoint_clamps_paging(client, db, make_job):
+    db.save_jobs([make_job(n) for n in range(3)])
+    body = client.get("/api/jobs/search", params={"q": "frontend", "limit": 0, "offset": -5}).json()
+    assert len(body["results"]) == 1
+    assert body["next_offset"] == 1
+    assert client.get("/api/jobs/search", params={"q": "frontend", "limit": 500}).json()["next_offset"] is None
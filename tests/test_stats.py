@@ -0,0 +1,73 @@
+def _counters(db):
+    with db.db_connection() as conn:
+        return {row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM stats_counters") if row["value"]}
+
+
+def _rebuilt(db):
+    with db.db_connection() as conn:
+        db.rebuild_stats(conn.cursor())
+    return _counters(db)
+
+
+def test_counters_follow_inserts_updates_and_deletes(db, make_job):
+    db.save_jobs([make_job(n, source=("LinkedIn", "Indeed", None)[n % 3]) for n in range(7)])
+    db.save_jobs([make_job(3), make_job(7)])
+    with db.db_connection() as conn:
+        conn.execute("UPDATE jobs SET status = 'applied' WHERE id IN (1, 2)")
+        conn.execute("DELETE FROM jobs WHERE id = 3")
+
+    stats = db.get_stats()
+    assert stats["total_jobs"] == 7
+    assert stats["by_source"] == {"LinkedIn": 4, "Indeed": 2, "unknown": 1}
+    assert stats["by_status"] == {"applied": 2, "new": 5}
+    assert sum(stats["by_day"].values()) == 7
+    assert _counters(db) == _rebuilt(db)
+
+
+def test_only_finished_scans_are_counted(db):
+    queued = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    failed = db.enqueue_scan(["Dev"], "Berlin", "Both")
+    assert db.get_stats()["total_scans"] == 0
+
+    db.finish_scan(failed, "failed", error="boom")
+    db.finish_scan(queued, "done")
+    db.finish_scan(queued, "done")
+    db.log_scan(["Dev"], "Berlin", "Both", 3)
+    assert db.get_stats()["total_scans"] == 2
+    assert _counters(db) == _rebuilt(db)
+
+
+def test_by_day_is_limited_to_recent_days(db, make_job):
+    db.save_jobs([make_job(1), make_job(2)])
+    with db.db_connection() as conn:
+        conn.execute("UPDATE jobs SET created_at = datetime('now', '-60 days') WHERE id = 1")
+        db.rebuild_stats(conn.cursor())
+    assert len(db.get_stats(days=30)["by_day"]) == 1
+    assert len(db.get_stats(days=90)["by_day"]) == 2
+
+
+def test_init_db_replaces_per_row_triggers(db, make_job):
+    with db.db_connection() as conn:
+        conn.execute(
+            "CREATE TRIGGER stats_scans_insert AFTER INSERT ON scans BEGIN "
+            + db._bump("'scans'", 1) + " END"
+        )
+    db.enqueue_scan(["Dev"], "Berlin", "Both")
+    assert db.get_stats()["total_scans"] == 1
+
+    db.init_db()
+    with db.db_connection() as conn:
+        triggers = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    assert "stats_scans_insert" not in triggers
+    assert "stats_jobs_insert" not in triggers
+    assert db.get_stats()["total_scans"] == 0
+
+
+def test_stats_endpoint_is_cached(client, db, make_job, monkeypatch):
+    import server
+    db.save_jobs([make_job(1)])
+    assert client.get("/api/stats").json()["total_jobs"] == 1
+    db.save_jobs([make_job(2)])
+    assert client.get("/api/stats").json()["total_jobs"] == 1
+    monkeypatch.setitem(server._stats_cache, "expires", 0.0)
+    assert client.get("/api/stats").json()["total_jobs"] == 2
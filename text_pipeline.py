@@ -0,0 +1,115 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils import extract_emails, detect_language
+from config import TEXT_PIPELINE_WORKERS, TEXT_PIPELINE_QUEUE_SIZE
+
+
+def analyze_description(description):
+    """CPU-bound part of handling a detail page. Runs in a worker process."""
+    return {
+        "description": description,
+        "emails": extract_emails(description),
+        "language": detect_language(description),
+    }
+
+
+class TextPipeline:
+    """
+    Post-processing stage that keeps text work off the event loop.
+
+    Scrapers `await pipeline.process(description)` and get back the extracted
+    emails and detected language. Requests wait in a bounded asyncio queue
+    (backpressure when workers fall behind) and a consumer per worker feeds
+    them to a ProcessPoolExecutor, so Playwright and the API keep running
+    while descriptions are analyzed. With `workers=0` analysis runs inline.
+    If a worker process dies the pool is replaced, so one crash never breaks
+    the pipeline for later scans.
+    """
+
+    def __init__(self, workers=TEXT_PIPELINE_WORKERS, queue_size=TEXT_PIPELINE_QUEUE_SIZE):
+        self.workers = workers
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._executor = None
+        self._consumers = []
+        if workers > 0:
+            self._executor = self._new_executor()
+            self._consumers = [asyncio.create_task(self._consume()) for _ in range(workers)]
+
+    def _new_executor(self):
+        # spawn: forking a process that runs Playwright's driver threads is unsafe
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_broken(self, broken):
+        # Every consumer sees the same broken pool; only the first one replaces it
+        if self._executor is broken:
+            print("Text pipeline worker process died, restarting the pool.")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+
+    async def _analyze(self, description):
+        # One retry on a fresh pool; a description that kills that one too fails on its own
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                return await self.loop.run_in_executor(executor, analyze_description, description)
+            except BrokenProcessPool:
+                self._replace_broken(executor)
+                if attempt:
+                    raise
+
+    async def _consume(self):
+        while True:
+            description, future = await self._queue.get()
+            try:
+                if not future.cancelled():
+                    result = await self._analyze(description)
+                    if not future.cancelled():
+                        future.set_result(result)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def submit(self, description):
+        """Queues a description and returns a future for its analysis (waits while the queue is full)."""
+        future = self.loop.create_future()
+        if self._executor is None:
+            future.set_result(analyze_description(description))
+            return future
+        await self._queue.put((description, future))
+        return future
+
+    async def process(self, description):
+        """Analyzes a description off the event loop: {"description", "emails", "language"}."""
+        return await (await self.submit(description))
+
+    async def close(self):
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pipeline = None
+
+
+def get_text_pipeline():
+    """Returns the shared TextPipeline of the running event loop, starting it on first use."""
+    global _pipeline
+    if _pipeline is None or _pipeline.loop is not asyncio.get_running_loop():
+        _pipeline = TextPipeline()
+    return _pipeline
+
+
+async def close_text_pipeline():
+    global _pipeline
+    if _pipeline is not None:
+        await _pipeline.close()
+        _pipeline = None
@@ -1,34 +1,41 @@
 import re
-from langdetect import detect, DetectorFactory
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from language_detection import detect_language
+from language_rules import match_categories
 
-# Ensure consistent language detection
-DetectorFactory.seed = 0
+# Improved regex to catch more variations
+EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}')
+HR_EMAIL_RE = re.compile(r'hr|jobs|careers|recruitment|bewerbung|career|personal|hiring', re.IGNORECASE)
+
+# Map target strings to langdetect codes
+LANG_CODES = {
+    "English": "en",
+    "German": "de",
+    "French": "fr",
+    "Spanish": "es",
+    "Italian": "it",
+    "Dutch": "nl"
+}
 
 def is_english(text):
     """Checks if the given text is English."""
     if not text or len(text.strip()) < 10:
         return False
-    try:
-        return detect(text) == 'en'
-    except:
-        return False
+    return detect_language(text) == 'en'
 
 def extract_emails(text):
     """Extracts email addresses from text using a robust regex."""
-    if not text:
+    if not text or "@" not in text:
         return []
-    # Improved regex to catch more variations
-    email_pattern = r'[a-zA-Z0-9._%+-]+@(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}'
-    emails = list(set(re.findall(email_pattern, text)))
+    # Unique, in order of appearance
+    emails = list(dict.fromkeys(EMAIL_RE.findall(text)))
     
     # Prioritize 'Job' or 'HR' related emails
-    hr_keywords = ['hr', 'jobs', 'careers', 'recruitment', 'bewerbung', 'career', 'personal', 'hiring']
-    hr_emails = [e for e in emails if any(k in e.lower() for k in hr_keywords)]
+    hr_emails = [e for e in emails if HR_EMAIL_RE.search(e)]
     
     # Return formatted string: HR emails first, then others
-    other_emails = [e for e in emails if e not in hr_emails]
-    final_list = hr_emails + other_emails
-    return final_list
+    other_emails = [e for e in emails if not HR_EMAIL_RE.search(e)]
+    return hr_emails + other_emails
 
 def clean_text(text):
     """Cleans up whitespace, newlines, and special characters."""
@@ -39,79 +46,73 @@ def clean_text(text):
     # Basic cleaning of non-ASCII characters if needed, but keeping it simple for now
     return text.strip()
 
-def detect_language(text):
-    """Detects the language of the given text."""
-    if not text or len(text.strip()) < 10:
-        return 'unknown'
-    try:
-        return detect(text)
-    except:
-        return 'unknown'
+# Query parameters that only track the click and do not identify the posting
+TRACKING_PARAMS = {
+    "refid", "trackingid", "trk", "position", "pagenum", "from", "bb", "xkcb",
+    "fccid", "vjs", "tk", "rltr", "cid", "sid", "ref", "src", "source",
+}
 
-def check_language_requirements(description, target_lang="English"):
+def normalize_link(link):
+    """Normalizes a job link so the same posting always maps to the same key."""
+    if not link:
+        return ""
+    parts = urlsplit(link.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+def check_language_requirements(description, target_lang="English", detected=None):
     """
     Checks if the job description meets the target language requirements STENCHLY.
     If English is selected: Must be English, must NOT require German.
     If German is selected: Must be German or specifically require German.
     If French/Spanish/etc is selected: Must match that language code.
+    Pass `detected` when the language of the description is already known (e.g. cached);
+    otherwise it is only computed when a rule actually needs it.
     """
     if not description:
         return False
-    
-    desc_lower = description.lower()
-    detected = detect_language(description)
-    
-    # Map target strings to langdetect codes
-    lang_map = {
-        "English": "en",
-        "German": "de",
-        "French": "fr",
-        "Spanish": "es",
-        "Italian": "it",
-        "Dutch": "nl"
-    }
-    
-    target_code = lang_map.get(target_lang)
-    
+
+    target_code = LANG_CODES.get(target_lang)
+
+    def language():
+        nonlocal detected
+        if detected is None:
+            detected = detect_language(description)
+        return detected
+
     # --- 1. ENGLISH SELECTION ---
     if target_lang == "English":
+        matched = match_categories(description, target_lang)
         # Must NOT have German as a hard requirement
-        german_req_indicators = [
-            "deutsch als muttersprache", "deutschkenntnisse", "fluent german", 
-            "level b2", "level c1", "voraussetzung: deutsch", "fließend deutsch",
-            "deutsch: verhandlungssicher"
-        ]
-        requires_german = any(i in desc_lower for i in german_req_indicators)
-        if requires_german:
+        if "german_requirement" in matched:
             return False
             
         # Is it detected as English?
-        if detected == 'en':
+        if language() == 'en':
             return True
             
-        # Fallback for tech descriptions that langdetect might miss
-        tech_keywords = ["react", "frontend", "flutter", "angular", "javascript", "typescript", "node", "experience", "requirements", "engineer", "developer"]
-        has_strong_english = any(k in desc_lower for k in tech_keywords)
-        
         # If it's something else (like German) but has no German keywords and has tech keywords, maybe.
         # But for 'Strict', if it's detected as 'de', we should probably skip.
-        if detected == 'de' and "deutsch" in desc_lower:
+        if detected == 'de' and "mentions_deutsch" in matched:
             return False
             
-        return has_strong_english
+        return "tech" in matched
 
     # --- 2. GERMAN SELECTION ---
     if target_lang == "German":
         # Must be detected as de OR mention German requirements
-        if detected == 'de':
+        if language() == 'de':
             return True
-        german_indicators = ["deutschkenntnisse", "deutsch", "voraussetzungen", "aufgaben", "kenntnisse"]
-        return any(g in desc_lower for g in german_indicators)
+        return "german_indicator" in match_categories(description, target_lang)
 
     # --- 3. OTHER SPECIFIC LANGUAGES ---
     if target_code:
         # Strict match for detecting that specific language
-        return detected == target_code
+        return language() == target_code
 
     # --- 4. ALL / BOTH ---
     return True
@@ -123,25 +124,23 @@ def is_likely_target_language(snippet, target_lang):
     if not snippet or target_lang in ["All", "Both"]:
         return True
     
-    snippet_lower = snippet.lower()
-    detected = detect_language(snippet)
-    
-    lang_map = {"English": "en", "German": "de", "French": "fr", "Spanish": "es", "Italian": "it"}
-    target_code = lang_map.get(target_lang)
+    target_code = LANG_CODES.get(target_lang)
     
     if target_lang == "English":
         # If snippet is clearly German, skip
-        if detected == 'de' and ("deutsch" in snippet_lower or "german" in snippet_lower):
+        matched = match_categories(snippet, target_lang)
+        if ("mentions_deutsch" in matched or "mentions_german" in matched) and detect_language(snippet) == 'de':
             return False
         return True # Be lenient on snippets to avoid false negatives
 
     if target_lang == "German":
         # If snippet is clearly something else, skip
-        if detected != 'de' and "deutsch" not in snippet_lower:
+        if "mentions_deutsch" not in match_categories(snippet, target_lang) and detect_language(snippet) != 'de':
             return False
         return True
 
     if target_code:
+        detected = detect_language(snippet)
         return detected == target_code or detected == 'unknown'
         
     return True
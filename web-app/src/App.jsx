@@ -65,28 +65,36 @@ const JobAgentDashboard = () => {
     { name: "All", code: "all", label: "🌍 All Languages" }
   ];
 
-  const fetchStatus = async () => {
-    try {
-      const res = await fetch('/api/status');
-      const data = await res.json();
+  const statusRef = useRef(status);
+  // Several scans can run at once; once this tab starts one it follows only that scan
+  const scanIdRef = useRef(null);
+  const isOtherScan = (data) => scanIdRef.current !== null && data.scan_id !== scanIdRef.current;
+
+  const applyStatus = (data) => {
+    const previous = statusRef.current;
+    statusRef.current = data;
+
+    // If status just became inactive after being active, refresh stats
+    if (!data.active && previous.active) {
+      fetchStats();
+    }
 
-      // If status just became inactive after being active, refresh stats
-      if (!data.active && status.active) {
-        fetchStats();
-      }
+    setStatus(data);
 
-      setStatus(data);
+    if (!data.active && data.message === 'Idle') {
+      setLoading(false);
+    }
 
-      if (!data.active && data.message === 'Idle') {
-        setLoading(false);
-      }
+    // Update logs based on status message changes
+    if (data.active && data.message !== previous.message) {
+      addLog(data.message, 'info');
+    }
+  };
 
-      // Set default base URL for Axios
-      // axios.defaults.baseURL = '/api'; // This line would require importing axios
-      // Update logs based on status message changes
-      if (data.active && data.message !== status.message) {
-        addLog(data.message, 'info');
-      }
+  const fetchStatus = async () => {
+    try {
+      const res = await fetch(`/api/status${scanIdRef.current ? `?scan_id=${scanIdRef.current}` : ''}`);
+      applyStatus(await res.json());
     } catch (err) {
       console.error('Failed to fetch status:', err);
     }
@@ -107,7 +115,7 @@ const JobAgentDashboard = () => {
     try {
       const res = await fetch('/api/jobs?limit=5');
       const data = await res.json();
-      setSavedJobs(data);
+      setSavedJobs(data.jobs || []);
     } catch (err) {
       console.error('Failed to fetch jobs:', err);
     }
@@ -120,10 +128,28 @@ const JobAgentDashboard = () => {
 
   useEffect(() => {
     fetchStats();
-    fetchStatus();
-    const interval = setInterval(fetchStatus, 3000);
-    return () => clearInterval(interval);
-  }, [status.message]);
+
+    // Fall back to polling where Server-Sent Events are unavailable
+    if (typeof EventSource === 'undefined') {
+      fetchStatus();
+      const interval = setInterval(fetchStatus, 3000);
+      return () => clearInterval(interval);
+    }
+
+    // The server pushes progress and new matches as each portal finishes;
+    // EventSource reconnects on its own and resumes after the last event it saw
+    const events = new EventSource('/api/events');
+    events.addEventListener('progress', (e) => {
+      const data = JSON.parse(e.data);
+      if (!isOtherScan(data)) applyStatus(data);
+    });
+    events.addEventListener('jobs', (e) => {
+      const data = JSON.parse(e.data);
+      if (isOtherScan(data)) return;
+      addLog(`${data.portal}: ${data.jobs.length} new match${data.jobs.length === 1 ? '' : 'es'} for ${data.role}`, 'success');
+    });
+    return () => events.close();
+  }, []);
 
   useEffect(() => {
     logEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -143,6 +169,7 @@ const JobAgentDashboard = () => {
         addLog(data.error, 'error');
         setLoading(false);
       } else {
+        scanIdRef.current = data.scan_id;
         addLog('Search mission launched successfully', 'success');
       }
     } catch (err) {
@@ -331,11 +358,11 @@ const JobAgentDashboard = () => {
                 {status.ready_to_download && (
                   <div className="flex flex-col items-end gap-2">
                     <a
-                      href={`/api/download-report?v=${Date.now()}`}
-                      download="jobs_report.xlsx"
+                      href={`/api/download-report${status.scan_id ? `?scan_id=${status.scan_id}` : ''}`}
+                      download={status.scan_id ? `jobs_report_${status.scan_id}.xlsx` : 'jobs_report.xlsx'}
                       target="_self"
                       className="flex items-center gap-2 bg-white text-black px-6 py-3 rounded-2xl font-bold hover:bg-cyan-400 transition-colors cursor-pointer no-underline shadow-lg"
-                      onClick={() => console.log(`Attempting download from: /api/download-report?v=${Date.now()}`)}
+                      onClick={() => console.log(`Attempting download of report for scan ${status.scan_id}`)}
                     >
                       <Download size={20} />
                       EXPORT DATA
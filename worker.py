@@ -0,0 +1,172 @@
+"""
+Scan worker: takes queued scans from the database and runs them.
+
+    python worker.py            # one worker process
+    python worker.py -n 4       # four processes, each with its own browsers
+    python worker.py --once     # run the queued scans, then exit
+    python worker.py --schedule # also queue the SCAN_SCHEDULE scans when they are due
+
+The API server enqueues scans (POST /api/start-search) and, unless
+SCAN_WORKERS_IN_PROCESS is 0, also runs workers itself. Separate worker
+processes keep scraping off the API's event loop and spread scans over cores.
+Database calls run in a thread, so in-process workers never hold up API requests
+while SQLite waits for a lock.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+from main import run_job_agent
+from browser_pool import close_browser_pool
+from text_pipeline import close_text_pipeline
+from database import init_db, claim_scan, get_scan, update_scan, finish_scan, add_scan_event, enqueue_scheduled_scan
+from config import SCAN_POLL_INTERVAL, SCAN_HEARTBEAT_INTERVAL, SCAN_STALE_AFTER, SCAN_SCHEDULE
+
+IDLE_STATUS = {
+    "active": False, "progress": 0, "message": "Idle", "job_count": 0,
+    "ready_to_download": False, "current_role": "", "scan_id": None, "filters": None,
+}
+
+
+def scan_status(scan):
+    """A scans row in the shape of the dashboard's status object."""
+    if scan is None:
+        return dict(IDLE_STATUS)
+    return {
+        "active": scan["status"] in ("queued", "running"),
+        "status": scan["status"],
+        "progress": scan["progress"] or 0,
+        "message": scan["message"] or "",
+        "job_count": scan["job_count"] or 0,
+        "ready_to_download": scan["status"] == "done" and bool(scan["report"]),
+        "current_role": scan["current_role"] or "",
+        "scan_id": scan["id"],
+        "filters": {
+            "roles": scan["roles"].split(", ") if scan["roles"] else [],
+            "location": scan["location"],
+            "language": scan["language"],
+        },
+        "error": scan["error"],
+        "incremental": bool(scan["incremental"]),
+    }
+
+
+async def _heartbeat(scan_id):
+    # Long portal tasks report no progress for a while; keep the scan from looking abandoned
+    while True:
+        await asyncio.sleep(SCAN_HEARTBEAT_INTERVAL)
+        await asyncio.to_thread(update_scan, scan_id)
+
+
+async def process_scan(scan):
+    """Runs one claimed scan, recording progress and events in the database."""
+    scan_id = scan["id"]
+    base = {"roles": scan["roles"].split(", "), "location": scan["location"], "language": scan["language"]}
+
+    async def on_status(status):
+        await asyncio.to_thread(
+            update_scan,
+            scan_id,
+            progress=status["progress"],
+            message=status["message"],
+            current_role=status.get("current_role", ""),
+            job_count=status["job_count"],
+        )
+        await asyncio.to_thread(add_scan_event, scan_id, "progress", dict(status, ready_to_download=False, filters=base))
+
+    async def on_jobs(task, new_jobs):
+        # Descriptions stay out of the stream; clients fetch them from /api/jobs if needed
+        await asyncio.to_thread(add_scan_event, scan_id, "jobs", {
+            "scan_id": scan_id,
+            "role": task.role,
+            "portal": task.portal,
+            "jobs": [{key: job.get(key) for key in ("title", "company", "link", "emails", "source")} for job in new_jobs],
+        })
+
+    heartbeat = asyncio.create_task(_heartbeat(scan_id))
+    try:
+        report = await run_job_agent(
+            roles=base["roles"], location=base["location"], language=base["language"],
+            status_callback=on_status, jobs_callback=on_jobs, scan_id=scan_id,
+            incremental=bool(scan["incremental"]),
+        )
+    except Exception as e:
+        print(f"Scan {scan_id} failed: {e}")
+        await asyncio.to_thread(finish_scan, scan_id, "failed", message="Scan failed.", error=str(e))
+    else:
+        done = await asyncio.to_thread(get_scan, scan_id)
+        message = done["message"] if report else "No jobs found."
+        await asyncio.to_thread(finish_scan, scan_id, "done", job_count=done["job_count"], report=report, message=message)
+    finally:
+        heartbeat.cancel()
+        await asyncio.gather(heartbeat, return_exceptions=True)
+    final = scan_status(await asyncio.to_thread(get_scan, scan_id))
+    await asyncio.to_thread(add_scan_event, scan_id, "progress", final)
+
+
+async def run_worker(name, once=False, poll_interval=SCAN_POLL_INTERVAL):
+    """Claims and runs queued scans until cancelled (or the queue is empty, with `once`)."""
+    while True:
+        scan = await asyncio.to_thread(claim_scan, name, SCAN_STALE_AFTER)
+        if scan is None:
+            if once:
+                return
+            await asyncio.sleep(poll_interval)
+            continue
+        print(f"[{name}] Running scan {scan['id']}: {scan['roles']} in {scan['location']}")
+        await process_scan(scan)
+
+
+async def run_schedule(schedule=SCAN_SCHEDULE, poll_interval=SCAN_POLL_INTERVAL):
+    """Queues each scheduled (incremental) scan every `every_minutes`, skipping it while one is pending."""
+    while True:
+        for entry in schedule:
+            scan_id = await asyncio.to_thread(
+                enqueue_scheduled_scan, entry["roles"], entry["location"], entry["language"], entry["every_minutes"] * 60
+            )
+            if scan_id:
+                print(f"Scheduled scan {scan_id}: {', '.join(entry['roles'])} in {entry['location']}")
+        await asyncio.sleep(poll_interval)
+
+
+def worker_name(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+async def _main(once, schedule=False):
+    scheduler = asyncio.create_task(run_schedule()) if schedule else None
+    try:
+        await run_worker(worker_name(), once=once)
+    finally:
+        if scheduler:
+            scheduler.cancel()
+            await asyncio.gather(scheduler, return_exceptions=True)
+        await close_browser_pool()
+        await close_text_pipeline()
+
+
+def _run_process(once, schedule=False):
+    asyncio.run(_main(once, schedule))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs queued scans.")
+    parser.add_argument("-n", "--processes", type=int, default=1)
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    parser.add_argument("--schedule", action="store_true", help="queue the SCAN_SCHEDULE scans when due")
+    args = parser.parse_args()
+
+    init_db()
+    if args.processes == 1:
+        _run_process(args.once, args.schedule)
+    else:
+        # One scheduler is enough; the database keeps a scan from being queued twice anyway
+        processes = [
+            multiprocessing.Process(target=_run_process, args=(args.once, args.schedule and n == 0))
+            for n in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()